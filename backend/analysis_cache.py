@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from backend.embedding_cache import LRUCache
+from backend.logger import logger
+from backend.metrics import stage, cache_result
+from backend.resume_parser import extract_resume_bytes, PARSER_VERSION
+from backend.redis_client import get_redis, RedisUnavailable
+from backend.skill_catalogue import skill_catalogue
+from backend.text_preprocess import preprocess_text, PREPROCESS_VERSION
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# memory | disk | redis | none. Entries hold resume text (personal data): the
+# default keeps them in process memory only; disk and redis persist them for
+# up to ANALYSIS_CACHE_TTL seconds
+ANALYSIS_CACHE_BACKEND = os.getenv("ANALYSIS_CACHE_BACKEND", "memory")
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "analysis"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Per process, for the memory backend
+ANALYSIS_CACHE_MEMORY_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MEMORY_MAX_BYTES", 64 * 1024 * 1024))
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", 7 * 24 * 3600))
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class MemoryBackend:
+    """Per-process LRU; entries never leave the process."""
+
+    def __init__(self, max_bytes: int, ttl: int):
+        self._lru = LRUCache(max_bytes, ttl)
+
+    @property
+    def evictions(self):
+        return self._lru.evictions + self._lru.expirations
+
+    def get(self, key: str):
+        # Stored encoded, so callers never share (and mutate) a cached dict
+        data = self._lru.get(key)
+        return json.loads(data) if data is not None else None
+
+    def set(self, key: str, value: dict):
+        data = json.dumps(value)
+        self._lru.set(key, data, len(data))
+
+
+class DiskBackend:
+    """
+    One JSON file per entry, removed ttl seconds after it was written. Reads
+    refresh the file's access time, and when the directory grows past
+    max_bytes the least recently used files are removed until it is back
+    under 80% of the budget.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            written = os.stat(path).st_mtime
+            if time.time() - written > self.ttl:
+                self._remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+            # atime tracks use for eviction; mtime stays the write time the TTL counts from
+            os.utime(path, (time.time(), written))
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable analysis cache entry {path}: {e}")
+            return None
+
+    def set(self, key: str, value: dict):
+        path = self._path(key)
+        data = json.dumps(value).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            with self._lock:
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp, path)
+                self._size += len(data) - replaced
+                if self._size > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            logger.warning(f"Skipping disk analysis cache write: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _remove(self, path: str):
+        try:
+            size = os.stat(path).st_size
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._size -= size
+            self.evictions += 1
+
+    def _evict(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_atime
+        )
+        size = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * 0.8
+        for entry in entries:
+            if size <= target:
+                break
+            try:
+                entry_size = entry.stat().st_size
+                os.remove(entry.path)
+                size -= entry_size
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+        self._size = size
+
+
+class RedisBackend:
+    def __init__(self, redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+        self.evictions = 0
+
+    def get(self, key: str):
+        try:
+            data = self.redis.get(key)
+            return json.loads(data) if data else None
+        except RedisUnavailable as e:
+            logger.warning(f"Skipping Redis analysis cache read: {e}")
+            return None
+
+    def set(self, key: str, value: dict):
+        try:
+            # Redis evicts on its own (TTL / maxmemory policy)
+            self.redis.setex(key, self.ttl, json.dumps(value))
+        except RedisUnavailable as e:
+            logger.warning(f"Skipping Redis analysis cache write: {e}")
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache for the parse and NLP stages.
+
+    Two levels, so each stage is invalidated only by what it depends on:
+      file:  SHA-256 of uploaded bytes + parser version       -> extracted text
+      text:  SHA-256 of text + preprocess + catalogue version -> tokens, skills
+    Version bumps change the keys, so stale entries are simply never read
+    again and age out through eviction.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = {"file": 0, "text": 0}
+        self.misses = {"file": 0, "text": 0}
+
+    def _lookup(self, level: str, key: str):
+        if self.backend is None:
+            self.misses[level] += 1
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses[level] += 1
+        else:
+            self.hits[level] += 1
+        cache_result(f"analysis_{level}", value is not None)
+        return value
+
+    def _store(self, key: str, value: dict):
+        if self.backend is not None:
+            self.backend.set(key, value)
+
+    @staticmethod
+    def _file_key(data: bytes, filename: str) -> str:
+        ext = os.path.splitext(filename)[1].lower()
+        return f"analysis:file:{PARSER_VERSION}:{ext.lstrip('.')}:{sha256_hex(data)}"
+
+    @staticmethod
+    def _text_key(text: str, catalogue_version: str) -> str:
+        return f"analysis:text:{PREPROCESS_VERSION}:{catalogue_version}:{sha256_hex(text.encode())}"
+
+    def document_text(self, data: bytes, filename: str) -> str:
+        """Extracted text of an uploaded resume, parsing only on a cache miss."""
+        key = self._file_key(data, filename)
+        cached = self._lookup("file", key)
+        if cached is not None:
+            return cached["text"]
+
+        with stage("parse"):
+            text = extract_resume_bytes(data, filename)
+        if text.strip():
+            self._store(key, {"text": text})
+        return text
+
+    def analyze_text(self, text: str) -> dict:
+        """Tokens and skills for a text, running the NLP stages only on a cache miss."""
+        catalogue = skill_catalogue.get()
+        key = self._text_key(text, catalogue.version)
+        cached = self._lookup("text", key)
+        if cached is not None:
+            return cached
+
+        with stage("preprocess"):
+            tokens = preprocess_text(text)
+        with stage("skill_extraction"):
+            skills = catalogue.index.extract(tokens)
+        result = {
+            "tokens": tokens,
+            "skills": skills,
+            "catalogue_version": catalogue.version,
+            "preprocess_version": PREPROCESS_VERSION,
+            "created_at": time.time(),
+        }
+        self._store(key, result)
+        return result
+
+    def analyze_document(self, data: bytes, filename: str) -> dict:
+        text = self.document_text(data, filename)
+        return {"text": text, **self.analyze_text(text)}
+
+    def cached_document(self, data: bytes, filename: str):
+        """analyze_document's result if both levels are cached, else None (nothing is computed)."""
+        cached = self._lookup("file", self._file_key(data, filename))
+        if cached is None:
+            return None
+        analysis = self._lookup("text", self._text_key(cached["text"], skill_catalogue.get().version))
+        return None if analysis is None else {"text": cached["text"], **analysis}
+
+    def store_document(self, data: bytes, filename: str, text: str, analysis: dict):
+        """Cache a document analyzed elsewhere (e.g. in a worker process)."""
+        if text.strip():
+            self._store(self._file_key(data, filename), {"text": text})
+        self._store(self._text_key(text, analysis["catalogue_version"]), analysis)
+
+    def stats(self) -> dict:
+        return {
+            "backend": ANALYSIS_CACHE_BACKEND if self.backend is not None else "none",
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "evictions": getattr(self.backend, "evictions", 0),
+        }
+
+
+def create_analysis_cache() -> AnalysisCache:
+    if ANALYSIS_CACHE_BACKEND == "redis":
+        redis = get_redis()
+        if redis is None:
+            logger.warning("ANALYSIS_CACHE_BACKEND=redis but REDIS_URL is not set; using memory cache")
+        else:
+            return AnalysisCache(RedisBackend(redis, ANALYSIS_CACHE_TTL))
+    if ANALYSIS_CACHE_BACKEND == "none":
+        return AnalysisCache(None)
+    if ANALYSIS_CACHE_BACKEND == "disk":
+        return AnalysisCache(DiskBackend(ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_TTL))
+    return AnalysisCache(MemoryBackend(ANALYSIS_CACHE_MEMORY_MAX_BYTES, ANALYSIS_CACHE_TTL))
+
+
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = create_analysis_cache()
+    return _analysis_cache
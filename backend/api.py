@@ -1,27 +1,56 @@
+import time
+_import_started = time.perf_counter()
+
 # FastAPI imports
-from fastapi import FastAPI, Request, Body, UploadFile, File, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Body, Query, UploadFile, File, Form, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 # Core libs
 import os
+import json
 import shutil
-import nltk
-import time
+import tempfile
+import asyncio
+from contextlib import asynccontextmanager
 
 # Backend modules
-from backend.text_preprocess import preprocess_text
-from backend.skill_extractor import load_and_prepare_skills, extract_skills
+from backend.skill_catalogue import skill_catalogue
+from backend.rule_engine import recommendation_rules
 from backend.matcher import calculate_match
-from backend.semantic_matcher import semantic_similarity
-from backend.hybrid_matcher import calculate_hybrid_score
-from backend.resume_parser import extract_resume_text
+from backend.semantic_matcher import (
+    semantic_similarity_async, semantic_similarity_to_vectors_async, get_embedding_cache, get_provider,
+    provider_breaker
+)
+from backend.redis_client import connect_redis
+from backend.hybrid_matcher import (
+    calculate_hybrid_score, calculate_skill_only_score, skill_only_weights, confidence_label
+)
+from backend.embedding_client import EmbeddingUnavailable
+from backend.deadline import start_deadline, deadline_scope, DeadlineExceeded
+from backend.bulk_ranker import iter_ranked, RANK_MAX_CANDIDATES
+from backend.job_index import get_job_index, ingest_jobs, search_jobs_for_resume
+from backend.resume_parser import shutdown_parser_pool, ResumeParseTimeout
+from backend.archive_ingest import (
+    iter_archive, shutdown_archive_pool, InvalidArchive, ArchiveTooLarge, ARCHIVE_MAX_BYTES
+)
 from backend.ats_recommender import generate_ats_recommendations
 from backend.resume_rewriter import generate_resume_improvements
+from backend.analysis_cache import get_analysis_cache
+from backend.job_profiles import get_job_profiles, summarize
+from backend.batch_jobs import (
+    get_batch_manager, shutdown_batch_manager, BatchQueueFull,
+    BATCH_MAX_RESUMES, BATCH_MAX_JOBS, BATCH_STREAM_IDLE_TIMEOUT, TERMINAL_STATES
+)
+from backend.text_preprocess import preprocess_text, PREPROCESS_BACKEND
+from backend.startup import startup
+from backend.metrics import registry, stage, degraded_response, MetricsMiddleware
+from backend.rate_limiter import RateLimitMiddleware, get_rate_limiter, RATE_LIMIT_BACKEND
 from backend.logger import logger
 
 
@@ -32,6 +61,8 @@ from backend.logger import logger
 # -------------------- NLTK SETUP --------------------
 
 def setup_nltk():
+    import nltk
+
     resources = [
         "punkt",
         "punkt_tab",
@@ -45,24 +76,63 @@ def setup_nltk():
             nltk.download(resource)
 
 
+# -------------------- STARTUP --------------------
+
+def warm_preprocessor():
+    if PREPROCESS_BACKEND == "nltk":
+        setup_nltk()
+    preprocess_text("Warm up the tokenizer backend")
+
+# Order matters: later phases reuse what earlier ones loaded
+startup.add_task("skill_catalogue", skill_catalogue.get)
+startup.add_task("recommendation_rules", recommendation_rules.get)
+startup.add_task("preprocessor", warm_preprocessor)
+startup.add_task("embedding_provider", get_provider)
+startup.add_task("redis", connect_redis, required=False)
+startup.add_task("rate_limiter", get_rate_limiter)
+startup.add_task("embedding_cache", get_embedding_cache)
+startup.add_task("analysis_cache", get_analysis_cache)
+startup.add_task("job_index", get_job_index, required=False)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Heavy dependencies load here (STARTUP_WARMUP=lazy|background|blocking), not at import
+    startup.begin()
+    yield
+    shutdown_batch_manager()
+    shutdown_parser_pool()
+    shutdown_archive_pool()
+
 # -------------------- FASTAPI APP --------------------
 
-limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="AI Resume Analyzer API")
+# The slowapi decorators apply only in the default per-process mode; the
+# token-bucket modes are enforced by RateLimitMiddleware instead
+limiter = Limiter(key_func=get_remote_address, enabled=RATE_LIMIT_BACKEND == "slowapi")
+app = FastAPI(title="AI Resume Analyzer API", lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 from fastapi.middleware.cors import CORSMiddleware
 
+# Cost-weighted token buckets (RATE_LIMIT_BACKEND=redis|memory). Added
+# before CORS so CORS wraps it: browsers can read its 429s, and preflights
+# are answered without being charged
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-RateLimit-Remaining"],
 )
 
+# Per-route request metrics and the optional Server-Timing header
+app.add_middleware(MetricsMiddleware)
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
 
 app.mount(
     "/assets",
@@ -75,12 +145,6 @@ templates = Jinja2Templates(
 )
 
 
-'''
-@app.on_event("startup")
-def startup_event():
-    setup_nltk()
-'''
-
 # -------------------- ROOT ENDPOINT --------------------
 
 # @app.get("/")
@@ -101,15 +165,15 @@ def parse_resume(request: Request, file: UploadFile = File(...)):
             detail="Invalid file format. Only PDF and DOCX are supported."
         )
 
-    temp_file_path = f"temp_{file.filename}"
-
     try:
-        # Save uploaded file temporarily
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # UploadFile is already spooled (memory, then disk past 1 MB); read it
+        # once and parse from memory instead of copying to a shared temp path
+        data = file.file.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Resume file is too large")
 
         # Extract resume text
-        text = extract_resume_text(temp_file_path)
+        text = get_analysis_cache().document_text(data, file.filename)
 
         if not text.strip():
             raise HTTPException(
@@ -123,14 +187,49 @@ def parse_resume(request: Request, file: UploadFile = File(...)):
             "text_preview": text[:500]
         }
 
+    except HTTPException:
+        raise
+    except ResumeParseTimeout:
+        logger.warning(f"Timed out parsing resume {file.filename}")
+        raise HTTPException(status_code=422, detail="Resume took too long to parse.")
     except Exception as e:
         logger.error(f"Error parsing resume {file.filename}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    finally:
-        # Always clean up temp file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+@app.post("/parse-resume/archive")
+@limiter.limit("2/minute")
+def parse_resume_archive(request: Request, file: UploadFile = File(...)):
+    logger.info(f"Parsing resume archive: {file.filename}")
+    if not file.filename.lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Invalid file format. Upload a ZIP of PDF and DOCX resumes.")
+
+    file.file.seek(0, os.SEEK_END)
+    if file.file.tell() > ARCHIVE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Resume archive is too large")
+    file.file.seek(0)
+
+    # The upload may be closed as soon as this handler returns, before the
+    # stream is read; the archive is copied to a file the stream owns and
+    # read in place from there, entry by entry
+    archive = tempfile.TemporaryFile()
+    try:
+        shutil.copyfileobj(file.file, archive)
+        archive.seek(0)
+        results = iter_archive(archive)
+    except Exception as e:
+        # A failed copy (full disk, client abort) or a rejected archive must not leak the file
+        archive.close()
+        if isinstance(e, InvalidArchive):
+            raise HTTPException(status_code=413 if isinstance(e, ArchiveTooLarge) else 400, detail=str(e))
+        raise
+
+    def stream():
+        # NDJSON: one line per file as it finishes, then a "done" summary with files/sec
+        with archive:
+            for record in results:
+                yield json.dumps(record) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.post("/preprocess-text")
 @limiter.limit("20/minute")
@@ -139,7 +238,7 @@ def preprocess_resume_text(request: Request, text: str = Body(..., embed=True)):
         raise HTTPException(status_code=400, detail="Input text is empty")
 
     try:
-        tokens = preprocess_text(text)
+        tokens = get_analysis_cache().analyze_text(text)["tokens"]
         return {
             "token_count": len(tokens),
             "tokens_preview": tokens[:30]
@@ -152,10 +251,7 @@ def preprocess_resume_text(request: Request, text: str = Body(..., embed=True)):
 @limiter.limit("10/minute")
 def extract_resume_skills(request: Request, text: str = Body(..., embed=True)):
     try:
-        tokens = preprocess_text(text)
-
-        prepared_skills = load_and_prepare_skills("data/skills.csv")
-        extracted_skills = extract_skills(tokens, prepared_skills)
+        extracted_skills = get_analysis_cache().analyze_text(text)["skills"]
 
         return {
             "skill_count": len(extracted_skills),
@@ -165,30 +261,43 @@ def extract_resume_skills(request: Request, text: str = Body(..., embed=True)):
         logger.error("Error extracting skills", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _job_profile(job_text, job_id):
+    # Match endpoints take either the posting text or the id of a registered profile
+    if (job_text is None) == (job_id is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of job_text or job_id")
+    if job_id is None:
+        return None
+    profile = get_job_profiles().get(job_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    return profile
+
+def _skill_match(resume_text, job_text, profile=None):
+    # CPU-bound part of the match pipeline; async handlers run it in the threadpool.
+    # Repeat texts are served from the analysis cache without re-running NLP,
+    # and registered profiles carry their skills precomputed.
+    resume_skills = get_analysis_cache().analyze_text(resume_text)["skills"]
+    if profile is not None:
+        job_skills = profile.skills
+    else:
+        job_skills = get_analysis_cache().analyze_text(job_text)["skills"]
+    return resume_skills, job_skills, calculate_match(resume_skills, job_skills)
+
 @app.post("/match-job")
 @limiter.limit("10/minute")
 def match_resume_to_job(
     request: Request,
     resume_text: str = Body(..., embed=True),
-    job_text: str = Body(..., embed=True)
+    job_text: str = Body(None, embed=True),
+    job_id: str = Body(None, embed=True)
 ):
     try:
-        if not resume_text.strip() or not job_text.strip():
+        profile = _job_profile(job_text, job_id)
+        if not resume_text.strip() or (profile is None and not job_text.strip()):
             raise HTTPException(status_code=400, detail="Resume or Job text is empty")
 
-        # Resume processing
-        resume_tokens = preprocess_text(resume_text)
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        SKILLS_PATH = os.path.join(BASE_DIR, "data", "skills.csv")
-        skills_list = load_and_prepare_skills(SKILLS_PATH)
-        resume_skills = extract_skills(resume_tokens, skills_list)
-
-        # Job description processing
-        job_tokens = preprocess_text(job_text)
-        job_skills = extract_skills(job_tokens, skills_list)
-
-        # Matching
-        match_result = calculate_match(resume_skills, job_skills)
+        # Resume and job description processing, then matching
+        resume_skills, job_skills, match_result = _skill_match(resume_text, job_text, profile)
 
         return {
             "resume_skills": resume_skills,
@@ -205,16 +314,23 @@ def match_resume_to_job(
 
 @app.post("/semantic-match")
 @limiter.limit("10/minute")
-def semantic_match(
+async def semantic_match(
     request: Request,
     resume_text: str = Body(..., embed=True),
-    job_text: str = Body(..., embed=True)
+    job_text: str = Body(None, embed=True),
+    job_id: str = Body(None, embed=True)
 ):
     try:
-        if not resume_text.strip() or not job_text.strip():
+        profile = await run_in_threadpool(_job_profile, job_text, job_id)
+        if not resume_text.strip() or (profile is None and not job_text.strip()):
             raise HTTPException(status_code=400, detail="Text input cannot be empty")
 
-        score = semantic_similarity(resume_text, job_text)
+        score, degraded_reason = await _semantic(resume_text, job_text, profile, start_deadline())
+        if degraded_reason is not None:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Semantic matching is temporarily unavailable ({degraded_reason})"
+            )
 
         return {
             "semantic_match_percentage": score
@@ -225,59 +341,166 @@ def semantic_match(
         logger.error("Error during semantic matching", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/final-match")
-@limiter.limit("5/minute")
-def final_match(
-    request: Request,
-    resume_text: str = Body(..., embed=True),
-    job_text: str = Body(..., embed=True)
-):
-    logger.info("Final match calculation started")
-    start_time = time.time()
-    try:
-        # Resume processing
-        resume_tokens = preprocess_text(resume_text)
-        skills_list = load_and_prepare_skills("data/skills.csv")
-        resume_skills = extract_skills(resume_tokens, skills_list)
+def _recommendations(resume_skills, job_skills, missing_skills, final_score):
+    with stage("recommendations"):
+        recommendations = generate_ats_recommendations(
+            resume_skills,
+            job_skills,
+            missing_skills,
+            final_score
+        )
+        rewrite_suggestions = generate_resume_improvements(
+            resume_skills,
+            job_skills,
+            missing_skills
+        )
+    return recommendations, rewrite_suggestions
 
-        # Job processing
-        job_tokens = preprocess_text(job_text)
-        job_skills = extract_skills(job_tokens, skills_list)
+def _hybrid(skill_match_percentage, semantic_match_percentage):
+    # Embedding matching reuses semantic match since both are now embedding-based
+    with stage("hybrid"):
+        return calculate_hybrid_score(
+            skill_match_percentage,
+            semantic_match_percentage,
+            semantic_match_percentage
+        )
 
-        # Skill-based matching
-        match_result = calculate_match(resume_skills, job_skills)
+def _final_score(skill_match_percentage, semantic_match_percentage, degraded_reason):
+    # Without a semantic score the result is flagged and skill-only: the skill
+    # score at weight 1.0, clamped to 0-100 (not a hybrid with semantic as 0)
+    if degraded_reason is None:
+        return _hybrid(skill_match_percentage, semantic_match_percentage), {"degraded": False}
+    with stage("hybrid"):
+        final_score = calculate_skill_only_score(skill_match_percentage)
+    return final_score, {
+        "degraded": True,
+        "degraded_reason": degraded_reason,
+        "score_weights": skill_only_weights()
+    }
+
+async def _semantic(resume_text, job_text, profile=None, deadline=None):
+    """(score, None), or (None, reason) when the request has to do without it."""
+    if profile is not None and profile.vectors is None:
+        # A stale registered posting whose embeddings could not be recomputed
+        return _without_semantic("provider_error")
+    with deadline_scope(deadline), stage("semantic"):
+        try:
+            if profile is not None:
+                similarity = semantic_similarity_to_vectors_async(resume_text, profile.vectors)
+            else:
+                similarity = semantic_similarity_async(resume_text, job_text)
+            if deadline is None:
+                return await similarity, None
+            # Bounds cache lookups as well as provider calls
+            return await asyncio.wait_for(similarity, deadline.remaining()), None
+        except DeadlineExceeded:
+            reason = "deadline"
+        except EmbeddingUnavailable:
+            reason = "circuit_open"
+        except asyncio.TimeoutError:
+            reason = "deadline" if deadline is not None and deadline.expired else "provider_error"
+        except Exception as e:
+            logger.error(f"Semantic similarity calculation failed: {e}")
+            reason = "provider_error"
+    return _without_semantic(reason)
+
+def _without_semantic(reason):
+    logger.warning(f"Semantic score unavailable ({reason}); using the skill-only score")
+    degraded_response(reason)
+    return None, reason
+
+def _stream_event(payload, sse):
+    if sse:
+        return f"event: {payload['stage']}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps(payload) + "\n"
+
+async def _final_match_events(resume_text, job_text, sse, profile=None):
+    # Skills are local CPU work and go out first; the embedding calls are
+    # already in flight and their results follow as soon as they land
+    start_time = time.perf_counter()
+    semantic_task = asyncio.create_task(_semantic(resume_text, job_text, profile, start_deadline()))
+    try:
+        resume_skills, job_skills, match_result = await run_in_threadpool(
+            _skill_match, resume_text, job_text, profile
+        )
         skill_match_percentage = match_result["match_percentage"]
+        yield _stream_event({
+            "stage": "skills",
+            "resume_skills": resume_skills,
+            "job_skills": job_skills,
+            "skill_match_percentage": skill_match_percentage,
+            "common_skills": match_result["common_skills"],
+            "missing_skills": match_result["missing_skills"]
+        }, sse)
 
-        # Semantic matching
-        semantic_match_percentage = semantic_similarity(resume_text, job_text)
+        semantic_match_percentage, degraded_reason = await semantic_task
+        yield _stream_event({
+            "stage": "semantic",
+            "semantic_match_percentage": semantic_match_percentage,
+            "embedding_match_percentage": semantic_match_percentage,
+            "degraded": degraded_reason is not None
+        }, sse)
 
-        # Embedding matching
-        embedding_match_percentage = semantic_match_percentage # Reuse semantic match since both are now embedding-based
+        final_score, score_flags = _final_score(skill_match_percentage, semantic_match_percentage, degraded_reason)
+        yield _stream_event({
+            "stage": "hybrid",
+            "final_match_percentage": final_score,
+            "confidence": confidence_label(final_score),
+            **score_flags
+        }, sse)
 
-        # Hybrid score
-        final_score = calculate_hybrid_score(
-            skill_match_percentage,
-            semantic_match_percentage,
-            embedding_match_percentage
+        recommendations, rewrite_suggestions = _recommendations(
+            resume_skills, job_skills, match_result["missing_skills"], final_score
         )
-        logger.info(f"Calculated match score: {final_score}%")
+        yield _stream_event({
+            "stage": "recommendations",
+            "ats_recommendations": recommendations,
+            "rewrite_suggestions": rewrite_suggestions
+        }, sse)
+        yield _stream_event({"stage": "done", "elapsed_ms": round((time.perf_counter() - start_time) * 1000, 1)}, sse)
+    except Exception:
+        logger.error("Error during streamed matching", exc_info=True)
+        yield _stream_event({"stage": "error", "detail": "Internal Server Error during matching process"}, sse)
+    finally:
+        if not semantic_task.done():
+            semantic_task.cancel()
 
-        recommendations = generate_ats_recommendations(
-            resume_skills,
-            job_skills,
-            match_result["missing_skills"],
-            final_score
+@app.post("/final-match")
+@limiter.limit("5/minute")
+async def final_match(
+    request: Request,
+    resume_text: str = Body(..., embed=True),
+    job_text: str = Body(None, embed=True),
+    job_id: str = Body(None, embed=True),
+    stream: bool = Body(False, embed=True)
+):
+    profile = await run_in_threadpool(_job_profile, job_text, job_id)
+    if stream:
+        # Server-Sent Events when the client asks for them, NDJSON otherwise
+        sse = "text/event-stream" in request.headers.get("accept", "")
+        return StreamingResponse(
+            _final_match_events(resume_text, job_text, sse, profile),
+            media_type="text/event-stream" if sse else "application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
         )
 
-        confidence = (
-            "Strong" if final_score >= 75 else
-            "Medium" if final_score >= 50 else
-            "Weak"
+    logger.info("Final match calculation started")
+    start_time = time.perf_counter()
+    try:
+        # Skill matching (threadpool) and the embedding calls run concurrently;
+        # the embedding side is cut off at the request's latency budget
+        (resume_skills, job_skills, match_result), (semantic_match_percentage, degraded_reason) = await asyncio.gather(
+            run_in_threadpool(_skill_match, resume_text, job_text, profile),
+            _semantic(resume_text, job_text, profile, start_deadline())
         )
-        rewrite_suggestions = generate_resume_improvements(
-            resume_skills,
-            job_skills,
-            match_result["missing_skills"]
+        skill_match_percentage = match_result["match_percentage"]
+        embedding_match_percentage = semantic_match_percentage
+
+        final_score, score_flags = _final_score(skill_match_percentage, semantic_match_percentage, degraded_reason)
+        logger.info(f"Calculated match score: {final_score}%")
+
+        recommendations, rewrite_suggestions = _recommendations(
+            resume_skills, job_skills, match_result["missing_skills"], final_score
         )
 
         return {
@@ -290,16 +513,265 @@ def final_match(
             "common_skills": match_result["common_skills"],
             "missing_skills": match_result["missing_skills"],
             "ats_recommendations": recommendations,
-            "confidence": confidence,
-            "rewrite_suggestions": rewrite_suggestions
+            "confidence": confidence_label(final_score),
+            "rewrite_suggestions": rewrite_suggestions,
+            **score_flags
         }
     except Exception as e:
         logger.error("Error during matching", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error during matching process")
     finally:
-        end_time = time.time()
+        end_time = time.perf_counter()
         logger.info(f"Final match request completed in {round(end_time - start_time, 2)} seconds")
 
+@app.post("/rank")
+@limiter.limit("5/minute")
+def rank(
+    request: Request,
+    job_text: str = Body(None, embed=True),
+    resume_texts: list[str] = Body(None, embed=True),
+    resume_text: str = Body(None, embed=True),
+    job_texts: list[str] = Body(None, embed=True),
+    ids: list[str] = Body(None, embed=True),
+    top_k: int = Body(None, embed=True, gt=0),
+    stream: bool = Body(False, embed=True)
+):
+    # Either one job against N resumes, or one resume against N jobs
+    if job_text and resume_texts and not (resume_text or job_texts):
+        query_text, candidate_texts, candidates_are = job_text, resume_texts, "resumes"
+    elif resume_text and job_texts and not (job_text or resume_texts):
+        query_text, candidate_texts, candidates_are = resume_text, job_texts, "jobs"
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either job_text with resume_texts, or resume_text with job_texts"
+        )
+
+    if len(candidate_texts) > RANK_MAX_CANDIDATES:
+        raise HTTPException(status_code=413, detail=f"At most {RANK_MAX_CANDIDATES} candidates per request")
+    if ids is not None and len(ids) != len(candidate_texts):
+        raise HTTPException(status_code=400, detail="ids must have one entry per candidate")
+
+    rows = iter_ranked(query_text, candidate_texts, candidates_are, top_k, ids)
+
+    if stream:
+        def ranked_lines():
+            # The status line is already sent; a failure ends the stream with an error line
+            try:
+                for row in rows:
+                    yield json.dumps(row) + "\n"
+            except Exception:
+                logger.error("Error during streamed ranking", exc_info=True)
+                yield json.dumps({"error": "Internal Server Error during ranking"}) + "\n"
+
+        return StreamingResponse(ranked_lines(), media_type="application/x-ndjson")
+
+    try:
+        return {"candidates": candidates_are, "results": list(rows)}
+    except Exception as e:
+        logger.error("Error during bulk ranking", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------- JOB PROFILES --------------------
+
+@app.post("/jobs/profiles")
+@limiter.limit("10/minute")
+def register_job_profile(
+    request: Request,
+    job_text: str = Body(..., embed=True),
+    title: str = Body(None, embed=True),
+    job_id: str = Body(None, embed=True)
+):
+    if not job_text.strip():
+        raise HTTPException(status_code=400, detail="Job text is empty")
+    try:
+        return summarize(get_job_profiles().register(job_text, title, job_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error registering job profile", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs/profiles")
+def list_job_profiles():
+    return {"profiles": get_job_profiles().list()}
+
+@app.get("/jobs/profiles/{job_id}")
+def get_job_profile(job_id: str):
+    profile = get_job_profiles().get(job_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Job profile not found")
+    return summarize(profile)
+
+@app.delete("/jobs/profiles/{job_id}")
+def delete_job_profile(job_id: str):
+    if not get_job_profiles().delete(job_id):
+        raise HTTPException(status_code=404, detail="Job profile not found")
+    return {"deleted": job_id}
+
+# -------------------- JOB INDEX --------------------
+
+@app.post("/jobs/index")
+@limiter.limit("10/minute")
+def index_jobs(request: Request, jobs: list[dict] = Body(..., embed=True)):
+    if not jobs or any(not job.get("job_id") or not str(job.get("text", "")).strip() for job in jobs):
+        raise HTTPException(status_code=400, detail="Each job needs a job_id and non-empty text")
+    try:
+        added = ingest_jobs(jobs)
+        return {"added": added, "index": get_job_index().stats()}
+    except Exception as e:
+        logger.error("Error indexing jobs", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/jobs/index/{job_id}")
+def delete_indexed_job(job_id: str):
+    if not get_job_index().delete(job_id):
+        raise HTTPException(status_code=404, detail="Job not found in index")
+    return {"deleted": job_id}
+
+@app.post("/jobs/index/compact")
+def compact_job_index():
+    return get_job_index().compact()
+
+@app.get("/jobs/index")
+def job_index_stats():
+    return get_job_index().stats()
+
+@app.post("/jobs/search")
+@limiter.limit("20/minute")
+def search_jobs(
+    request: Request,
+    resume_text: str = Body(..., embed=True),
+    top_k: int = Body(10, embed=True, gt=0, le=100),
+    mode: str = Body("exact", embed=True, pattern="^(exact|approx)$")
+):
+    if not resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text is empty")
+    try:
+        return {"results": search_jobs_for_resume(resume_text, top_k, mode)}
+    except Exception as e:
+        logger.error("Error searching jobs", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------- BATCH ANALYSIS --------------------
+
+def _batch_jobs(job_texts, job_ids):
+    if not job_texts or any(not text.strip() for text in job_texts):
+        raise HTTPException(status_code=400, detail="Provide at least one non-empty job description")
+    if len(job_texts) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_JOBS} job descriptions per batch")
+    if job_ids is not None and len(job_ids) != len(job_texts):
+        raise HTTPException(status_code=400, detail="job_ids must have one entry per job description")
+    return [
+        {"id": job_ids[i] if job_ids else i, "text": text}
+        for i, text in enumerate(job_texts)
+    ]
+
+def _submit_batch(resumes, jobs):
+    if not resumes:
+        raise HTTPException(status_code=400, detail="Provide at least one resume")
+    if len(resumes) > BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_RESUMES} resumes per batch")
+    try:
+        record = get_batch_manager().submit(resumes, jobs)
+    except BatchQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Batch queue is full: {e}", headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content=record)
+
+@app.post("/batches")
+@limiter.limit("10/minute")
+def submit_batch(
+    request: Request,
+    resume_texts: list[str] = Body(..., embed=True),
+    job_texts: list[str] = Body(..., embed=True),
+    resume_ids: list[str] = Body(None, embed=True),
+    job_ids: list[str] = Body(None, embed=True)
+):
+    if resume_ids is not None and len(resume_ids) != len(resume_texts):
+        raise HTTPException(status_code=400, detail="resume_ids must have one entry per resume")
+    resumes = [
+        {"id": resume_ids[i] if resume_ids else i, "text": text}
+        for i, text in enumerate(resume_texts)
+    ]
+    return _submit_batch(resumes, _batch_jobs(job_texts, job_ids))
+
+@app.post("/batches/upload")
+@limiter.limit("10/minute")
+def submit_batch_upload(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    job_texts: list[str] = Form(...),
+    job_ids: list[str] = Form(None)
+):
+    jobs = _batch_jobs(job_texts, job_ids)
+    resumes = []
+    for upload in files:
+        if not upload.filename.lower().endswith((".pdf", ".docx")):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {upload.filename}")
+        data = upload.file.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Resume file is too large: {upload.filename}")
+        resumes.append({"id": upload.filename, "filename": upload.filename, "data": data})
+    return _submit_batch(resumes, jobs)
+
+def _batch_status_or_404(batch_id):
+    record = get_batch_manager().status(batch_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return record
+
+@app.get("/batches/{batch_id}")
+def batch_status(batch_id: str):
+    return _batch_status_or_404(batch_id)
+
+@app.get("/batches/{batch_id}/results")
+def batch_results(batch_id: str, offset: int = 0, limit: int = 100):
+    record = _batch_status_or_404(batch_id)
+    results = get_batch_manager().results(batch_id, offset, limit)
+    return {"status": record, "offset": offset, "results": results}
+
+@app.get("/batches/{batch_id}/stream")
+async def stream_batch(batch_id: str, poll_interval: float = Query(0.5, ge=0.1, le=10)):
+    _batch_status_or_404(batch_id)
+    manager = get_batch_manager()
+
+    async def events():
+        # NDJSON: each new result as it lands, a progress line whenever it
+        # changes, and a final status line once the batch is done
+        offset = 0
+        last_progress = None
+        last_change = time.monotonic()
+        while True:
+            record = await run_in_threadpool(manager.status, batch_id)
+            results = await run_in_threadpool(manager.results, batch_id, offset)
+            for result in results:
+                yield json.dumps({"type": "result", **result}) + "\n"
+            offset += len(results)
+            if results:
+                last_change = time.monotonic()
+            if record["status"] in TERMINAL_STATES and offset >= record["completed"] + record["failed"]:
+                yield json.dumps({"type": "done", **record}) + "\n"
+                return
+            progress = (record["status"], record["progress"])
+            if progress != last_progress:
+                last_progress = progress
+                last_change = time.monotonic()
+                yield json.dumps({"type": "progress", **record}) + "\n"
+            elif time.monotonic() - last_change > BATCH_STREAM_IDLE_TIMEOUT:
+                # The batch is still live but stalled; the client can reconnect or poll
+                yield json.dumps({"type": "idle_timeout", **record}) + "\n"
+                return
+            await asyncio.sleep(poll_interval)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/batches/{batch_id}/cancel")
+def cancel_batch(batch_id: str):
+    record = get_batch_manager().cancel(batch_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return record
+
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
     logger.info("Home page requested")
@@ -308,6 +780,45 @@ def home(request: Request):
         {"request": request}
     )
 
+@app.get("/skills/catalogue")
+def skill_catalogue_info():
+    return skill_catalogue.info()
+
+@app.get("/recommendations/rules")
+def recommendation_rules_info():
+    return recommendation_rules.info()
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "embedding": get_embedding_cache().stats(),
+        "analysis": get_analysis_cache().stats(),
+        "embedding_provider": provider_breaker.stats()
+    }
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition format, per process
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/live")
+def liveness():
+    # The process is up and serving; says nothing about dependencies
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness():
+    report = startup.report()
+    if not report["ready"]:
+        return JSONResponse(status_code=503, content={"status": report["state"], "startup": report})
+    return {"status": "ready", "startup": report}
+
+@app.get("/health/startup")
+def startup_timings():
+    return startup.report()
+
+startup.record("import_backend_api", time.perf_counter() - _import_started)
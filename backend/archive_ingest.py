@@ -0,0 +1,330 @@
+"""
+Bulk resume ingestion from a ZIP archive.
+
+Entries are read one at a time straight out of the archive (nothing is
+extracted to disk) and fanned out to a bounded process pool that extracts
+the text and skills of each resume. One result per entry is produced as
+soon as it finishes, in completion order, followed by a summary with the
+throughput. Already analyzed files are answered from the analysis cache.
+An entry that overruns its timeout fails alone: only the worker process
+stuck on it is killed and replaced.
+
+    python -m backend.archive_ingest resumes.zip > results.ndjson
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from collections import Counter
+
+from backend.analysis_cache import AnalysisCache, get_analysis_cache
+from backend.logger import logger
+from backend.metrics import archive_file
+from backend.resume_parser import iter_resume_text, PDF_PARSE_TIMEOUT
+from backend.skill_catalogue import skill_catalogue
+from backend.worker_pool import WorkerPool, WorkerTimeout
+
+# Compressed size of an uploaded archive
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", 200 * 1024 * 1024))
+# Zip bomb limits, checked against the central directory before any entry is read
+ARCHIVE_MAX_ENTRIES = int(os.getenv("ARCHIVE_MAX_ENTRIES", 1000))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", 1024 * 1024 * 1024))
+# ... and per entry (those entries are reported as errors, the rest still run)
+ARCHIVE_MAX_ENTRY_BYTES = int(os.getenv("ARCHIVE_MAX_ENTRY_BYTES", 10 * 1024 * 1024))
+ARCHIVE_MAX_RATIO = float(os.getenv("ARCHIVE_MAX_RATIO", 100))
+# 0 analyzes in-process (no isolation, no timeout)
+ARCHIVE_WORKERS = int(os.getenv("ARCHIVE_WORKERS", min(4, os.cpu_count() or 1)))
+# Entries read ahead of the pool per archive; bounds the bytes held for one upload
+ARCHIVE_MAX_IN_FLIGHT = int(os.getenv("ARCHIVE_MAX_IN_FLIGHT", 2 * max(ARCHIVE_WORKERS, 1)))
+# Per entry, counted from when a worker process picks it up
+ARCHIVE_ENTRY_TIMEOUT = float(os.getenv("ARCHIVE_ENTRY_TIMEOUT", PDF_PARSE_TIMEOUT))
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+PREVIEW_CHARS = 200
+
+
+class InvalidArchive(ValueError):
+    pass
+
+
+class ArchiveTooLarge(InvalidArchive):
+    pass
+
+
+# -------------------- WORKERS --------------------
+
+# Runs the same NLP stages as the API, without a cache in the worker process
+_uncached = AnalysisCache(None)
+
+
+def analyze_resume_bytes(data: bytes, filename: str) -> dict:
+    """Text, tokens and skills of one resume, parsed in this process."""
+    # Pool workers are daemons and cannot start the PDF page pool; pages are read inline
+    text = "\n".join(iter_resume_text(data, filename)).strip()
+    return {"text": text, **_uncached.analyze_text(text)}
+
+
+def _init_worker():
+    # Load the catalogue and the NLP models once per worker instead of per file
+    _uncached.analyze_text("warm up")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int = ARCHIVE_WORKERS):
+    # Shared by every archive in the process; the first caller sizes it.
+    # Model loading runs in the initializer and is not charged to any entry
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(workers, initializer=_init_worker)
+        return _pool
+
+
+def shutdown_archive_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# -------------------- ARCHIVE --------------------
+
+def _open_archive(source, max_entries: int, max_total_bytes: int):
+    try:
+        archive = zipfile.ZipFile(source)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise InvalidArchive(f"Not a readable ZIP archive: {e}")
+
+    infos = [
+        info for info in archive.infolist()
+        # Folders and macOS resource forks are not files the sender picked
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+    ]
+    total = sum(info.file_size for info in infos)
+    if len(infos) > max_entries:
+        archive.close()
+        raise ArchiveTooLarge(f"Archive has {len(infos)} files; at most {max_entries} are allowed")
+    if total > max_total_bytes:
+        archive.close()
+        raise ArchiveTooLarge(f"Archive expands to {total} bytes; at most {max_total_bytes} are allowed")
+    return archive, infos
+
+
+def _entry_problem(info, max_entry_bytes: int, max_ratio: float):
+    """(status, reason) for an entry that must not be parsed, else None."""
+    if os.path.splitext(info.filename)[1].lower() not in RESUME_EXTENSIONS:
+        return "skipped", "Unsupported file format. Only PDF and DOCX are allowed."
+    if info.flag_bits & 0x1:
+        return "error", "Encrypted entries are not supported"
+    if info.file_size > max_entry_bytes:
+        return "error", f"Entry expands to {info.file_size} bytes; at most {max_entry_bytes} are allowed"
+    if info.file_size > max_ratio * max(info.compress_size, 1):
+        return "error", f"Compression ratio above {max_ratio:g}:1"
+    return None
+
+
+def _read_entry(archive, info, max_entry_bytes: int) -> bytes:
+    # zipfile stops at the declared size (already checked); the cap is a second guard
+    with archive.open(info) as f:
+        data = f.read(max_entry_bytes + 1)
+    if len(data) > max_entry_bytes:
+        raise InvalidArchive("Entry is larger than its declared size")
+    return data
+
+
+def _result(index, filename, status, started, **fields) -> dict:
+    archive_file(status)
+    return {
+        "type": "result",
+        "index": index,
+        "filename": filename,
+        "status": status,
+        **fields,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 2),
+    }
+
+
+def _analysis_result(index, filename, analysis, cached, started) -> dict:
+    text = analysis["text"]
+    return _result(
+        index, filename, "ok" if text else "empty", started,
+        cached=cached,
+        skills=analysis["skills"],
+        text_length=len(text),
+        text_preview=text[:PREVIEW_CHARS],
+    )
+
+
+class _Task:
+    __slots__ = ("index", "filename", "data", "started")
+
+    def __init__(self, index, filename, data):
+        self.index = index
+        self.filename = filename
+        self.data = data
+        self.started = time.monotonic()
+
+
+def _entries(archive, infos, cache, max_entry_bytes, max_ratio):
+    """Finished results (skips, errors, cache hits) and _Tasks still to analyze, in archive order."""
+    for index, info in enumerate(infos):
+        started = time.monotonic()
+        problem = _entry_problem(info, max_entry_bytes, max_ratio)
+        if problem is not None:
+            status, reason = problem
+            yield _result(index, info.filename, status, started, error=reason)
+            continue
+        try:
+            data = _read_entry(archive, info, max_entry_bytes)
+        except Exception as e:
+            yield _result(index, info.filename, "error", started, error=f"Unreadable entry: {e}")
+            continue
+        cached = cache.cached_document(data, info.filename)
+        if cached is not None:
+            yield _analysis_result(index, info.filename, cached, True, started)
+        else:
+            yield _Task(index, info.filename, data)
+
+
+def _finish(task, analysis, error, cache) -> dict:
+    if error is not None:
+        return _result(task.index, task.filename, "error", task.started, error=str(error) or type(error).__name__)
+    text = analysis.pop("text")
+    cache.store_document(task.data, task.filename, text, analysis)
+    return _analysis_result(task.index, task.filename, {"text": text, **analysis}, False, task.started)
+
+
+def _run_inline(entries, cache):
+    for item in entries:
+        if isinstance(item, _Task):
+            try:
+                item = _finish(item, analyze_resume_bytes(item.data, item.filename), None, cache)
+            except Exception as e:
+                item = _finish(item, None, e, cache)
+        yield item
+
+
+def _run_pooled(entries, cache, workers: int, max_in_flight: int, timeout: float):
+    pool = _get_pool(workers)
+    done = queue.Queue()
+
+    def analyze(task):
+        # One thread per task in flight, blocked on its worker process
+        try:
+            analysis, error = pool.run(analyze_resume_bytes, (task.data, task.filename), timeout=timeout), None
+        except WorkerTimeout:
+            logger.warning(f"Timed out analyzing archive entry {task.filename}")
+            analysis, error = None, TimeoutError(f"Parsing exceeded {timeout}s")
+        except Exception as e:
+            analysis, error = None, e
+        done.put((task, analysis, error))
+
+    in_flight = 0
+    exhausted = False
+    while not exhausted or in_flight:
+        # Read ahead only while the pool has room, so memory stays bounded
+        while not exhausted and in_flight < max_in_flight:
+            item = next(entries, None)
+            if item is None:
+                exhausted = True
+            elif isinstance(item, _Task):
+                threading.Thread(target=analyze, args=(item,), daemon=True).start()
+                in_flight += 1
+            else:
+                yield item
+        if in_flight:
+            task, analysis, error = done.get()
+            in_flight -= 1
+            yield _finish(task, analysis, error, cache)
+
+
+def _summarize(results, started):
+    counts = Counter()
+    for record in results:
+        counts[record["status"]] += 1
+        counts["cached"] += bool(record.get("cached"))
+        yield record
+
+    elapsed = time.monotonic() - started
+    files = counts["ok"] + counts["empty"] + counts["error"]
+    yield {
+        "type": "done",
+        "files": files,
+        **{status: counts[status] for status in ("ok", "empty", "error", "skipped", "cached")},
+        "elapsed_s": round(elapsed, 3),
+        "files_per_sec": round(files / elapsed, 2) if elapsed else None,
+    }
+
+
+def iter_archive(
+    source,
+    workers: int = ARCHIVE_WORKERS,
+    max_in_flight: int = ARCHIVE_MAX_IN_FLIGHT,
+    timeout: float = ARCHIVE_ENTRY_TIMEOUT,
+    max_entries: int = ARCHIVE_MAX_ENTRIES,
+    max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES,
+    max_entry_bytes: int = ARCHIVE_MAX_ENTRY_BYTES,
+    max_ratio: float = ARCHIVE_MAX_RATIO,
+    cache: AnalysisCache = None,
+):
+    """
+    Analyze every resume in a ZIP archive (a path or a seekable binary file).
+
+    The archive is validated here, so InvalidArchive / ArchiveTooLarge are
+    raised before anything runs. Iterating the returned generator yields one
+    "result" record per file as it finishes and a final "done" summary.
+    """
+    started = time.monotonic()
+    archive, infos = _open_archive(source, max_entries, max_total_bytes)
+    cache = cache or get_analysis_cache()
+    skill_catalogue.get()
+
+    def run():
+        with archive:
+            entries = _entries(archive, infos, cache, max_entry_bytes, max_ratio)
+            if workers <= 0:
+                yield from _summarize(_run_inline(entries, cache), started)
+            else:
+                yield from _summarize(_run_pooled(entries, cache, workers, max(max_in_flight, 1), timeout), started)
+
+    return run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", help="ZIP of PDF and DOCX resumes")
+    parser.add_argument("--workers", type=int, default=ARCHIVE_WORKERS, help="0 parses in-process")
+    parser.add_argument("--output", help="write NDJSON here instead of stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in iter_archive(args.archive, workers=args.workers):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    except InvalidArchive as e:
+        sys.exit(f"error: {e}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        shutdown_archive_pool()
+
+    print(
+        f"{record['files']} files ({record['ok']} ok, {record['empty']} empty, {record['error']} failed, "
+        f"{record['skipped']} skipped, {record['cached']} cached) in {record['elapsed_s']}s: "
+        f"{record['files_per_sec']} files/s",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
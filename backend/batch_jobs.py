@@ -0,0 +1,516 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.analysis_cache import get_analysis_cache
+from backend.hybrid_matcher import calculate_hybrid_score
+from backend.matcher import calculate_match
+from backend.metrics import stage
+from backend.redis_client import get_redis
+from backend.semantic_matcher import embed_document, pool_similarity
+from backend.logger import logger
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# auto (Redis when configured, else SQLite) | redis | sqlite | memory
+BATCH_STORE = os.getenv("BATCH_STORE", "auto")
+BATCH_DB_PATH = os.getenv("BATCH_DB_PATH", os.path.join(BASE_DIR, ".cache", "batch_jobs.sqlite3"))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+# Backpressure: resumes queued or in flight across all batches in this process
+BATCH_MAX_PENDING = int(os.getenv("BATCH_MAX_PENDING", 1000))
+# ... and the bytes of their uploads and texts, which are held in memory until they run
+BATCH_MAX_PENDING_BYTES = int(os.getenv("BATCH_MAX_PENDING_BYTES", 256 * 1024 * 1024))
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", 500))
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", 20))
+BATCH_RESULT_TTL = int(os.getenv("BATCH_RESULT_TTL", 24 * 3600))
+# The process running a batch refreshes its heartbeat this often; a batch whose
+# heartbeat is older than BATCH_ORPHAN_AFTER lost its process and is failed
+BATCH_HEARTBEAT_INTERVAL = float(os.getenv("BATCH_HEARTBEAT_INTERVAL", 10))
+BATCH_ORPHAN_AFTER = float(os.getenv("BATCH_ORPHAN_AFTER", 60))
+# /batches/{id}/stream ends after this long without a new result or progress change
+BATCH_STREAM_IDLE_TIMEOUT = float(os.getenv("BATCH_STREAM_IDLE_TIMEOUT", 300))
+
+TERMINAL_STATES = ("completed", "cancelled", "failed")
+
+
+class BatchQueueFull(Exception):
+    pass
+
+
+def _new_record(batch_id: str, total: int, jobs: int) -> dict:
+    now = time.time()
+    return {
+        "batch_id": batch_id,
+        "status": "queued",
+        "total": total,
+        "jobs": jobs,
+        "completed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "cancel_requested": False,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "heartbeat_at": now,
+        "finished_at": None,
+    }
+
+
+# -------------------- STORES --------------------
+
+class MemoryStore:
+    """Batch records and results in process memory (tests, single-process dev)."""
+
+    def __init__(self):
+        self._records = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def create(self, record: dict):
+        with self._lock:
+            self._records[record["batch_id"]] = dict(record)
+            self._results[record["batch_id"]] = []
+
+    def get(self, batch_id: str):
+        with self._lock:
+            record = self._records.get(batch_id)
+            return dict(record) if record is not None else None
+
+    def update(self, batch_id: str, **fields):
+        with self._lock:
+            self._records[batch_id].update(fields, updated_at=time.time())
+
+    def incr(self, batch_id: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            record = self._records[batch_id]
+            record[field] += amount
+            record["updated_at"] = time.time()
+            return record[field]
+
+    def add_result(self, batch_id: str, result: dict):
+        with self._lock:
+            self._results[batch_id].append(result)
+
+    def results(self, batch_id: str, offset: int = 0, limit: int = None) -> list:
+        with self._lock:
+            items = self._results.get(batch_id, [])
+            return list(items[offset:offset + limit if limit is not None else None])
+
+
+class SQLiteStore:
+    """
+    Batch records and results in a local SQLite file, so progress survives a
+    restart and is visible to every worker process on the host.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS batches (batch_id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batch_results ("
+            "batch_id TEXT NOT NULL, seq INTEGER PRIMARY KEY AUTOINCREMENT, result TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS batch_results_batch ON batch_results (batch_id, seq)")
+        self._lock = threading.Lock()
+
+    def create(self, record: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO batches (batch_id, record) VALUES (?, ?)", (record["batch_id"], json.dumps(record))
+            )
+
+    def get(self, batch_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _modify(self, batch_id: str, change):
+        # Read-modify-write under SQLite's write lock, safe across processes
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT record FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+                record = json.loads(row[0])
+                change(record)
+                record["updated_at"] = time.time()
+                self._conn.execute(
+                    "UPDATE batches SET record = ? WHERE batch_id = ?", (json.dumps(record), batch_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return record
+
+    def update(self, batch_id: str, **fields):
+        self._modify(batch_id, lambda record: record.update(fields))
+
+    def incr(self, batch_id: str, field: str, amount: int = 1) -> int:
+        def change(record):
+            record[field] += amount
+        return self._modify(batch_id, change)[field]
+
+    def add_result(self, batch_id: str, result: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO batch_results (batch_id, result) VALUES (?, ?)", (batch_id, json.dumps(result))
+            )
+
+    def results(self, batch_id: str, offset: int = 0, limit: int = None) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM batch_results WHERE batch_id = ? ORDER BY seq LIMIT ? OFFSET ?",
+                (batch_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class RedisStore:
+    """
+    Batch record as a hash and results as a list, both expiring after
+    BATCH_RESULT_TTL, so any API worker can serve status and results.
+    """
+
+    def __init__(self, client, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(batch_id: str) -> str:
+        return f"batch:{batch_id}"
+
+    def create(self, record: dict):
+        key = self._key(record["batch_id"])
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={field: json.dumps(value) for field, value in record.items()})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get(self, batch_id: str):
+        data = self.client.hgetall(self._key(batch_id))
+        if not data:
+            return None
+        return {
+            (field.decode() if isinstance(field, bytes) else field): json.loads(value)
+            for field, value in data.items()
+        }
+
+    def update(self, batch_id: str, **fields):
+        fields["updated_at"] = time.time()
+        self.client.hset(self._key(batch_id), mapping={field: json.dumps(value) for field, value in fields.items()})
+
+    def incr(self, batch_id: str, field: str, amount: int = 1) -> int:
+        key = self._key(batch_id)
+        pipe = self.client.pipeline()
+        pipe.hincrby(key, field, amount)
+        pipe.hset(key, "updated_at", json.dumps(time.time()))
+        return pipe.execute()[0]
+
+    def add_result(self, batch_id: str, result: dict):
+        key = f"{self._key(batch_id)}:results"
+        pipe = self.client.pipeline()
+        pipe.rpush(key, json.dumps(result))
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def results(self, batch_id: str, offset: int = 0, limit: int = None) -> list:
+        end = -1 if limit is None else offset + limit - 1
+        return [json.loads(item) for item in self.client.lrange(f"{self._key(batch_id)}:results", offset, end)]
+
+
+def create_store():
+    if BATCH_STORE in ("auto", "redis"):
+        redis = get_redis()
+        if redis is not None and (BATCH_STORE == "redis" or redis.healthy):
+            # Batch state must not be silently dropped, so the store uses the
+            # pooled client directly and errors surface, instead of the cache breaker
+            return RedisStore(redis.client, BATCH_RESULT_TTL)
+        if BATCH_STORE == "redis":
+            logger.warning("BATCH_STORE=redis but REDIS_URL is not set; using SQLite")
+    if BATCH_STORE == "memory":
+        return MemoryStore()
+    return SQLiteStore(BATCH_DB_PATH)
+
+
+# -------------------- PIPELINE --------------------
+
+def prepare_jobs(jobs: list) -> list:
+    """Skills and chunk embeddings for each job description, computed once per batch."""
+    cache = get_analysis_cache()
+    return [
+        {"id": job["id"], "skills": cache.analyze_text(job["text"])["skills"], "vectors": embed_document(job["text"])}
+        for job in jobs
+    ]
+
+
+def analyze_resume(resume: dict, prepared_jobs: list) -> dict:
+    """parse -> preprocess -> skills -> semantic -> hybrid for one resume against every job."""
+    cache = get_analysis_cache()
+    if resume.get("data") is not None:
+        text = cache.document_text(resume["data"], resume["filename"])
+    else:
+        text = resume["text"]
+    if not text.strip():
+        raise ValueError("No text could be extracted from the resume")
+
+    resume_skills = cache.analyze_text(text)["skills"]
+    with stage("semantic"):
+        resume_vectors = embed_document(text)
+
+    matches = []
+    for job in prepared_jobs:
+        match = calculate_match(resume_skills, job["skills"])
+        semantic = pool_similarity(resume_vectors, job["vectors"])
+        with stage("hybrid"):
+            final = calculate_hybrid_score(match["match_percentage"], semantic, semantic)
+        matches.append({
+            "job_id": job["id"],
+            "skill_match_percentage": match["match_percentage"],
+            "semantic_match_percentage": semantic,
+            "final_match_percentage": final,
+            "common_skills": match["common_skills"],
+            "missing_skills": match["missing_skills"],
+        })
+    matches.sort(key=lambda m: m["final_match_percentage"], reverse=True)
+    return {"resume_skills": resume_skills, "matches": matches}
+
+
+# -------------------- MANAGER --------------------
+
+class _Batch:
+    def __init__(self, batch_id, jobs, total):
+        self.batch_id = batch_id
+        self.jobs = jobs
+        self.remaining = total
+        self.cancelled = False
+        self.started = False
+        self._prepared = None
+        self._lock = threading.Lock()
+
+    def prepared_jobs(self, prepare):
+        with self._lock:
+            if self._prepared is None:
+                self._prepared = prepare(self.jobs)
+            return self._prepared
+
+
+class BatchManager:
+    """
+    Runs submitted batches on a bounded worker pool.
+
+    Each resume is one work item. Job descriptions are analyzed and embedded
+    once per batch, then every resume is matched against all of them. PDF
+    parsing itself still runs in the parser's process pool, so threads here
+    only coordinate and run the cheap NLP/scoring steps.
+
+    State and results live in the store, but the queue is in process: a
+    batch belongs to the process it was submitted to, which refreshes its
+    heartbeat while it runs. If that process dies, the batch is failed the
+    next time any process reads its status; shutdown() fails its own
+    unfinished batches right away. The backpressure limits count the
+    resumes and bytes pending here.
+    """
+
+    def __init__(self, store, workers: int = BATCH_WORKERS, max_pending: int = BATCH_MAX_PENDING,
+                 max_pending_bytes: int = BATCH_MAX_PENDING_BYTES, process=analyze_resume, prepare=prepare_jobs,
+                 heartbeat_interval: float = BATCH_HEARTBEAT_INTERVAL, orphan_after: float = BATCH_ORPHAN_AFTER):
+        self.store = store
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_bytes
+        self.process = process
+        self.prepare = prepare
+        self.orphan_after = orphan_after
+        self.pending = 0
+        self.pending_bytes = 0
+        self._batches = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._beat, args=(heartbeat_interval,), name="batch-heartbeat", daemon=True
+        )
+        self._heartbeat.start()
+
+    @staticmethod
+    def _size(resume: dict) -> int:
+        data = resume.get("data")
+        return len(data) if data is not None else len(resume.get("text") or "")
+
+    def submit(self, resumes: list, jobs: list) -> dict:
+        """resumes: [{"id", "text"} | {"id", "filename", "data"}], jobs: [{"id", "text"}]"""
+        size = sum(self._size(resume) for resume in resumes)
+        with self._lock:
+            if self.pending + len(resumes) > self.max_pending:
+                raise BatchQueueFull(
+                    f"{self.pending} resumes already queued; limit is {self.max_pending}"
+                )
+            if self.pending_bytes + size > self.max_pending_bytes:
+                raise BatchQueueFull(
+                    f"{self.pending_bytes} bytes of resumes already queued; limit is {self.max_pending_bytes}"
+                )
+            self.pending += len(resumes)
+            self.pending_bytes += size
+
+        batch_id = uuid.uuid4().hex
+        record = _new_record(batch_id, len(resumes), len(jobs))
+        self.store.create(record)
+        batch = _Batch(batch_id, jobs, len(resumes))
+        with self._lock:
+            self._batches[batch_id] = batch
+
+        if not resumes:
+            self._finish(batch)
+        for index, resume in enumerate(resumes):
+            self._executor.submit(self._run_item, batch, index, resume)
+        logger.info(f"Batch {batch_id} queued: {len(resumes)} resumes x {len(jobs)} jobs")
+        return record
+
+    def _cancel_requested(self, batch) -> bool:
+        if batch.cancelled:
+            return True
+        # Cancellation may have been requested through another worker process
+        record = self.store.get(batch.batch_id)
+        batch.cancelled = bool(record and record.get("cancel_requested"))
+        return batch.cancelled
+
+    def _run_item(self, batch, index, resume):
+        resume_id = resume.get("id", index)
+        try:
+            if self._cancel_requested(batch):
+                self.store.incr(batch.batch_id, "skipped")
+                return
+            with self._lock:
+                first, batch.started = not batch.started, True
+            if first:
+                self.store.update(batch.batch_id, status="running")
+            try:
+                prepared = batch.prepared_jobs(self.prepare)
+                result = {"index": index, "resume_id": resume_id, "status": "ok", **self.process(resume, prepared)}
+                self.store.add_result(batch.batch_id, result)
+                self.store.incr(batch.batch_id, "completed")
+            except Exception as e:
+                logger.warning(f"Batch {batch.batch_id} item {index} failed: {e!r}")
+                self.store.add_result(batch.batch_id, {
+                    "index": index, "resume_id": resume_id, "status": "error", "error": str(e)
+                })
+                self.store.incr(batch.batch_id, "failed")
+        except Exception:
+            logger.error(f"Batch {batch.batch_id} bookkeeping failed", exc_info=True)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.pending_bytes -= self._size(resume)
+                batch.remaining -= 1
+                done = batch.remaining == 0
+            if done:
+                self._finish(batch)
+
+    def _finish(self, batch):
+        if self._closed:
+            # shutdown() already failed the batch; a straggler must not mark it completed
+            return
+        try:
+            self.store.update(
+                batch.batch_id,
+                status="cancelled" if batch.cancelled else "completed",
+                finished_at=time.time()
+            )
+        finally:
+            with self._lock:
+                self._batches.pop(batch.batch_id, None)
+        logger.info(f"Batch {batch.batch_id} {'cancelled' if batch.cancelled else 'completed'}")
+
+    def _beat(self, interval: float):
+        while not self._stop.wait(interval):
+            with self._lock:
+                batch_ids = list(self._batches)
+            for batch_id in batch_ids:
+                try:
+                    self.store.update(batch_id, heartbeat_at=time.time())
+                except Exception as e:
+                    logger.warning(f"Batch {batch_id} heartbeat failed: {e!r}")
+
+    def _fail(self, batch_id: str, error: str) -> dict:
+        fields = {"status": "failed", "error": error, "finished_at": time.time()}
+        self.store.update(batch_id, **fields)
+        return fields
+
+    def status(self, batch_id: str):
+        record = self.store.get(batch_id)
+        if record is None:
+            return None
+        heartbeat = record.get("heartbeat_at") or record["updated_at"]
+        if record["status"] not in TERMINAL_STATES and time.time() - heartbeat > self.orphan_after:
+            logger.warning(f"Batch {batch_id} has had no heartbeat for {self.orphan_after}s; failing it")
+            record.update(self._fail(batch_id, "The process running this batch stopped before it finished"))
+        done = record["completed"] + record["failed"] + record["skipped"]
+        record["progress"] = round(done / record["total"], 4) if record["total"] else 1.0
+        return record
+
+    def results(self, batch_id: str, offset: int = 0, limit: int = None) -> list:
+        return self.store.results(batch_id, offset, limit)
+
+    def cancel(self, batch_id: str):
+        """Stop a batch: items already running finish, the rest are skipped."""
+        record = self.store.get(batch_id)
+        if record is None:
+            return None
+        if record["status"] not in TERMINAL_STATES:
+            self.store.update(batch_id, cancel_requested=True)
+            with self._lock:
+                batch = self._batches.get(batch_id)
+            if batch is not None:
+                batch.cancelled = True
+        return self.status(batch_id)
+
+    def stats(self) -> dict:
+        return {
+            "store": type(self.store).__name__,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "pending_bytes": self.pending_bytes,
+            "max_pending_bytes": self.max_pending_bytes,
+            "active_batches": len(self._batches),
+        }
+
+    def shutdown(self):
+        self._closed = True
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Queued items are gone with the executor; nothing else would ever finish these batches
+        with self._lock:
+            batch_ids = list(self._batches)
+            self._batches.clear()
+        for batch_id in batch_ids:
+            try:
+                self._fail(batch_id, "The server shut down before this batch finished")
+            except Exception as e:
+                logger.warning(f"Could not mark batch {batch_id} failed on shutdown: {e!r}")
+
+
+_batch_manager = None
+_batch_manager_lock = threading.Lock()
+
+
+def get_batch_manager() -> BatchManager:
+    global _batch_manager
+    if _batch_manager is None:
+        with _batch_manager_lock:
+            if _batch_manager is None:
+                _batch_manager = BatchManager(create_store())
+    return _batch_manager
+
+
+def shutdown_batch_manager():
+    global _batch_manager
+    with _batch_manager_lock:
+        if _batch_manager is not None:
+            _batch_manager.shutdown()
+            _batch_manager = None
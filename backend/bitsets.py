@@ -0,0 +1,19 @@
+import numpy as np
+
+# Number of set bits in every possible byte
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def to_bitsets(id_sets: list, n_bits: int) -> np.ndarray:
+    """Pack integer-id sets into a (len(id_sets), ceil(n_bits / 8)) uint8 bitset matrix."""
+    bitsets = np.zeros((len(id_sets), (n_bits + 7) // 8), dtype=np.uint8)
+    rows = [row for row, ids in enumerate(id_sets) for _ in ids]
+    cols = np.fromiter((bit for ids in id_sets for bit in ids), dtype=np.int64, count=len(rows))
+    if len(rows):
+        np.bitwise_or.at(bitsets, (np.asarray(rows), cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+    return bitsets
+
+
+def popcount(bitsets: np.ndarray) -> np.ndarray:
+    """Set bits per row (summed over the last axis)."""
+    return _POPCOUNT[bitsets].sum(axis=-1, dtype=np.int32)
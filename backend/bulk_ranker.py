@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+
+from backend.text_preprocess import preprocess_text
+from backend.skill_catalogue import skill_catalogue
+from backend.semantic_matcher import document_texts, embed_document, get_embeddings, pool_scores
+from backend.hybrid_matcher import calculate_hybrid_scores
+from backend.bitsets import to_bitsets, popcount
+from backend.metrics import stage
+from backend.logger import logger
+
+RANK_CHUNK_SIZE = int(os.getenv("RANK_CHUNK_SIZE", 128))
+RANK_MAX_CANDIDATES = int(os.getenv("RANK_MAX_CANDIDATES", 2000))
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def score_candidates(query_text: str, candidate_texts: list, candidates_are: str = "resumes",
+                     chunk_size: int = RANK_CHUNK_SIZE) -> dict:
+    """
+    Score one query document against many candidates with vectorized math.
+
+    candidates_are="resumes": query is the job, candidates are resumes.
+    candidates_are="jobs": query is the resume, candidates are jobs.
+
+    Candidates are processed in chunks. The section chunks of every
+    candidate in a chunk are embedded together, stacked into one matrix and
+    scored with one product against the query's chunk vectors; each
+    candidate's rows are then pooled as in semantic_similarity, so /rank and
+    /final-match agree on a pair. Skill overlap is computed with bitset AND +
+    popcount. Only per-candidate scores and skill ids are kept across chunks.
+    """
+    if candidates_are not in ("resumes", "jobs"):
+        raise ValueError("candidates_are must be 'resumes' or 'jobs'")
+
+    snapshot = skill_catalogue.get()
+    index = snapshot.index
+    n_skills = max(len(index), 1)
+
+    query_ids = index.skill_ids(preprocess_text(query_text))
+    query_bits = to_bitsets([query_ids], n_skills)[0]
+    query_vectors = embed_document(query_text)
+
+    n = len(candidate_texts)
+    skill_scores = np.zeros(n, dtype=np.float32)
+    semantic_scores = np.zeros(n, dtype=np.float32)
+    candidate_ids = []
+
+    for start in range(0, n, chunk_size):
+        chunk = candidate_texts[start:start + chunk_size]
+
+        with stage("rank_skills"):
+            id_sets = [index.skill_ids(preprocess_text(text)) for text in chunk]
+        candidate_ids.extend(id_sets)
+        bitsets = to_bitsets(id_sets, n_skills)
+        common = popcount(bitsets & query_bits)
+
+        # Skill match is measured against the job's skill set (as in calculate_match)
+        job_sizes = np.full(len(chunk), len(query_ids)) if candidates_are == "resumes" else popcount(bitsets)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skill_pct = np.where(job_sizes > 0, common / job_sizes * 100, 0.0)
+        skill_scores[start:start + len(chunk)] = np.round(skill_pct, 2)
+
+        texts = [document_texts(text) for text in chunk]
+        flat = [piece for pieces in texts for piece in pieces]
+        with stage("rank_scoring"):
+            if flat and len(query_vectors):
+                rows = np.stack([np.asarray(e, dtype=np.float32) for e in get_embeddings(flat)])
+                similarities = _normalize_rows(rows) @ query_vectors.T
+                end = 0
+                for offset, pieces in enumerate(texts):
+                    begin, end = end, end + len(pieces)
+                    # pool_scores takes the resume-chunk x job-chunk matrix
+                    block = similarities[begin:end] if candidates_are == "resumes" else similarities[begin:end].T
+                    semantic_scores[start + offset] = pool_scores(block)
+
+    # final_match reuses the semantic score as the embedding score
+    final_scores = calculate_hybrid_scores(skill_scores, semantic_scores, semantic_scores)
+
+    return {
+        "skills": snapshot.skills,
+        "query_ids": query_ids,
+        "candidate_ids": candidate_ids,
+        "skill_scores": skill_scores,
+        "semantic_scores": semantic_scores,
+        "final_scores": final_scores,
+    }
+
+
+def iter_ranked(query_text: str, candidate_texts: list, candidates_are: str = "resumes",
+                top_k: int = None, candidate_keys: list = None, chunk_size: int = RANK_CHUNK_SIZE):
+    """Yield ranked result rows (best first), building each row only when it is consumed."""
+    if len(candidate_texts) > RANK_MAX_CANDIDATES:
+        raise ValueError(f"At most {RANK_MAX_CANDIDATES} candidates per ranking request")
+
+    scored = score_candidates(query_text, candidate_texts, candidates_are, chunk_size)
+    final_scores = scored["final_scores"]
+
+    n = len(final_scores)
+    k = n if top_k is None else max(0, min(top_k, n))
+    if k < n:
+        order = np.argpartition(-final_scores, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        order = order[np.argsort(-final_scores[order], kind="stable")]
+    else:
+        order = np.argsort(-final_scores, kind="stable")
+
+    skills = scored["skills"]
+    query_ids = scored["query_ids"]
+    logger.info(f"Ranked {n} {candidates_are}, returning {len(order)}")
+
+    for rank, i in enumerate(order, start=1):
+        candidate_ids = scored["candidate_ids"][i]
+        if candidates_are == "resumes":
+            resume_ids, job_ids = candidate_ids, query_ids
+        else:
+            resume_ids, job_ids = query_ids, candidate_ids
+
+        yield {
+            "rank": rank,
+            "id": candidate_keys[i] if candidate_keys else int(i),
+            # Scores are float32; rounding again drops the float64 widening noise (66.66999816894531)
+            "skill_match_percentage": round(float(scored["skill_scores"][i]), 2),
+            "semantic_match_percentage": round(float(scored["semantic_scores"][i]), 2),
+            "final_match_percentage": round(float(final_scores[i]), 2),
+            "common_skills": sorted(skills[s] for s in resume_ids & job_ids),
+            "missing_skills": sorted(skills[s] for s in job_ids - resume_ids),
+        }
+
+
+def rank_resumes(job_text: str, resume_texts: list, top_k: int = None, resume_ids: list = None) -> list:
+    return list(iter_ranked(job_text, resume_texts, "resumes", top_k, resume_ids))
+
+
+def rank_jobs(resume_text: str, job_texts: list, top_k: int = None, job_ids: list = None) -> list:
+    return list(iter_ranked(resume_text, job_texts, "jobs", top_k, job_ids))
@@ -0,0 +1,327 @@
+"""
+Offline calibration of the hybrid scorer against labeled resume/job pairs.
+
+The dataset is JSONL, one pair per line:
+
+    {"resume_text": "...", "job_text": "...", "label": 1}
+
+Resumes may be given as "resume_path" (PDF/DOCX, relative to the dataset
+file) and jobs as "job_id" (a registered job profile). "label" is 1/0 for
+hire/reject or a graded relevance; "group" (default: the job) is the query
+that NDCG ranks within.
+
+The expensive part, skills and embeddings for every pair, runs once and
+the component scores are cached as NumPy arrays keyed by the dataset
+contents and the skill/embedding versions. Weight combinations are then
+scored as one matrix product per chunk, with AUC and NDCG computed without
+Python loops over pairs or combinations, so sweeping tens of thousands of
+weightings takes seconds.
+
+    python -m backend.calibration labeled_pairs.jsonl --step 0.02
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from backend.hybrid_matcher import (
+    WEIGHT_SKILL, WEIGHT_SEMANTIC, WEIGHT_EMBEDDING, CONFIDENCE_STRONG, CONFIDENCE_MEDIUM
+)
+from backend.logger import logger
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALIBRATION_CACHE_DIR = os.getenv("CALIBRATION_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "calibration"))
+
+# The API passes the semantic score as the embedding score too, so only
+# these two components are independent; their effective weights are
+# WEIGHT_SKILL and WEIGHT_SEMANTIC + WEIGHT_EMBEDDING.
+COLUMNS = ("skill", "semantic")
+CURRENT_WEIGHTS = (WEIGHT_SKILL, WEIGHT_SEMANTIC + WEIGHT_EMBEDDING)
+
+# Upper bound on combinations x pairs scored at once
+SWEEP_CHUNK_ELEMENTS = 4_000_000
+
+
+# -------------------- COMPONENT SCORES --------------------
+
+def load_dataset(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _resume_text(record: dict, base_dir: str) -> str:
+    from backend.analysis_cache import get_analysis_cache
+    if "resume_text" in record:
+        return record["resume_text"]
+    path = os.path.join(base_dir, record["resume_path"])
+    with open(path, "rb") as f:
+        return get_analysis_cache().document_text(f.read(), path)
+
+
+def compute_components(records: list, base_dir: str = ".") -> dict:
+    """Skill and semantic scores, labels and group codes for every pair, as arrays."""
+    from backend.analysis_cache import get_analysis_cache
+    from backend.job_profiles import get_job_profiles
+    from backend.matcher import calculate_match
+    from backend.semantic_matcher import embed_document, pool_similarity
+
+    analysis = get_analysis_cache()
+    skills, vectors = {}, {}
+
+    def analyze(key, text):
+        # Each distinct resume and job is analyzed and embedded once
+        if key not in skills:
+            skills[key] = analysis.analyze_text(text)["skills"]
+            vectors[key] = embed_document(text)
+
+    skill_scores, semantic_scores, groups = [], [], []
+    started = time.perf_counter()
+    for i, record in enumerate(records):
+        resume_text = _resume_text(record, base_dir)
+        resume_key = ("resume", hashlib.sha256(resume_text.encode()).hexdigest())
+        analyze(resume_key, resume_text)
+
+        if "job_id" in record:
+            job_key = ("job", record["job_id"])
+            if job_key not in skills:
+                profile = get_job_profiles().get(record["job_id"])
+                if profile is None:
+                    raise ValueError(f"Line {i + 1}: unknown job_id {record['job_id']}")
+                if profile.vectors is None:
+                    raise RuntimeError(f"Line {i + 1}: job {record['job_id']} could not be re-embedded")
+                skills[job_key], vectors[job_key] = profile.skills, profile.vectors
+        else:
+            job_key = ("job", hashlib.sha256(record["job_text"].encode()).hexdigest())
+            analyze(job_key, record["job_text"])
+
+        skill_scores.append(calculate_match(skills[resume_key], skills[job_key])["match_percentage"])
+        semantic_scores.append(pool_similarity(vectors[resume_key], vectors[job_key]))
+        groups.append(str(record.get("group", job_key[1])))
+
+        if (i + 1) % 100 == 0:
+            logger.info(f"Scored {i + 1}/{len(records)} pairs in {time.perf_counter() - started:.1f}s")
+
+    _, group_codes = np.unique(groups, return_inverse=True)
+    return {
+        "components": np.array([skill_scores, semantic_scores], dtype=np.float64),
+        "labels": np.array([float(record["label"]) for record in records]),
+        "groups": group_codes.astype(np.int64),
+    }
+
+
+def cached_components(dataset_path: str, cache_dir: str = CALIBRATION_CACHE_DIR) -> dict:
+    """compute_components for a dataset file, cached until the data or the models change."""
+    from backend.job_profiles import skills_version, embedding_version
+
+    with open(dataset_path, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(f"{skills_version()}|{embedding_version()}".encode())
+    path = os.path.join(cache_dir, f"{digest.hexdigest()[:24]}.npz")
+
+    if os.path.exists(path):
+        with np.load(path) as data:
+            logger.info(f"Loaded component scores from {path}")
+            return {key: data[key] for key in data.files}
+
+    records = load_dataset(dataset_path)
+    data = compute_components(records, os.path.dirname(os.path.abspath(dataset_path)))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, **data)
+    os.replace(tmp_path, path)
+    return data
+
+
+# -------------------- VECTORIZED METRICS --------------------
+
+def weight_grid(step: float = 0.05, max_weight: float = 1.5, columns: int = len(COLUMNS)) -> np.ndarray:
+    """Every combination of per-column weights in [0, max_weight], except all zeros."""
+    values = np.round(np.arange(0, max_weight + step / 2, step), 6)
+    grid = np.array(list(itertools.product(values, repeat=columns)))
+    return grid[grid.sum(axis=1) > 0]
+
+
+def hybrid_scores(weights: np.ndarray, components: np.ndarray) -> np.ndarray:
+    """(combinations x pairs) final scores, rounded like calculate_hybrid_score."""
+    return np.round(np.atleast_2d(weights) @ components, 2)
+
+
+def auc(scores: np.ndarray, positive: np.ndarray) -> np.ndarray:
+    """
+    ROC AUC of every row of scores (Mann-Whitney, ties count half).
+
+    Rows are shifted into disjoint ranges and flattened, so one sorted array
+    and two searchsorted calls count, for every positive in every row, the
+    negatives scored below and equal to it.
+    """
+    scores = np.atleast_2d(scores)
+    positives, negatives = scores[:, positive], scores[:, ~positive]
+    n_pos, n_neg = positives.shape[1], negatives.shape[1]
+    if not n_pos or not n_neg:
+        return np.full(scores.shape[0], np.nan)
+
+    span = scores.max() - scores.min() + 1.0
+    offsets = (np.arange(scores.shape[0]) * span)[:, None]
+    negatives = np.sort(negatives, axis=1) + offsets
+    flat = negatives.ravel()
+    queries = positives + offsets
+    row_start = (np.arange(scores.shape[0]) * n_neg)[:, None]
+    below = np.searchsorted(flat, queries, side="left") - row_start
+    not_above = np.searchsorted(flat, queries, side="right") - row_start
+    return (below + 0.5 * (not_above - below)).sum(axis=1) / (n_pos * n_neg)
+
+
+def group_index(groups: np.ndarray, gains: np.ndarray):
+    """(groups x max size) pair indices, -1 padded, for groups NDCG can rank."""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+    index = np.full((len(starts), sizes.max()), -1)
+    for row, (start, size) in enumerate(zip(starts, sizes)):
+        index[row, :size] = order[start:start + size]
+    # Single-pair groups and groups without a relevant pair rank trivially
+    useful = (sizes > 1) & (np.where(index >= 0, gains[index], 0).sum(axis=1) > 0)
+    return index[useful]
+
+
+def ndcg(scores: np.ndarray, gains: np.ndarray, index: np.ndarray, k: int = 10) -> np.ndarray:
+    """Mean NDCG@k over groups for every row of scores; ties keep dataset order."""
+    scores = np.atleast_2d(scores)
+    if not len(index):
+        return np.full(scores.shape[0], np.nan)
+    k = min(k, index.shape[1])
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+
+    padded_gains = np.where(index >= 0, gains[index], 0.0)
+    ideal = (-np.sort(-padded_gains, axis=1)[:, :k] * discounts).sum(axis=1)
+
+    padded_scores = np.concatenate([scores, np.full((scores.shape[0], 1), -np.inf)], axis=1)[:, index]
+    top = np.argsort(-padded_scores, axis=2, kind="stable")[:, :, :k]
+    ranked_gains = np.take_along_axis(np.broadcast_to(padded_gains, padded_scores.shape), top, axis=2)
+    return ((ranked_gains * discounts).sum(axis=2) / ideal).mean(axis=1)
+
+
+def sweep(data: dict, grid: np.ndarray, k: int = 10, chunk_elements: int = SWEEP_CHUNK_ELEMENTS) -> dict:
+    """AUC and NDCG@k for every weight combination in grid."""
+    components, labels = data["components"], data["labels"]
+    positive = labels > 0
+    gains = 2.0 ** labels - 1
+    index = group_index(data["groups"], gains)
+    chunk = max(1, chunk_elements // max(1, components.shape[1]))
+
+    aucs, ndcgs = np.empty(len(grid)), np.empty(len(grid))
+    for start in range(0, len(grid), chunk):
+        scores = hybrid_scores(grid[start:start + chunk], components)
+        aucs[start:start + chunk] = auc(scores, positive)
+        ndcgs[start:start + chunk] = ndcg(scores, gains, index, k)
+    return {"auc": aucs, "ndcg": ndcgs}
+
+
+def calibrate_thresholds(scores: np.ndarray, positive: np.ndarray,
+                         strong_precision: float = 0.8, medium_recall: float = 0.9) -> dict:
+    """
+    Confidence cut-offs for one weighting: "Strong" is the lowest score whose
+    precision reaches strong_precision, "Medium" the highest score that still
+    keeps medium_recall of the positives. None when no cut-off qualifies.
+    """
+    thresholds = np.round(np.arange(0, max(100.0, scores.max()) + 0.5, 0.5), 2)
+    predicted = scores[None, :] >= thresholds[:, None]
+    true_positive = (predicted & positive).sum(axis=1)
+    flagged = predicted.sum(axis=1)
+    precision = np.divide(true_positive, flagged, out=np.zeros(len(thresholds)), where=flagged > 0)
+    recall = true_positive / max(1, positive.sum())
+
+    strong = np.flatnonzero((precision >= strong_precision) & (flagged > 0))
+    medium = np.flatnonzero(recall >= medium_recall)
+    strong_threshold = float(thresholds[strong[0]]) if len(strong) else None
+    medium_threshold = float(thresholds[medium[-1]]) if len(medium) else None
+    if strong_threshold is not None and medium_threshold is not None:
+        medium_threshold = min(medium_threshold, strong_threshold)
+    return {"strong": strong_threshold, "medium": medium_threshold}
+
+
+# -------------------- CLI --------------------
+
+def _describe(weights, aucs, ndcgs, i) -> dict:
+    return {
+        **{f"weight_{name}": float(w) for name, w in zip(COLUMNS, weights[i])},
+        "auc": round(float(aucs[i]), 4),
+        "ndcg": round(float(ndcgs[i]), 4),
+    }
+
+
+def _distinct(grid, ranking) -> list:
+    # Rescaled weightings rank identically; list each ratio once
+    ratios = np.round(grid / grid.sum(axis=1, keepdims=True), 2)
+    seen, distinct = set(), []
+    for i in ranking:
+        key = tuple(ratios[i])
+        if key not in seen:
+            seen.add(key)
+            distinct.append(i)
+    return distinct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="JSONL of labeled resume/job pairs")
+    parser.add_argument("--step", type=float, default=0.05, help="weight grid step")
+    parser.add_argument("--max-weight", type=float, default=1.5)
+    parser.add_argument("--metric", choices=("auc", "ndcg"), default="auc", help="what to optimize")
+    parser.add_argument("--k", type=int, default=10, help="NDCG cut-off")
+    parser.add_argument("--top", type=int, default=5, help="weightings to list")
+    parser.add_argument("--strong-precision", type=float, default=0.8)
+    parser.add_argument("--medium-recall", type=float, default=0.9)
+    parser.add_argument("--cache-dir", default=CALIBRATION_CACHE_DIR)
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    data = cached_components(args.dataset, args.cache_dir)
+    positive = data["labels"] > 0
+
+    grid = weight_grid(args.step, args.max_weight)
+    started = time.perf_counter()
+    metrics = sweep(data, grid, args.k)
+    elapsed = time.perf_counter() - started
+
+    current = sweep(data, np.array([CURRENT_WEIGHTS]), args.k)
+    ranking = np.argsort(-np.nan_to_num(metrics[args.metric], nan=-1), kind="stable")
+    best = grid[ranking[0]]
+    best_scores = hybrid_scores(best, data["components"])[0]
+
+    report = {
+        "pairs": int(len(positive)),
+        "positives": int(positive.sum()),
+        "combinations": int(len(grid)),
+        "sweep_seconds": round(elapsed, 3),
+        "combinations_per_sec": round(len(grid) / elapsed, 1) if elapsed else None,
+        "current": {
+            **_describe(np.array([CURRENT_WEIGHTS]), current["auc"], current["ndcg"], 0),
+            "thresholds": {"strong": CONFIDENCE_STRONG, "medium": CONFIDENCE_MEDIUM},
+        },
+        "top": [_describe(grid, metrics["auc"], metrics["ndcg"], i) for i in _distinct(grid, ranking)[:args.top]],
+        "recommended": {
+            "WEIGHT_SKILL": float(best[0]),
+            "WEIGHT_SEMANTIC": float(best[1]),
+            "WEIGHT_EMBEDDING": 0.0,
+            **{
+                f"CONFIDENCE_{name.upper()}": value for name, value in calibrate_thresholds(
+                    best_scores, positive, args.strong_precision, args.medium_recall
+                ).items()
+            },
+        },
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
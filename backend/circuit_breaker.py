@@ -0,0 +1,94 @@
+import threading
+import time
+
+from backend.logger import logger
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed:    calls go through; failure_threshold failures in a row open it
+    open:      calls are refused until reset_timeout has passed
+    half_open: one trial call is let through; success closes, failure reopens
+
+    A background health check can also close it early with close().
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit {self.name} closed")
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self._open()
+
+    def _open(self):
+        if self.state != "open":
+            self.times_opened += 1
+            logger.warning(f"Circuit {self.name} opened after {self.failures} failure(s)")
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
+    def trip(self):
+        """Open immediately, e.g. when a dependency is known to be down."""
+        with self._lock:
+            self._open()
+
+    def close(self):
+        self.record_success()
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
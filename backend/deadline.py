@@ -0,0 +1,54 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Latency budget of one /final-match (and /semantic-match) request, in milliseconds
+MATCH_BUDGET_MS = float(os.getenv("MATCH_BUDGET_MS", 3000))
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """An absolute point on the monotonic clock that a request must finish by."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+# Deadline of the current request; tasks and threadpool calls inherit it
+_current_deadline = ContextVar("deadline", default=None)
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+def remaining_budget():
+    """Seconds left for the current request, or None when it has no deadline."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def start_deadline(budget_ms: float = MATCH_BUDGET_MS):
+    """A deadline budget_ms from now, or None (no limit) for a budget of 0 or less."""
+    return Deadline(budget_ms / 1000) if budget_ms > 0 else None
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Make deadline the current request's for the block (and tasks created in it)."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
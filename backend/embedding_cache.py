@@ -0,0 +1,198 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.logger import logger
+from backend.metrics import cache_result
+from backend.redis_client import RedisUnavailable
+from backend.vector_codec import VectorCodec
+
+# L1: per-process LRU, bounded in bytes
+EMBEDDING_L1_MAX_BYTES = int(os.getenv("EMBEDDING_L1_MAX_BYTES", 64 * 1024 * 1024))
+EMBEDDING_L1_TTL = float(os.getenv("EMBEDDING_L1_TTL", 6 * 3600))
+
+# L2: Redis, 7 days since embeddings don't change for the same text
+EMBEDDING_L2_TTL = int(os.getenv("EMBEDDING_L2_TTL", 604800))
+
+# Encoding of cached vectors: float32, float16 (half the bytes) or int8 (a quarter)
+EMBEDDING_CODEC = os.getenv("EMBEDDING_CODEC", "float16")
+
+# Bump when the stored value layout changes
+CACHE_FORMAT_VERSION = "v3"
+
+
+class LRUCache:
+    """Thread-safe LRU with a total size bound in bytes and a per-entry TTL."""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, nbytes, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, nbytes, time.monotonic() + self.ttl)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, nbytes, _ = self._data.pop(key)
+        self.current_bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: in-process LRU (L1) in front of Redis (L2).
+
+    Vectors are stored L2-normalized and packed by a VectorCodec, keyed by
+    format version, codec, model name and dimension, so switching models or
+    encodings can never serve vectors written by the previous one. Callers
+    always get the decoded float32 vector, whether it was just computed or
+    read back, so scores do not depend on which tier answered. L1 hits never touch the network,
+    and L1 misses for many texts share one MGET. Redis goes through a
+    RedisLayer, so while it is unhealthy L2 is skipped instead of waited on.
+    """
+
+    def __init__(self, model: str, dim: int, redis=None,
+                 l1_max_bytes: int = EMBEDDING_L1_MAX_BYTES, l1_ttl: float = EMBEDDING_L1_TTL,
+                 l2_ttl: int = EMBEDDING_L2_TTL, codec: str = EMBEDDING_CODEC):
+        self.model = model
+        self.dim = dim
+        self.codec = VectorCodec(codec)
+        self.redis = redis
+        self.l2_ttl = l2_ttl
+        self.l1 = LRUCache(l1_max_bytes, l1_ttl)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return f"embedding:{CACHE_FORMAT_VERSION}:{self.codec.name}:{self.model}:{self.dim}:{digest}"
+
+    def get(self, text: str):
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: list) -> list:
+        """Cached vectors (or None) for each text, with one Redis round trip for all L1 misses."""
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+        l2_keys, l2_positions = [], []
+        for i, key in enumerate(keys):
+            vector = self.l1.get(key)
+            cache_result("embedding_l1", vector is not None)
+            if vector is not None:
+                vectors[i] = vector
+            else:
+                l2_keys.append(key)
+                l2_positions.append(i)
+
+        if not l2_keys or self.redis is None:
+            return vectors
+        try:
+            values = self.redis.mget(l2_keys)
+        except RedisUnavailable as e:
+            self.l2_errors += 1
+            logger.warning(f"Skipping Redis embedding lookup: {e}")
+            return vectors
+
+        for key, i, data in zip(l2_keys, l2_positions, values):
+            vector = self.codec.unpack(data, self.dim) if data else None
+            cache_result("embedding_l2", vector is not None)
+            if vector is None:
+                self.l2_misses += 1
+                continue
+            self.l2_hits += 1
+            self.l1.set(key, vector, vector.nbytes)
+            vectors[i] = vector
+        return vectors
+
+    def set(self, text: str, vector) -> np.ndarray:
+        return self.set_many([text], [vector])[0]
+
+    def set_many(self, texts: list, vectors: list) -> list:
+        """Store vectors in L1 and, in one pipelined round trip, in Redis; returns them as they will be read back."""
+        stored, items = [], []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            if vector.shape != (self.dim,):
+                logger.warning(
+                    f"Not caching embedding of shape {vector.shape}; expected ({self.dim},) for {self.model}"
+                )
+                stored.append(vector)
+                continue
+            data = self.codec.pack(vector)
+            vector = self.codec.unpack(data, self.dim)
+            stored.append(vector)
+            key = self.key(text)
+            self.l1.set(key, vector, vector.nbytes)
+            items.append((key, data))
+
+        if items and self.redis is not None:
+            try:
+                self.redis.set_many(items, self.l2_ttl)
+            except RedisUnavailable as e:
+                self.l2_errors += 1
+                logger.warning(f"Skipping Redis embedding write: {e}")
+        return stored
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "dim": self.dim,
+            "codec": self.codec.name,
+            "l2_bytes_per_vector": self.codec.bytes_per_vector(self.dim),
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.current_bytes,
+            "l1_max_bytes": self.l1.max_bytes,
+            "l1_hits": self.l1.hits,
+            "l1_misses": self.l1.misses,
+            "l1_evictions": self.l1.evictions,
+            "l1_expirations": self.l1.expirations,
+            "l2_enabled": self.redis is not None,
+            "l2_hits": self.l2_hits,
+            "l2_misses": self.l2_misses,
+            "l2_errors": self.l2_errors,
+            **({"redis": self.redis.stats()} if self.redis is not None else {}),
+        }
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import random
+
+from backend.deadline import current_deadline, DeadlineExceeded
+from backend.logger import logger
+from backend.metrics import embedding_call
+
+# Micro-batching: requests arriving within the window share one API call
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", 5))
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", 32))
+EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", 10))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", 2))
+EMBED_BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", 0.25))
+# Send a duplicate (hedged) call when the first has not answered after this long (0 = never)
+EMBED_HEDGE_AFTER_MS = float(os.getenv("EMBED_HEDGE_AFTER_MS", 0))
+# Retries and hedges are only started with at least this much request budget left
+EMBED_MIN_ATTEMPT_MS = float(os.getenv("EMBED_MIN_ATTEMPT_MS", 150))
+# Provider circuit breaker: consecutive failed batches to open, seconds before a trial call
+EMBED_BREAKER_FAILURES = int(os.getenv("EMBED_BREAKER_FAILURES", 5))
+EMBED_BREAKER_RESET = float(os.getenv("EMBED_BREAKER_RESET", 30))
+
+
+class EmbeddingError(Exception):
+    pass
+
+
+class EmbeddingUnavailable(EmbeddingError):
+    """The provider's circuit breaker is open."""
+
+
+class AsyncEmbeddingClient:
+    """
+    Coalesces concurrent embed() calls into batched backend requests.
+
+    Texts queued within batch_window_ms (or until max_batch_size is reached)
+    are sent as one multi-content call. A text that is already queued or in
+    flight is not sent again; later callers wait on the same future.
+
+    The backend only needs an async embed_batch(texts) -> list of vectors;
+    every EmbeddingProvider qualifies.
+    A client is bound to the event loop it is first used on.
+
+    Callers running under a request deadline stop waiting when it passes
+    (DeadlineExceeded). A batch lives until the latest deadline among its
+    callers: each attempt is cut to the time left, and a retry or hedged
+    duplicate call is only started if enough of it remains. With a breaker,
+    batches fail fast with EmbeddingUnavailable while it is open.
+    """
+
+    def __init__(
+        self,
+        backend,
+        batch_window_ms: float = EMBED_BATCH_WINDOW_MS,
+        max_batch_size: int = EMBED_MAX_BATCH_SIZE,
+        timeout: float = EMBED_TIMEOUT,
+        max_retries: int = EMBED_MAX_RETRIES,
+        backoff_base: float = EMBED_BACKOFF_BASE,
+        breaker=None,
+        hedge_after_ms: float = EMBED_HEDGE_AFTER_MS,
+        min_attempt_ms: float = EMBED_MIN_ATTEMPT_MS
+    ):
+        self.backend = backend
+        self.breaker = breaker
+        self.hedge_after = hedge_after_ms / 1000
+        self.min_attempt = min_attempt_ms / 1000
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.loop = None
+        self._pending = {}
+        self._pending_deadlines = []
+        self._inflight = {}
+        self._flush_handle = None
+        self._tasks = set()
+        self.stats = {
+            "requests": 0, "deduplicated": 0, "batches": 0, "retries": 0, "hedges": 0,
+            "errors": 0, "deadline_exceeded": 0, "breaker_rejections": 0,
+        }
+
+    def queued(self, text: str) -> bool:
+        """Whether text is already waiting for or in a batch; embedding it again is free."""
+        return text in self._pending or text in self._inflight
+
+    async def embed(self, text: str):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            self.stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded("No request budget left for embedding")
+
+        self.stats["requests"] += 1
+        future = self._pending.get(text) or self._inflight.get(text)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            future = loop.create_future()
+            self._pending[text] = future
+            self._pending_deadlines.append(deadline)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shield so one cancelled (or timed out) caller does not cancel the shared result
+        if deadline is None:
+            return await asyncio.shield(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), deadline.remaining())
+        except asyncio.TimeoutError:
+            self.stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded("Request budget ran out waiting for embeddings") from None
+
+    async def embed_many(self, texts: list) -> list:
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        deadlines, self._pending_deadlines = self._pending_deadlines, []
+        self._inflight.update(batch)
+
+        # The batch serves every caller, so it runs until the latest deadline
+        deadline = None if None in deadlines else max(deadlines, key=lambda d: d.expires_at)
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch, deadline))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: dict, deadline=None):
+        texts = list(batch)
+        try:
+            vectors = await self._call_with_retry(texts, deadline)
+            if len(vectors) != len(texts):
+                raise EmbeddingError(f"Backend returned {len(vectors)} embeddings for {len(texts)} texts")
+            for text, vector in zip(texts, vectors):
+                if not batch[text].done():
+                    batch[text].set_result(vector)
+        except Exception as e:
+            self.stats["errors"] += 1
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark as retrieved; the callers waiting on it still get the error
+                    future.exception()
+        finally:
+            for text, future in batch.items():
+                if self._inflight.get(text) is future:
+                    del self._inflight[text]
+
+    async def _attempt(self, texts: list, timeout: float, deadline=None) -> list:
+        # One call, plus a hedged duplicate if it is slow and the budget allows;
+        # the first successful answer wins and the other call is cancelled
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + timeout
+        tasks = [asyncio.ensure_future(self.backend.embed_batch(texts))]
+        try:
+            if self.hedge_after and timeout > self.hedge_after + self.min_attempt:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+                if not done and (deadline is None or deadline.remaining() > self.min_attempt):
+                    self.stats["hedges"] += 1
+                    tasks.append(asyncio.ensure_future(self.backend.embed_batch(texts)))
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, ends_at - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _call_with_retry(self, texts: list, deadline=None) -> list:
+        if self.breaker is not None and not self.breaker.allow():
+            self.stats["breaker_rejections"] += 1
+            raise EmbeddingUnavailable("Embedding provider circuit is open")
+        self.stats["batches"] += 1
+        backend_name = getattr(self.backend, "name", type(self.backend).__name__)
+        attempt = 0
+        while True:
+            timeout = self.timeout if deadline is None else min(self.timeout, deadline.remaining())
+            try:
+                vectors = await self._attempt(texts, timeout, deadline)
+                embedding_call(backend_name, len(texts))
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return vectors
+            except Exception as e:
+                embedding_call(backend_name, len(texts), error=True)
+                delay = self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.0)
+                out_of_budget = deadline is not None and deadline.remaining() < delay + self.min_attempt
+                if attempt >= self.max_retries or out_of_budget:
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    logger.error(f"Embedding batch of {len(texts)} failed after {attempt + 1} attempts: {e!r}")
+                    if out_of_budget and attempt < self.max_retries:
+                        raise DeadlineExceeded("No request budget left to retry the embedding call") from e
+                    raise
+                logger.warning(f"Embedding batch failed ({e!r}), retrying in {delay:.2f}s")
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+from backend.logger import logger
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "gemini")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "gemini-embedding-001")
+
+# Optional override; each provider has its own default dimension
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 0)) or None
+
+HASHING_FEATURES = int(os.getenv("HASHING_FEATURES", 4096))
+HASHING_SVD_PATH = os.getenv("HASHING_SVD_PATH")
+
+
+class EmbeddingProvider:
+    """
+    Base class for embedding providers.
+
+    A provider turns a batch of texts into vectors of a fixed, declared
+    dimension. `model` identifies the vector space; it is part of every cache
+    key, so two providers (or two configurations of one) never share vectors.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, dimension: int):
+        self.model = model
+        self.dimension = dimension
+
+    def embed(self, texts: list) -> list:
+        raise NotImplementedError
+
+    async def embed_batch(self, texts: list) -> list:
+        # Async entry point used by AsyncEmbeddingClient
+        return await asyncio.to_thread(self.embed, texts)
+
+    def describe(self) -> dict:
+        return {"provider": self.name, "model": self.model, "dimension": self.dimension}
+
+
+class GeminiProvider(EmbeddingProvider):
+    name = "gemini"
+
+    def __init__(self, model: str = EMBEDDING_MODEL, dimension: int = None, api_key: str = None):
+        super().__init__(model, dimension or 3072)
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    def _config(self):
+        from google.genai import types
+        return types.EmbedContentConfig(output_dimensionality=self.dimension)
+
+    def embed(self, texts: list) -> list:
+        response = self.client.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=self._config()
+        )
+        return [embedding.values for embedding in response.embeddings]
+
+    async def embed_batch(self, texts: list) -> list:
+        response = await self.client.aio.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=self._config()
+        )
+        return [embedding.values for embedding in response.embeddings]
+
+
+class HashingProvider(EmbeddingProvider):
+    """
+    Local CPU provider: hashed word/bigram counts, optionally projected
+    through an SVD (LSA) basis fitted offline with `fit_svd`.
+
+    Needs no network and no model download, and is deterministic, which
+    makes it suitable for offline use, tests and throughput benchmarks.
+    Scores are lexical rather than semantic, so they run lower than Gemini's
+    for paraphrased text.
+    """
+
+    name = "hashing"
+
+    def __init__(self, n_features: int = HASHING_FEATURES, svd_path: str = HASHING_SVD_PATH):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            stop_words="english",
+            alternate_sign=False,
+            norm="l2"
+        )
+        self.projection = None
+        model = f"hashing-{n_features}"
+
+        if svd_path:
+            # Memory-mapped so pre-forked workers share one copy of the basis
+            self.projection = np.load(svd_path, mmap_mode="r")
+            if self.projection.dtype != np.float32:
+                self.projection = self.projection.astype(np.float32)
+            if self.projection.shape[0] != n_features:
+                raise ValueError(
+                    f"SVD basis {svd_path} expects {self.projection.shape[0]} features, got {n_features}"
+                )
+            with open(svd_path, "rb") as f:
+                model += f"-svd-{hashlib.sha256(f.read()).hexdigest()[:8]}"
+
+        dimension = self.projection.shape[1] if self.projection is not None else n_features
+        super().__init__(model, dimension)
+
+    def embed(self, texts: list) -> list:
+        matrix = self.vectorizer.transform(texts)
+        if self.projection is None:
+            return list(matrix.toarray().astype(np.float32))
+
+        dense = np.asarray(matrix @ self.projection, dtype=np.float32)
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return list(dense / norms)
+
+
+def fit_svd(corpus: list, components: int, out_path: str, n_features: int = HASHING_FEATURES):
+    """Fit an LSA basis for HashingProvider on a corpus of resumes/job posts."""
+    from sklearn.decomposition import TruncatedSVD
+
+    provider = HashingProvider(n_features=n_features, svd_path=None)
+    matrix = provider.vectorizer.transform(corpus)
+    svd = TruncatedSVD(n_components=components, random_state=0).fit(matrix)
+    np.save(out_path, svd.components_.T.astype(np.float32))
+    logger.info(
+        f"Saved {components}-dim SVD basis to {out_path} "
+        f"(explained variance {svd.explained_variance_ratio_.sum():.2%})"
+    )
+
+
+PROVIDERS = {
+    GeminiProvider.name: lambda: GeminiProvider(dimension=EMBEDDING_DIM),
+    HashingProvider.name: lambda: HashingProvider(),
+}
+
+
+def create_provider(name: str = EMBEDDING_PROVIDER) -> EmbeddingProvider:
+    try:
+        factory = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER {name!r}; choose from {sorted(PROVIDERS)}")
+    provider = factory()
+    logger.info(f"Embedding provider: {provider.describe()}")
+    return provider
+
+
+if __name__ == "__main__":
+    # python -m backend.embedding_providers corpus.txt 256 data/hashing_svd.npy
+    corpus_path, n_components, output = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    with open(corpus_path, encoding="utf-8") as f:
+        documents = [line.strip() for line in f if line.strip()]
+    fit_svd(documents, n_components, output)
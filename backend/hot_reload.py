@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+import time
+
+from backend.logger import logger
+
+
+class HotReloader:
+    """
+    An immutable snapshot of a compiled file, rebuilt when the file changes.
+
+    The file is read and compiled once; get() returns the current snapshot.
+    The file is stat()ed at most every reload_interval seconds (never when
+    negative). When its mtime/size changes, the content hash is recomputed
+    and, if it differs, a new snapshot is built and swapped in with a single
+    reference assignment, so readers never see a half-built one. A file that
+    cannot be stat()ed or fails to compile is logged and the previous
+    snapshot stays in use.
+
+    compile(raw bytes) returns the type-specific fields of snapshot_type, a
+    namedtuple that also has version, content_hash, loaded_at, mtime and path.
+    """
+
+    def __init__(self, path: str, name: str, compile, snapshot_type, reload_interval: float, describe=None):
+        self.path = path
+        self.name = name
+        self.compile = compile
+        self.snapshot_type = snapshot_type
+        self.reload_interval = reload_interval
+        self.describe = describe
+        self._snapshot = None
+        self._stat = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+
+        if self.reload_interval >= 0 and time.monotonic() >= self._next_check:
+            self._check_for_changes()
+
+        return self._snapshot
+
+    def _check_for_changes(self):
+        label = self.name[:1].upper() + self.name[1:]
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.reload_interval
+            try:
+                st = os.stat(self.path)
+            except OSError as e:
+                logger.warning(f"{label} stat failed, keeping version {self._snapshot.version}: {e}")
+                return
+            if (st.st_mtime_ns, st.st_size) == self._stat:
+                return
+
+        try:
+            self.reload()
+        except Exception as e:
+            logger.error(f"{label} reload failed, keeping version {self._snapshot.version}: {e}")
+
+    def reload(self, force: bool = False):
+        with self._lock:
+            st = os.stat(self.path)
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            content_hash = hashlib.sha256(raw).hexdigest()
+
+            current = self._snapshot
+            self._stat = (st.st_mtime_ns, st.st_size)
+            self._next_check = time.monotonic() + self.reload_interval
+
+            if current is not None and current.content_hash == content_hash and not force:
+                # Touched but unchanged: keep the compiled snapshot
+                self._snapshot = current._replace(mtime=st.st_mtime)
+                return self._snapshot
+
+            start = time.perf_counter()
+            self._snapshot = self.snapshot_type(
+                **self.compile(raw),
+                version=content_hash[:12],
+                content_hash=content_hash,
+                loaded_at=time.time(),
+                mtime=st.st_mtime,
+                path=self.path,
+            )
+            detail = f" ({self.describe(self._snapshot)})" if self.describe else ""
+            logger.info(
+                f"Loaded {self.name} version {self._snapshot.version}{detail} "
+                f"in {round((time.perf_counter() - start) * 1000, 1)} ms"
+            )
+            return self._snapshot
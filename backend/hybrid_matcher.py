@@ -1,4 +1,5 @@
 import os
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,6 +8,10 @@ WEIGHT_SKILL = float(os.getenv("WEIGHT_SKILL", 0.6))
 WEIGHT_SEMANTIC = float(os.getenv("WEIGHT_SEMANTIC", 0.4))
 WEIGHT_EMBEDDING = float(os.getenv("WEIGHT_EMBEDDING", 0.3))
 
+# Final-score cut-offs for the "Strong" and "Medium" confidence labels
+CONFIDENCE_STRONG = float(os.getenv("CONFIDENCE_STRONG", 75))
+CONFIDENCE_MEDIUM = float(os.getenv("CONFIDENCE_MEDIUM", 50))
+
 def calculate_hybrid_score(skill_score, semantic_score, embedding_score):
     final_score = (
         (WEIGHT_SKILL * skill_score) +
@@ -14,3 +19,33 @@ def calculate_hybrid_score(skill_score, semantic_score, embedding_score):
         (WEIGHT_EMBEDDING * embedding_score)
     )
     return round(final_score, 2)
+
+def skill_only_weights():
+    """
+    Weights when the embedding scores are unavailable: the skill score
+    alone, on the same 0-100 range the confidence thresholds are set on.
+    """
+    return {
+        "skill": 1.0,
+        "semantic": 0.0,
+        "embedding": 0.0,
+    }
+
+def calculate_skill_only_score(skill_score):
+    return round(min(max(skill_only_weights()["skill"] * skill_score, 0.0), 100.0), 2)
+
+def calculate_hybrid_scores(skill_scores, semantic_scores, embedding_scores):
+    """Vectorized calculate_hybrid_score over arrays of component scores."""
+    final_scores = (
+        (WEIGHT_SKILL * np.asarray(skill_scores)) +
+        (WEIGHT_SEMANTIC * np.asarray(semantic_scores)) +
+        (WEIGHT_EMBEDDING * np.asarray(embedding_scores))
+    )
+    return np.round(final_scores, 2)
+
+def confidence_label(final_score):
+    return (
+        "Strong" if final_score >= CONFIDENCE_STRONG else
+        "Medium" if final_score >= CONFIDENCE_MEDIUM else
+        "Weak"
+    )
@@ -0,0 +1,440 @@
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from backend.bitsets import popcount
+from backend.matcher import calculate_match
+from backend.semantic_matcher import get_embeddings, get_provider
+from backend.skill_catalogue import skill_catalogue
+from backend.text_preprocess import preprocess_text
+from backend.metrics import stage
+from backend.vector_codec import VectorCodec
+from backend.logger import logger
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_INDEX_DIR = os.getenv("JOB_INDEX_DIR", os.path.join(BASE_DIR, "data", "job_index"))
+
+# Random-projection signature length for approximate search
+JOB_INDEX_RP_BITS = int(os.getenv("JOB_INDEX_RP_BITS", 256))
+# Approximate mode re-scores this many candidates per requested result
+JOB_INDEX_RP_OVERSAMPLE = int(os.getenv("JOB_INDEX_RP_OVERSAMPLE", 20))
+# Vector encoding for new indexes; an existing index keeps the one in its header
+JOB_INDEX_CODEC = os.getenv("JOB_INDEX_CODEC", "float32")
+
+HEADER_FILE = "index.json"
+VECTORS_FILES = {"float32": "vectors.f32", "float16": "vectors.f16", "int8": "vectors.i8"}
+SCALES_FILE = "scales.f32"
+LOG_FILE = "meta.jsonl"
+LOCK_FILE = "index.lock"
+INDEX_FORMAT = 1
+
+
+class JobIndex:
+    """
+    Persistent nearest-job index.
+
+    Layout of the index directory:
+      index.json   model, dimension, capacity and vector codec
+      vectors.*    memory-mapped (capacity x dim) matrix of L2-normalized rows,
+                   float32 (.f32), float16 (.f16) or int8 (.i8)
+      scales.f32   per-row scales of an int8 index
+      meta.jsonl   append-only log of add/delete records (job id, title, skills, row)
+
+    Deletes are tombstones; compact() rewrites both files without them.
+    Every worker process has its own instance over the same files: writers
+    serialize on an flock of index.lock, and each instance replays log records
+    appended (or a log replaced by compaction) by the others before it reads.
+    Search is exact (one matrix-vector product over live rows) or approximate,
+    where random-projection sign signatures are compared by Hamming distance
+    and only the closest candidates are re-scored exactly.
+    """
+
+    def __init__(self, directory: str, model: str, dim: int, rp_bits: int = JOB_INDEX_RP_BITS,
+                 codec: str = JOB_INDEX_CODEC):
+        self.directory = directory
+        self.model = model
+        self.dim = dim
+        self.rp_bits = rp_bits
+        self._lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+        header = self._read_header()
+        if header is None:
+            self.capacity = 0
+            self.codec = VectorCodec(codec)
+            self._write_header()
+        else:
+            # Indexes written before codecs existed are float32
+            self.codec = VectorCodec(header.get("codec", "float32"))
+            if header["model"] != model or header["dim"] != dim:
+                raise ValueError(
+                    f"Job index at {directory} was built for {header['model']} ({header['dim']}d); "
+                    f"current provider is {model} ({dim}d). Rebuild the index."
+                )
+            self.capacity = header["capacity"]
+
+        # Fixed seed: signatures stay comparable across restarts
+        rng = np.random.default_rng(0)
+        self._planes = rng.standard_normal((rp_bits, dim)).astype(np.float32)
+
+        self._open_vectors()
+        self._load_log()
+
+    # -------------------- STORAGE --------------------
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_header(self):
+        try:
+            with open(self._path(HEADER_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_header(self):
+        tmp = self._path(HEADER_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "format": INDEX_FORMAT, "model": self.model, "dim": self.dim,
+                "capacity": self.capacity, "codec": self.codec.name,
+            }, f)
+        os.replace(tmp, self._path(HEADER_FILE))
+
+    def _open_array(self, name, dtype, shape):
+        path = self._path(name)
+        size = int(np.prod(shape)) * dtype.itemsize
+        with open(path, "ab") as f:
+            # Only grow: another process may already have grown the file further
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)
+        if not self.capacity:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_vectors(self):
+        self._vectors = self._open_array(
+            VECTORS_FILES[self.codec.name], self.codec.dtype, (self.capacity, self.dim)
+        )
+        self._scales = (
+            self._open_array(SCALES_FILE, np.dtype("<f4"), (self.capacity,)) if self.codec.scaled else None
+        )
+
+    def _flush(self):
+        for array in (self._vectors, self._scales):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self.capacity:
+            return
+        self._flush()
+        self.capacity = max(rows, self.capacity * 2, 1024)
+        self._open_vectors()
+        self._write_header()
+
+    def _read_log(self, offset: int):
+        """(inode, offset after the last complete line, records) of the log past offset."""
+        try:
+            with open(self._path(LOG_FILE), "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return None, 0, []
+        # A line another process is still writing is read on the next refresh
+        end = data.rfind(b"\n") + 1
+        return inode, offset + end, [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+
+    def _load_log(self):
+        self.count = 0
+        self.rows = {}
+        self.meta = []
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self._log_inode, self._log_offset, records = self._read_log(0)
+        for record in records:
+            self._apply(record)
+        if self.count > self.capacity:
+            self._reload_header()
+        self._signatures = self._signatures_for_rows(0, self.count)
+
+    def _reload_header(self):
+        header = self._read_header()
+        if header["capacity"] != self.capacity:
+            self.capacity = header["capacity"]
+            self._open_vectors()
+        self._grow_alive(self.capacity)
+
+    def _grow_alive(self, size: int):
+        if len(self.alive) < size:
+            self.alive = np.concatenate([self.alive, np.zeros(size - len(self.alive), dtype=bool)])
+
+    def _refresh(self):
+        """Catch up with adds, deletes and compactions made by other processes."""
+        try:
+            stat = os.stat(self._path(LOG_FILE))
+        except FileNotFoundError:
+            return
+        if stat.st_ino == self._log_inode and stat.st_size == self._log_offset:
+            return
+        if stat.st_ino != self._log_inode:
+            # Compacted elsewhere: vectors and log were both replaced
+            self.capacity = self._read_header()["capacity"]
+            self._open_vectors()
+            self._load_log()
+            return
+
+        start = self.count
+        _, self._log_offset, records = self._read_log(self._log_offset)
+        for record in records:
+            self._apply(record)
+        if self.count > self.capacity:
+            self._reload_header()
+        self._signatures = np.concatenate([self._signatures[:start], self._signatures_for_rows(start, self.count)])
+
+    @contextmanager
+    def _writing(self):
+        # Threads of this process first, then the other worker processes
+        with self._lock, open(self._path(LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                self._reload_header()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _apply(self, record):
+        if record["op"] == "add":
+            row = record["row"]
+            self.rows[record["job_id"]] = row
+            self.meta.extend([None] * (row + 1 - len(self.meta)))
+            self.meta[row] = {"job_id": record["job_id"], "title": record.get("title"), "skills": record.get("skills", [])}
+            self._grow_alive(row + 1)
+            self.alive[row] = True
+            self.count = max(self.count, row + 1)
+        elif record["op"] == "delete":
+            row = self.rows.pop(record["job_id"], None)
+            if row is not None:
+                self.alive[row] = False
+
+    def _append_log(self, records):
+        with open(self._path(LOG_FILE), "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            # Writers hold the index lock, so everything up to here is ours or already applied
+            self._log_offset = f.tell()
+
+    def _signatures_for(self, vectors):
+        return np.packbits(vectors @ self._planes.T > 0, axis=1)
+
+    def _decoded(self, rows):
+        return self.codec.decode(self._vectors[rows], self._scales[rows] if self.codec.scaled else None)
+
+    def _signatures_for_rows(self, start, stop, block=8192):
+        # Decoded a block at a time, so loading never holds a float32 copy of the index
+        signatures = [self._signatures_for(self._decoded(slice(i, min(i + block, stop))))
+                      for i in range(start, stop, block)]
+        return np.concatenate(signatures) if signatures else np.zeros((0, self.rp_bits // 8), dtype=np.uint8)
+
+    # -------------------- MUTATION --------------------
+
+    def add(self, job_ids: list, vectors, titles: list = None, skills: list = None) -> int:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(job_ids), self.dim)
+        # A job_id repeated within one batch keeps its last entry, as across batches
+        last = {job_id: i for i, job_id in enumerate(job_ids)}
+        if len(last) < len(job_ids):
+            keep = sorted(last.values())
+            job_ids = [job_ids[i] for i in keep]
+            vectors = vectors[keep]
+            titles = [titles[i] for i in keep] if titles else titles
+            skills = [skills[i] for i in keep] if skills else skills
+        codes, scales = self.codec.encode(vectors)
+
+        with self._writing():
+            records = [{"op": "delete", "job_id": job_id} for job_id in job_ids if job_id in self.rows]
+            start = self.count
+            self._ensure_capacity(start + len(job_ids))
+            self._grow_alive(self.capacity)
+
+            self._vectors[start:start + len(job_ids)] = codes
+            if self.codec.scaled:
+                self._scales[start:start + len(job_ids)] = scales
+            self._flush()
+            for offset, job_id in enumerate(job_ids):
+                records.append({
+                    "op": "add",
+                    "job_id": job_id,
+                    "row": start + offset,
+                    "title": titles[offset] if titles else None,
+                    "skills": list(skills[offset]) if skills else [],
+                })
+            self._append_log(records)
+            for record in records:
+                self._apply(record)
+            self._signatures = np.concatenate([
+                self._signatures[:start], self._signatures_for(self.codec.decode(codes, scales))
+            ])
+        return len(job_ids)
+
+    def delete(self, job_id: str) -> bool:
+        with self._writing():
+            if job_id not in self.rows:
+                return False
+            record = {"op": "delete", "job_id": job_id}
+            self._append_log([record])
+            self._apply(record)
+            return True
+
+    def compact(self) -> dict:
+        """Rewrite vectors and metadata without deleted rows."""
+        with self._writing():
+            live = np.flatnonzero(self.alive[:self.count])
+            before = self.count
+
+            capacity = max(len(live), 1024)
+            arrays = [(VECTORS_FILES[self.codec.name], self._vectors, self.codec.dtype, (capacity, self.dim))]
+            if self.codec.scaled:
+                arrays.append((SCALES_FILE, self._scales, np.dtype("<f4"), (capacity,)))
+            for name, source, dtype, shape in arrays:
+                packed = np.memmap(self._path(name + ".tmp"), dtype=dtype, mode="w+", shape=shape)
+                packed[:len(live)] = source[live]
+                packed.flush()
+                del packed
+
+            tmp_log = self._path(LOG_FILE + ".tmp")
+            with open(tmp_log, "w") as f:
+                for new_row, old_row in enumerate(live):
+                    f.write(json.dumps({"op": "add", "row": new_row, **self.meta[old_row]}) + "\n")
+
+            self._vectors = self._scales = None
+            for name, *_ in arrays:
+                os.replace(self._path(name + ".tmp"), self._path(name))
+            # The header goes first: a process that sees the new log must find the new capacity
+            self.capacity = capacity
+            self._write_header()
+            os.replace(tmp_log, self._path(LOG_FILE))
+            self._open_vectors()
+            self._load_log()
+
+        logger.info(f"Compacted job index: {before} rows -> {self.count} live rows")
+        return {"rows_before": before, "rows_after": self.count}
+
+    # -------------------- SEARCH --------------------
+
+    def search(self, query, top_k: int = 10, mode: str = "exact") -> list:
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            self._refresh()
+            count = self.count
+            vectors = self._vectors[:count]
+            scales = self._scales[:count] if self.codec.scaled else None
+            alive = self.alive[:count]
+            signatures = self._signatures[:count]
+            meta = self.meta
+
+        if mode == "exact":
+            live = int(alive.sum())
+            if live == 0:
+                return []
+            # Scored in place over the memmap, a block at a time; deleted rows are masked
+            scores = np.asarray(self.codec.dot(vectors, scales, query), dtype=np.float32)
+            scores[~alive] = -np.inf
+            return self._top(scores, None, min(top_k, live), meta)
+        elif mode == "approx":
+            query_signature = self._signatures_for(query[None, :])[0]
+            distances = popcount(signatures ^ query_signature).astype(np.int64)
+            distances[~alive] = self.rp_bits + 1
+            n_candidates = min(int(alive.sum()), max(top_k * JOB_INDEX_RP_OVERSAMPLE, 64))
+            if n_candidates == 0:
+                return []
+            candidates = np.argpartition(distances, n_candidates - 1)[:n_candidates]
+        else:
+            raise ValueError("mode must be 'exact' or 'approx'")
+
+        # Approximate candidates are few, so gathering their rows is cheap
+        scores = self.codec.dot(vectors[candidates], scales[candidates] if scales is not None else None, query)
+        return self._top(scores, candidates, min(top_k, len(candidates)), meta)
+
+    @staticmethod
+    def _top(scores, rows, k, meta) -> list:
+        """The k best scores; rows maps score positions to index rows (None: the same)."""
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            {**meta[i if rows is None else rows[i]], "score": float(scores[i])}
+            for i in best
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+        return {
+            "directory": self.directory,
+            "model": self.model,
+            "dim": self.dim,
+            "rows": self.count,
+            "live_jobs": len(self.rows),
+            "deleted_rows": self.count - len(self.rows),
+            "capacity": self.capacity,
+            "codec": self.codec.name,
+            "vector_bytes": self.count * self.codec.bytes_per_vector(self.dim),
+        }
+
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex:
+    """Process-wide index for the configured embedding provider."""
+    global _job_index
+    if _job_index is None:
+        with _job_index_lock:
+            if _job_index is None:
+                provider = get_provider()
+                _job_index = JobIndex(JOB_INDEX_DIR, provider.model, provider.dimension)
+    return _job_index
+
+
+def ingest_jobs(jobs: list, index: JobIndex = None) -> int:
+    """Embed and skill-tag job postings ({"job_id", "text", "title"}) and add them to the index."""
+    index = index or get_job_index()
+    skills_index = skill_catalogue.index
+    texts = [job["text"] for job in jobs]
+    return index.add(
+        [job["job_id"] for job in jobs],
+        np.stack([np.asarray(e, dtype=np.float32) for e in get_embeddings(texts)]),
+        titles=[job.get("title") for job in jobs],
+        skills=[skills_index.extract(preprocess_text(text)) for text in texts],
+    )
+
+
+def search_jobs_for_resume(resume_text: str, top_k: int = 10, mode: str = "exact", index: JobIndex = None) -> list:
+    index = index or get_job_index()
+    resume_skills = skill_catalogue.index.extract(preprocess_text(resume_text))
+    results = []
+    query = get_embeddings([resume_text])[0]
+    with stage("index_search"):
+        hits = index.search(query, top_k, mode)
+    for hit in hits:
+        match = calculate_match(resume_skills, hit["skills"])
+        results.append({
+            "job_id": hit["job_id"],
+            "title": hit["title"],
+            "semantic_match_percentage": round(hit["score"] * 100, 2),
+            "skill_match_percentage": match["match_percentage"],
+            "common_skills": match["common_skills"],
+            "missing_skills": match["missing_skills"],
+        })
+    return results
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from backend.segmenter import CHUNK_MAX_WORDS
+from backend.semantic_matcher import embed_document, get_provider, SEMANTIC_POOLING
+from backend.skill_catalogue import skill_catalogue
+from backend.text_preprocess import preprocess_text, PREPROCESS_VERSION
+from backend.logger import logger
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_PROFILES_DIR = os.getenv("JOB_PROFILES_DIR", os.path.join(BASE_DIR, "data", "job_profiles"))
+
+JobProfile = namedtuple(
+    "JobProfile",
+    ["job_id", "title", "text", "tokens", "skills", "vectors",
+     "skills_version", "embedding_version", "created_at", "updated_at"]
+)
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def skills_version() -> str:
+    """What the tokens and skills depend on: tokenizer and skill catalogue."""
+    return f"{PREPROCESS_VERSION}:{skill_catalogue.get().version}"
+
+
+def embedding_version() -> str:
+    """What the stored vectors depend on: model, dimension and chunking."""
+    provider = get_provider()
+    return f"{provider.model}:{provider.dimension}:{SEMANTIC_POOLING}:{CHUNK_MAX_WORDS}"
+
+
+class JobProfileRegistry:
+    """
+    Registered job postings with their tokens, skills and chunk embeddings
+    precomputed, so matching a resume against a posting only processes the
+    resume.
+
+    Each profile is <job_id>.json (text, tokens, skills, versions) plus
+    <job_id>.npy (chunk vectors, memory-mapped on load). Profiles record the
+    versions they were computed with; when the skill catalogue, tokenizer or
+    embedding model changes, the stale part is recomputed from the stored
+    text on next access.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.recomputed = 0
+        self.degraded = 0
+        self._profiles = {}
+        self._lock = threading.Lock()
+        # One per job_id: registering or recomputing a profile calls the
+        # provider under it, outside self._lock
+        self._recompute_locks = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{ext}")
+
+    def _compute(self, job_id, title, text, previous=None) -> JobProfile:
+        now = time.time()
+        current_skills, current_embedding = skills_version(), embedding_version()
+
+        if previous is not None and previous.skills_version == current_skills:
+            tokens, skills = previous.tokens, previous.skills
+        else:
+            tokens, skills = self._skills(text)
+
+        if previous is not None and previous.embedding_version == current_embedding:
+            vectors = previous.vectors
+        else:
+            vectors = embed_document(text)
+
+        return JobProfile(
+            job_id, title, text, tokens, skills, vectors, current_skills, current_embedding,
+            previous.created_at if previous is not None else now, now
+        )
+
+    @staticmethod
+    def _skills(text):
+        tokens = preprocess_text(text)
+        return tokens, skill_catalogue.index.extract(tokens)
+
+    def _degraded(self, profile: JobProfile) -> JobProfile:
+        # Fresh skills need no provider; vectors from another model are unusable
+        if profile.skills_version != skills_version():
+            tokens, skills = self._skills(profile.text)
+            profile = profile._replace(tokens=tokens, skills=skills, skills_version=skills_version())
+        if profile.embedding_version != embedding_version():
+            profile = profile._replace(vectors=None)
+        return profile
+
+    def _save(self, profile: JobProfile):
+        # Vectors first: a readable .json always has its matching .npy
+        vectors_tmp = self._path(profile.job_id, f"{os.getpid()}.tmp.npy")
+        np.save(vectors_tmp, np.asarray(profile.vectors, dtype=np.float32))
+        os.replace(vectors_tmp, self._path(profile.job_id, "npy"))
+
+        meta = {field: value for field, value in profile._asdict().items() if field != "vectors"}
+        meta["text_sha256"] = hashlib.sha256(profile.text.encode()).hexdigest()
+        meta_tmp = self._path(profile.job_id, f"{os.getpid()}.json.tmp")
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, self._path(profile.job_id, "json"))
+
+    def _mtime(self, job_id: str):
+        try:
+            return os.stat(self._path(job_id, "json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self, job_id: str):
+        try:
+            with open(self._path(job_id, "json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(self._path(job_id, "npy"), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        return JobProfile(**{field: meta[field] for field in JobProfile._fields if field != "vectors"}, vectors=vectors)
+
+    def _store(self, profile: JobProfile, save: bool):
+        if save:
+            self._save(profile)
+        self._profiles[profile.job_id] = (profile, self._mtime(profile.job_id))
+
+    def _cached(self, job_id: str):
+        # The stat catches profiles re-registered by another worker process
+        entry = self._profiles.get(job_id)
+        mtime = self._mtime(job_id)
+        if mtime is None:
+            self._profiles.pop(job_id, None)
+            return None
+        if entry is not None and entry[1] == mtime:
+            return entry[0]
+        profile = self._load(job_id)
+        if profile is not None:
+            self._profiles[job_id] = (profile, mtime)
+        return profile
+
+    def register(self, text: str, title: str = None, job_id: str = None) -> JobProfile:
+        """Analyze and store a posting. Without a job_id, the id is derived from the text."""
+        job_id = job_id or hashlib.sha256(text.encode()).hexdigest()[:16]
+        if not _JOB_ID.match(job_id):
+            raise ValueError("job_id may only contain letters, digits, '.', '_' and '-'")
+
+        # The provider call holds up only callers of this job_id
+        with self._recompute_lock(job_id):
+            with self._lock:
+                previous = self._cached(job_id)
+            if previous is not None and previous.text != text:
+                previous = None
+            if title is None and previous is not None:
+                title = previous.title
+            profile = self._compute(job_id, title, text, previous)
+            unchanged = previous is not None and (
+                (previous.title, previous.skills_version, previous.embedding_version)
+                == (profile.title, profile.skills_version, profile.embedding_version)
+            )
+            with self._lock:
+                self._store(previous if unchanged else profile, save=not unchanged)
+        return previous if unchanged else profile
+
+    def _recompute_lock(self, job_id: str):
+        with self._lock:
+            return self._recompute_locks.setdefault(job_id, threading.Lock())
+
+    def _stale(self, profile: JobProfile) -> bool:
+        return profile.skills_version != skills_version() or profile.embedding_version != embedding_version()
+
+    def get(self, job_id: str):
+        """
+        The profile, recomputed first if it is stale; None if not registered.
+
+        If a stale profile cannot be re-embedded (provider outage), it is
+        served with current skills and vectors=None, and retried on the next
+        access.
+        """
+        if not _JOB_ID.match(job_id):
+            return None
+        with self._lock:
+            profile = self._cached(job_id)
+            if profile is None or not self._stale(profile):
+                return profile
+
+        # The provider call holds up only callers of this job_id
+        with self._recompute_lock(job_id):
+            with self._lock:
+                profile = self._cached(job_id)
+            if profile is None or not self._stale(profile):
+                return profile
+            logger.info(f"Recomputing stale job profile {job_id}")
+            try:
+                fresh = self._compute(job_id, profile.title, profile.text, profile)
+            except Exception as e:
+                logger.warning(f"Could not recompute job profile {job_id}; serving it without embeddings: {e}")
+                self.degraded += 1
+                return self._degraded(profile)
+            with self._lock:
+                # Re-registered or deleted meanwhile: that version wins
+                current = self._cached(job_id)
+                if current is None or current.updated_at != profile.updated_at:
+                    return current
+                self._store(fresh, save=True)
+                self.recomputed += 1
+        return fresh
+
+    def delete(self, job_id: str) -> bool:
+        if not _JOB_ID.match(job_id):
+            return False
+        with self._lock:
+            self._profiles.pop(job_id, None)
+            found = False
+            for ext in ("json", "npy"):
+                try:
+                    os.remove(self._path(job_id, ext))
+                    found = True
+                except FileNotFoundError:
+                    pass
+        return found
+
+    def list(self) -> list:
+        summaries = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            summaries.append(summarize(meta))
+        return summaries
+
+
+def summarize(profile) -> dict:
+    data = profile._asdict() if isinstance(profile, JobProfile) else profile
+    return {
+        "job_id": data["job_id"],
+        "title": data["title"],
+        "skills": data["skills"],
+        "skills_version": data["skills_version"],
+        "embedding_version": data["embedding_version"],
+        "created_at": data["created_at"],
+        "updated_at": data["updated_at"],
+    }
+
+
+_job_profiles = None
+_job_profiles_lock = threading.Lock()
+
+
+def get_job_profiles() -> JobProfileRegistry:
+    global _job_profiles
+    if _job_profiles is None:
+        with _job_profiles_lock:
+            if _job_profiles is None:
+                _job_profiles = JobProfileRegistry(JOB_PROFILES_DIR)
+    return _job_profiles
@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    cumulative += count
+                    le = [("le", bound if bound == "+Inf" else repr(float(bound)))]
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "resume_analyzer_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "resume_analyzer_http_request_duration_seconds", "HTTP request latency by route", ("route",)
+)
+STAGE_LATENCY = registry.histogram(
+    "resume_analyzer_stage_duration_seconds", "Pipeline stage latency", ("stage",)
+)
+CACHE_REQUESTS = registry.counter(
+    "resume_analyzer_cache_requests_total", "Cache lookups by cache tier and result", ("cache", "result")
+)
+EMBEDDING_CALLS = registry.counter(
+    "resume_analyzer_embedding_api_calls_total", "Embedding provider calls", ("provider",)
+)
+EMBEDDING_TEXTS = registry.counter(
+    "resume_analyzer_embedding_texts_total", "Texts sent to the embedding provider", ("provider",)
+)
+EMBEDDING_ERRORS = registry.counter(
+    "resume_analyzer_embedding_api_errors_total", "Failed embedding provider calls", ("provider",)
+)
+DEGRADED_RESPONSES = registry.counter(
+    "resume_analyzer_degraded_responses_total", "Match responses scored without embeddings", ("reason",)
+)
+ARCHIVE_FILES = registry.counter(
+    "resume_analyzer_archive_files_total", "Files in uploaded resume archives by outcome", ("status",)
+)
+
+# Per-request stage list, read by the middleware for the Server-Timing header
+_request_stages = ContextVar("request_stages", default=None)
+
+
+class _StageTimer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_LATENCY.observe(elapsed, self.name)
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((self.name, elapsed))
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def stage(name: str):
+    """Time a block as a pipeline stage: `with stage("preprocess"): ...`"""
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _StageTimer(name)
+
+
+def cache_result(cache: str, hit: bool):
+    if METRICS_ENABLED:
+        CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def embedding_call(provider: str, texts: int, error: bool = False):
+    if METRICS_ENABLED:
+        EMBEDDING_CALLS.inc(provider)
+        EMBEDDING_TEXTS.inc(provider, amount=texts)
+        if error:
+            EMBEDDING_ERRORS.inc(provider)
+
+
+def degraded_response(reason: str):
+    if METRICS_ENABLED:
+        DEGRADED_RESPONSES.inc(reason)
+
+
+def archive_file(status: str):
+    if METRICS_ENABLED:
+        ARCHIVE_FILES.inc(status)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route request counts and latency, and an
+    optional Server-Timing header listing the stages timed so far.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stages = []
+        token = _request_stages.set(stages)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    totals = {}
+                    for name, elapsed in stages:
+                        totals[name] = totals.get(name, 0.0) + elapsed
+                    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+                    entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.1f}")
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", ", ".join(entries).encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            route = _route_label(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status["code"]))
+            HTTP_LATENCY.observe(time.perf_counter() - start, route)
@@ -0,0 +1,284 @@
+import json
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.redis_client import get_redis, RedisUnavailable
+from backend.logger import logger
+
+# slowapi: per-process fixed windows from the @limiter.limit decorators
+# redis:   token buckets shared by every replica (memory while Redis is down)
+# memory:  token buckets in this process (tests, single instance)
+# off:     no rate limiting
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "slowapi")
+
+# Per-client bucket: burst size and refill rate, in tokens
+RATE_LIMIT_CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", 60))
+RATE_LIMIT_REFILL_PER_SEC = float(os.getenv("RATE_LIMIT_REFILL_PER_SEC", 1.0))
+# Tokens per text actually sent to the embedding provider
+RATE_LIMIT_EMBED_COST = float(os.getenv("RATE_LIMIT_EMBED_COST", 1))
+# Global cap on provider embeddings per minute across all replicas (0 = off)
+RATE_LIMIT_EMBED_QUOTA = float(os.getenv("RATE_LIMIT_EMBED_QUOTA", 0))
+
+# path -> (base cost, expected provider embeddings). The embedding part is
+# charged up front and settled against what the request really embedded, so
+# embedding cache hits are refunded.
+DEFAULT_COSTS = {
+    "/preprocess-text": (1, 0),
+    "/extract-skills": (1, 0),
+    "/match-job": (1, 0),
+    "/parse-resume": (3, 0),
+    "/parse-resume/archive": (20, 0),
+    "/semantic-match": (1, 2),
+    "/final-match": (2, 2),
+    "/jobs/search": (1, 1),
+    "/rank": (2, 20),
+    "/jobs/index": (2, 10),
+    "/jobs/profiles": (1, 2),
+    "/batches": (20, 0),
+    "/batches/upload": (20, 0),
+}
+ENDPOINT_COSTS = {
+    **DEFAULT_COSTS,
+    **{path: tuple(cost) for path, cost in json.loads(os.getenv("RATE_LIMIT_COSTS", "{}")).items()},
+}
+
+BUCKET_TTL_MS = 3600 * 1000
+
+# Atomic refill-and-take. ARGV: capacity, refill/sec, cost, force, ttl_ms.
+# force=1 always applies the cost (settlement debits may go negative; refunds
+# are capped at capacity). Returns {allowed, tokens left, seconds to wait}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local force = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if force == 1 or tokens >= cost then
+  tokens = math.min(capacity, tokens - cost)
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[5]))
+local wait = 0
+if allowed == 0 then
+  wait = (cost - tokens) / rate
+end
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+
+class MemoryBuckets:
+    """Token buckets in process memory, with the same semantics as the Lua script."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float, force: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = force or tokens >= cost
+            if allowed:
+                tokens = min(capacity, tokens - cost)
+            self._buckets[key] = (tokens, now)
+        wait = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, tokens, wait
+
+
+class RedisBuckets:
+    """Token buckets in Redis, updated atomically by one Lua script per call."""
+
+    def __init__(self, redis, fallback: MemoryBuckets):
+        self.redis = redis
+        self.fallback = fallback
+        self._script = redis.client.register_script(TOKEN_BUCKET_LUA)
+
+    def take(self, key: str, capacity: float, rate: float, cost: float, force: bool = False):
+        try:
+            allowed, tokens, wait = self.redis.execute(lambda client: self._script(
+                keys=[f"ratelimit:{key}"],
+                args=[capacity, rate, cost, int(force), BUCKET_TTL_MS],
+                client=client
+            ))
+        except RedisUnavailable:
+            # Per-process limits while Redis is unreachable
+            return self.fallback.take(key, capacity, rate, cost, force)
+        return bool(allowed), float(tokens), float(wait)
+
+
+# Provider usage of the current request, filled in by the embedding helpers
+_request_usage = ContextVar("rate_limit_usage", default=None)
+
+
+def record_embedding_usage(hits: int = 0, misses: int = 0):
+    usage = _request_usage.get()
+    if usage is not None:
+        usage["hits"] += hits
+        usage["misses"] += misses
+
+
+class RateLimiter:
+    def __init__(self, buckets, capacity: float = RATE_LIMIT_CAPACITY, rate: float = RATE_LIMIT_REFILL_PER_SEC,
+                 embed_cost: float = RATE_LIMIT_EMBED_COST, embed_quota: float = RATE_LIMIT_EMBED_QUOTA,
+                 costs: dict = None):
+        self.buckets = buckets
+        self.capacity = capacity
+        self.rate = rate
+        self.embed_cost = embed_cost
+        self.embed_quota = embed_quota
+        self.costs = ENDPOINT_COSTS if costs is None else costs
+        self.rejected = 0
+        self.refunded = 0.0
+
+    def cost(self, path: str):
+        return self.costs.get(path)
+
+    def acquire(self, client_key: str, path: str):
+        """Charge the up-front cost; returns (allowed, charge, tokens left, retry after)."""
+        base, embeds = self.costs[path]
+        charge = base + embeds * self.embed_cost
+        if self.embed_quota and embeds:
+            allowed, _, wait = self.buckets.take(
+                "global:embedding", self.embed_quota, self.embed_quota / 60, embeds
+            )
+            if not allowed:
+                self.rejected += 1
+                return False, 0, 0, wait
+        allowed, tokens, wait = self.buckets.take(f"client:{client_key}", self.capacity, self.rate, charge)
+        if not allowed:
+            self.rejected += 1
+            if self.embed_quota and embeds:
+                self.buckets.take("global:embedding", self.embed_quota, self.embed_quota / 60, -embeds, force=True)
+        return allowed, charge, tokens, wait
+
+    def settle(self, client_key: str, path: str, usage: dict):
+        """Replace the estimated embedding charge with what the request actually sent to the provider."""
+        base, embeds = self.costs[path]
+        if not embeds:
+            return
+        delta_embeds = usage["misses"] - embeds
+        if delta_embeds == 0:
+            return
+        delta = delta_embeds * self.embed_cost
+        if delta < 0:
+            self.refunded -= delta
+        self.buckets.take(f"client:{client_key}", self.capacity, self.rate, delta, force=True)
+        if self.embed_quota:
+            self.buckets.take("global:embedding", self.embed_quota, self.embed_quota / 60, delta_embeds, force=True)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.buckets).__name__,
+            "capacity": self.capacity,
+            "refill_per_sec": self.rate,
+            "rejected": self.rejected,
+            "refunded_tokens": self.refunded,
+        }
+
+
+def create_rate_limiter():
+    if RATE_LIMIT_BACKEND not in ("redis", "memory"):
+        return None
+    memory = MemoryBuckets()
+    if RATE_LIMIT_BACKEND == "redis":
+        redis = get_redis()
+        if redis is not None:
+            return RateLimiter(RedisBuckets(redis, memory))
+        logger.warning("RATE_LIMIT_BACKEND=redis but REDIS_URL is not set; using in-process token buckets")
+    return RateLimiter(memory)
+
+
+_rate_limiter = None
+_rate_limiter_initialized = False
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Shared token-bucket limiter, or None unless RATE_LIMIT_BACKEND is redis or memory."""
+    global _rate_limiter, _rate_limiter_initialized
+    if not _rate_limiter_initialized:
+        with _rate_limiter_lock:
+            if not _rate_limiter_initialized:
+                _rate_limiter = create_rate_limiter()
+                _rate_limiter_initialized = True
+    return _rate_limiter
+
+
+def _client_key(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI token-bucket limiter for the endpoints in ENDPOINT_COSTS.
+
+    The bucket is charged before the request runs, then settled once it has
+    finished, so a request served from the embedding cache only pays its base
+    cost. Rejected requests get 429 with Retry-After.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or RATE_LIMIT_BACKEND in ("slowapi", "off"):
+            await self.app(scope, receive, send)
+            return
+        limiter = await run_in_threadpool(get_rate_limiter)
+        path = scope["path"]
+        if limiter is None or limiter.cost(path) is None:
+            await self.app(scope, receive, send)
+            return
+
+        client_key = _client_key(scope)
+        allowed, charge, tokens, wait = await run_in_threadpool(limiter.acquire, client_key, path)
+        if not allowed:
+            retry_after = str(max(1, math.ceil(wait)))
+            body = json.dumps({"error": "Rate limit exceeded", "retry_after": float(retry_after)}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-ratelimit-remaining", str(int(tokens)).encode()),
+                ]
+            await send(message)
+
+        usage = {"hits": 0, "misses": 0}
+        token = _request_usage.set(usage)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_usage.reset(token)
+            try:
+                await run_in_threadpool(limiter.settle, client_key, path, usage)
+            except Exception:
+                logger.error("Rate limit settlement failed", exc_info=True)
@@ -0,0 +1,172 @@
+import os
+import threading
+
+import redis
+
+from backend.circuit_breaker import CircuitBreaker
+from backend.metrics import stage
+from backend.logger import logger
+
+# Use REDIS_URL from environment variables (Render provides this)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 32))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+# Per-command socket timeout; a cache lookup slower than this is treated as a miss
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.25))
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", 3))
+REDIS_BREAKER_RESET = float(os.getenv("REDIS_BREAKER_RESET", 10))
+# While the breaker is open, a background thread pings this often
+REDIS_RECONNECT_INTERVAL = float(os.getenv("REDIS_RECONNECT_INTERVAL", 1))
+
+
+class RedisUnavailable(Exception):
+    pass
+
+
+class RedisLayer:
+    """
+    Redis access for caches: one explicit connection pool, per-call timeouts,
+    single-round-trip multi-key operations and a circuit breaker.
+
+    When calls keep failing the breaker opens and every cache call returns
+    immediately (a miss) instead of waiting on timeouts; a background thread
+    pings Redis and closes the breaker as soon as it answers again.
+    """
+
+    def __init__(self, url: str = None, client=None,
+                 max_connections: int = REDIS_MAX_CONNECTIONS,
+                 socket_timeout: float = REDIS_SOCKET_TIMEOUT,
+                 connect_timeout: float = REDIS_CONNECT_TIMEOUT,
+                 reconnect_interval: float = REDIS_RECONNECT_INTERVAL):
+        if client is None:
+            self.pool = redis.ConnectionPool.from_url(
+                url,
+                max_connections=max_connections,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=connect_timeout,
+                health_check_interval=30,
+            )
+            client = redis.Redis(connection_pool=self.pool)
+        else:
+            self.pool = None
+        self.client = client
+        self.reconnect_interval = reconnect_interval
+        self.breaker = CircuitBreaker("redis", REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET)
+        self.errors = 0
+        self._reconnect_thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state == "closed"
+
+    def execute(self, fn):
+        """Run fn(client) through the breaker; raises RedisUnavailable on failure or while open."""
+        if not self.breaker.allow():
+            raise RedisUnavailable("Redis circuit is open")
+        try:
+            with stage("redis"):
+                result = fn(self.client)
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            self.breaker.record_failure()
+            if self.breaker.state == "open":
+                self._start_reconnect()
+            raise RedisUnavailable(str(e)) from e
+        self.breaker.record_success()
+        return result
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.execute(lambda client: client.ping()))
+        except RedisUnavailable:
+            return False
+
+    def get(self, key: str):
+        return self.execute(lambda client: client.get(key))
+
+    def mget(self, keys: list) -> list:
+        if not keys:
+            return []
+        return self.execute(lambda client: client.mget(keys))
+
+    def setex(self, key: str, ttl: int, value):
+        return self.execute(lambda client: client.setex(key, ttl, value))
+
+    def set_many(self, items, ttl: int):
+        """SETEX every (key, value) pair in one pipelined round trip."""
+        items = list(items)
+        if not items:
+            return
+
+        def run(client):
+            pipe = client.pipeline(transaction=False)
+            for key, value in items:
+                pipe.setex(key, ttl, value)
+            return pipe.execute()
+        self.execute(run)
+
+    def _start_reconnect(self):
+        with self._lock:
+            if self._reconnect_thread is not None and self._reconnect_thread.is_alive():
+                return
+            self._reconnect_thread = threading.Thread(target=self._reconnect_loop, name="redis-reconnect", daemon=True)
+            self._reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        event = threading.Event()
+        while self.breaker.state != "closed":
+            event.wait(self.reconnect_interval)
+            try:
+                if self.pool is not None:
+                    # Drop sockets that died with the outage
+                    self.pool.disconnect(inuse_connections=False)
+                self.client.ping()
+            except (redis.RedisError, OSError):
+                continue
+            logger.info("Reconnected to Redis")
+            self.breaker.close()
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "errors": self.errors,
+            "breaker": self.breaker.stats(),
+            "max_connections": self.pool.max_connections if self.pool is not None else None,
+        }
+
+
+_redis = None
+_redis_initialized = False
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """Shared RedisLayer, or None when REDIS_URL is not configured."""
+    global _redis, _redis_initialized
+    if _redis_initialized:
+        return _redis
+    with _redis_lock:
+        if _redis_initialized:
+            return _redis
+        if REDIS_URL:
+            _redis = RedisLayer(REDIS_URL)
+            if _redis.ping():
+                logger.info("Connected to Redis successfully")
+            else:
+                # Keep the layer: it serves misses until the reconnect loop gets through
+                logger.warning("Redis is unreachable; caching in process until it comes back")
+                _redis.breaker.trip()
+                _redis._start_reconnect()
+        else:
+            logger.warning("REDIS_URL not found. Using in-process caches only.")
+        _redis_initialized = True
+    return _redis
+
+
+def connect_redis():
+    """Startup check: create the layer and fail the (optional) phase if Redis is down."""
+    layer = get_redis()
+    if layer is not None and not layer.healthy:
+        raise RedisUnavailable("Redis is unreachable; reconnecting in the background")
+    return layer
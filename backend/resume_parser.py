@@ -1,24 +1,181 @@
+import io
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
 import pdfplumber
 from docx import Document
-import os
 
-def parse_pdf(file_path: str) -> str:
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return text.strip()
+from backend.logger import logger
+from backend.worker_pool import WorkerPool, WorkerTimeout
+
+# Hard cap on pages read from any PDF
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+# Wall-clock budget for extracting one PDF
+PDF_PARSE_TIMEOUT = float(os.getenv("PDF_PARSE_TIMEOUT", 20))
+# Pages handled by one pool task; longer PDFs are split across workers
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 8))
+# 0 parses in-process (no isolation, no timeout)
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Bump whenever extracted text for the same file changes; the page cap is part of it
+PARSER_VERSION = f"1-p{PDF_MAX_PAGES}"
+
+
+class ResumeParseTimeout(Exception):
+    pass
+
+
+def _as_stream(source):
+    # pdfplumber and python-docx accept paths and binary file objects
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+# -------------------- STREAMING EXTRACTION --------------------
+
+def _iter_pages(pdf, start: int, end: int):
+    for number in range(start, min(end, len(pdf.pages))):
+        page = pdf.pages[number]
+        page_text = page.extract_text()
+        page.close()
+        if page_text:
+            yield page_text
+
 
+def iter_pdf_pages(source, max_pages: int = PDF_MAX_PAGES):
+    """Yield the text of each non-empty page; parsed page objects are released as we go."""
+    with pdfplumber.open(_as_stream(source)) as pdf:
+        yield from _iter_pages(pdf, 0, max_pages)
 
-def parse_docx(file_path: str) -> str:
-    doc = Document(file_path)
-    text = []
+
+def iter_docx_paragraphs(source):
+    doc = Document(_as_stream(source))
     for para in doc.paragraphs:
         if para.text:
-            text.append(para.text)
-    return "\n".join(text).strip()
+            yield para.text
+
+
+def iter_resume_text(source, filename: str):
+    """Stream resume text piece by piece (pages for PDF, paragraphs for DOCX)."""
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext == ".pdf":
+        return iter_pdf_pages(source)
+    elif ext == ".docx":
+        return iter_docx_paragraphs(source)
+    else:
+        raise ValueError("Unsupported file format. Only PDF and DOCX are allowed.")
+
+
+# -------------------- PAGE-PARALLEL PDF POOL --------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(PDF_PARSE_WORKERS)
+        return _pool
+
+
+def shutdown_parser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def _extract_page_range(data: bytes, start: int, end: int):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages), list(_iter_pages(pdf, start, end))
+
+
+def _extract_shared_range(name: str, size: int, start: int, end: int):
+    # Attaching registers the block again with the resource tracker, which
+    # spawned workers share with the parent; that is a no-op there, and
+    # unregistering here would drop the parent's own registration
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return _extract_page_range(bytes(shm.buf[:size]), start, end)
+    finally:
+        shm.close()
+
+
+@contextmanager
+def _shared_bytes(data: bytes):
+    # Workers read the PDF from one shared block instead of each task pickling a copy
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shm.buf[:len(data)] = data
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _parse_pdf_in_pool(data: bytes, max_pages: int, timeout: float, extract=_extract_shared_range) -> list:
+    deadline = time.monotonic() + timeout
+    pool = _get_pool()
+    try:
+        with _shared_bytes(data) as name:
+            # The first task also reports the page count, so the parent never parses the PDF itself
+            first_end = min(PDF_PAGES_PER_TASK, max_pages)
+            page_count, pages = pool.run(extract, (name, len(data), 0, first_end), deadline)
+
+            limit = min(page_count, max_pages)
+            ranges = [
+                (name, len(data), start, min(start + PDF_PAGES_PER_TASK, limit))
+                for start in range(first_end, limit, PDF_PAGES_PER_TASK)
+            ]
+            for _, range_pages in pool.run_many(extract, ranges, deadline):
+                pages.extend(range_pages)
+    except WorkerTimeout:
+        # Only the workers running this PDF were killed
+        raise ResumeParseTimeout(f"PDF parsing exceeded {timeout}s")
+
+    if page_count > max_pages:
+        logger.warning(f"PDF has {page_count} pages; only the first {max_pages} were parsed")
+    return pages
+
+
+# -------------------- WHOLE-DOCUMENT HELPERS --------------------
+
+def parse_pdf(source, max_pages: int = PDF_MAX_PAGES, timeout: float = PDF_PARSE_TIMEOUT) -> str:
+    if PDF_PARSE_WORKERS <= 0:
+        return "\n".join(iter_pdf_pages(source, max_pages=max_pages)).strip()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.read()
+    return "\n".join(_parse_pdf_in_pool(data, max_pages, timeout)).strip()
+
+
+def parse_docx(source) -> str:
+    return "\n".join(iter_docx_paragraphs(source)).strip()
+
+
+def extract_resume_bytes(data: bytes, filename: str) -> str:
+    """Extract text from an in-memory upload; no temporary file is written."""
+    ext = os.path.splitext(filename)[1].lower()
+
+    if ext == ".pdf":
+        return parse_pdf(data)
+    elif ext == ".docx":
+        return parse_docx(data)
+    else:
+        raise ValueError("Unsupported file format. Only PDF and DOCX are allowed.")
 
 
 def extract_resume_text(file_path: str) -> str:
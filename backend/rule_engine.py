@@ -0,0 +1,174 @@
+import json
+import os
+import string
+from collections import namedtuple
+
+from backend.hot_reload import HotReloader
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULES_PATH = os.getenv("RECOMMENDATION_RULES_PATH", os.path.join(BASE_DIR, "data", "recommendation_rules.json"))
+
+# How often (seconds) request-path lookups stat() the file for changes
+RULES_RELOAD_INTERVAL = float(os.getenv("RULES_RELOAD_INTERVAL", 5))
+
+RULE_KINDS = ("recommendations", "rewrites")
+
+# Skill conditions take one skill or a list (all must hold). The first of
+# job_has / missing / resume_has is the rule's index key.
+SKILL_CONDITIONS = ("job_has", "missing", "resume_has", "resume_lacks", "job_lacks")
+INDEXED_CONDITIONS = ("job_has", "missing", "resume_has")
+# Score band: min_score <= score < max_score
+SCORE_CONDITIONS = ("min_score", "max_score")
+TEMPLATE_FIELDS = {"missing_skills", "score", "skill"}
+
+Rule = namedtuple("Rule", ["position", "id", "when", "for_each", "text"])
+
+# Immutable view of one loaded version of the rules file
+RuleSnapshot = namedtuple(
+    "RuleSnapshot",
+    ["rules", "rule_count", "version", "content_hash", "loaded_at", "mtime", "path"]
+)
+
+
+def _skills(value) -> tuple:
+    values = [value] if isinstance(value, str) else value
+    return tuple(skill.strip().lower() for skill in values)
+
+
+def _compile_rule(position: int, raw: dict) -> Rule:
+    rule_id = raw.get("id", str(position))
+    when = dict(raw.get("when", {}))
+    unknown = set(when) - set(SKILL_CONDITIONS) - set(SCORE_CONDITIONS) - {"has_missing"}
+    if unknown:
+        raise ValueError(f"Rule {rule_id}: unknown conditions {sorted(unknown)}")
+    for key in SKILL_CONDITIONS:
+        if key in when:
+            when[key] = _skills(when[key])
+
+    for_each = raw.get("for_each")
+    if for_each not in (None, "missing_skills"):
+        raise ValueError(f"Rule {rule_id}: for_each must be 'missing_skills'")
+    text = raw["text"]
+    fields = {name for _, name, _, _ in string.Formatter().parse(text) if name is not None}
+    allowed = TEMPLATE_FIELDS if for_each else TEMPLATE_FIELDS - {"skill"}
+    if not fields <= allowed:
+        raise ValueError(f"Rule {rule_id}: unknown template fields {sorted(fields - allowed)}")
+    return Rule(position, rule_id, when, for_each, text)
+
+
+class CompiledRules:
+    """
+    One kind of rule, indexed by skill.
+
+    Each rule that names a skill it needs (job_has, missing or resume_has) is
+    filed under that skill only; the rest apply to every request. Evaluating
+    a request looks up its skills in the three tables, so the cost depends on
+    the skills present and the rules that mention them, not on the total
+    number of rules. Matches are emitted in file order.
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self.unindexed = []
+        self.by_skill = {key: {} for key in INDEXED_CONDITIONS}
+        for rule in rules:
+            key = next((key for key in INDEXED_CONDITIONS if key in rule.when), None)
+            if key is None:
+                self.unindexed.append(rule)
+            else:
+                self.by_skill[key].setdefault(rule.when[key][0], []).append(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def candidates(self, resume_skills: set, job_skills: set, missing_skills: set) -> list:
+        found = list(self.unindexed)
+        for key, skills in (("job_has", job_skills), ("missing", missing_skills), ("resume_has", resume_skills)):
+            table = self.by_skill[key]
+            if table:
+                for skill in skills:
+                    found.extend(table.get(skill, ()))
+        found.sort(key=lambda rule: rule.position)
+        return found
+
+    def evaluate(self, resume_skills, job_skills, missing_skills, score=None) -> list:
+        resume_set, job_set, missing_set = set(resume_skills), set(job_skills), set(missing_skills)
+        held = {
+            "job_has": lambda skill: skill in job_set,
+            "missing": lambda skill: skill in missing_set,
+            "resume_has": lambda skill: skill in resume_set,
+            "resume_lacks": lambda skill: skill not in resume_set,
+            "job_lacks": lambda skill: skill not in job_set,
+        }
+        fields = {"missing_skills": ", ".join(missing_skills), "score": score}
+
+        output = []
+        for rule in self.candidates(resume_set, job_set, missing_set):
+            when = rule.when
+            if "has_missing" in when and bool(missing_skills) != when["has_missing"]:
+                continue
+            if "min_score" in when and (score is None or score < when["min_score"]):
+                continue
+            if "max_score" in when and (score is None or score >= when["max_score"]):
+                continue
+            if not all(held[key](skill) for key in SKILL_CONDITIONS if key in when for skill in when[key]):
+                continue
+            if rule.for_each:
+                output.extend(rule.text.format(**fields, skill=skill) for skill in missing_skills)
+            else:
+                output.append(rule.text.format(**fields))
+        return output
+
+
+def compile_rules(data: dict) -> dict:
+    unknown = set(data) - set(RULE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown rule kinds {sorted(unknown)}")
+    return {
+        kind: CompiledRules([_compile_rule(i, raw) for i, raw in enumerate(data.get(kind, []))])
+        for kind in RULE_KINDS
+    }
+
+
+def _compile_snapshot(raw: bytes) -> dict:
+    rules = compile_rules(json.loads(raw.decode("utf-8")))
+    return {"rules": rules, "rule_count": {kind: len(compiled) for kind, compiled in rules.items()}}
+
+
+class RuleEngine:
+    """
+    Recommendation and rewrite rules loaded from a JSON file.
+
+    Hot-reloaded like the skill catalogue (see HotReloader): a changed file
+    is recompiled and swapped in as a new immutable snapshot, and a file
+    that fails to compile is logged while the previous rules stay in use.
+    """
+
+    def __init__(self, path: str, reload_interval: float = RULES_RELOAD_INTERVAL):
+        self._file = HotReloader(
+            path, "recommendation rules", _compile_snapshot, RuleSnapshot, reload_interval,
+            describe=lambda snapshot: f"{sum(snapshot.rule_count.values())} rules"
+        )
+
+    def get(self) -> RuleSnapshot:
+        return self._file.get()
+
+    def reload(self, force: bool = False) -> RuleSnapshot:
+        return self._file.reload(force)
+
+    def evaluate(self, kind: str, resume_skills, job_skills, missing_skills, score=None) -> list:
+        return self.get().rules[kind].evaluate(resume_skills, job_skills, missing_skills, score)
+
+    def info(self) -> dict:
+        snapshot = self.get()
+        return {
+            "path": snapshot.path,
+            "version": snapshot.version,
+            "content_hash": snapshot.content_hash,
+            "rule_count": snapshot.rule_count,
+            "loaded_at": snapshot.loaded_at,
+            "mtime": snapshot.mtime,
+        }
+
+
+recommendation_rules = RuleEngine(RULES_PATH)
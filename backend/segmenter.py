@@ -0,0 +1,109 @@
+import os
+import re
+from collections import namedtuple
+
+from backend.logger import logger
+
+# Upper bound on words per chunk, kept well under the embedding model's input limit
+CHUNK_MAX_WORDS = int(os.getenv("CHUNK_MAX_WORDS", 120))
+# Chunks beyond this many per document are dropped (and logged), so a huge
+# upload cannot fan out into unbounded embedding work
+CHUNK_MAX_CHUNKS = int(os.getenv("CHUNK_MAX_CHUNKS", 64))
+
+Chunk = namedtuple("Chunk", ["section", "text"])
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective", "about me", "career objective"),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "relevant experience",
+    ),
+    "projects": ("projects", "personal projects", "academic projects", "key projects", "selected projects"),
+    "skills": (
+        "skills", "technical skills", "core skills", "key skills", "core competencies",
+        "competencies", "technologies", "tools", "tech stack", "skills and tools",
+    ),
+    "education": ("education", "academic background", "qualifications", "education and training"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "training"),
+}
+
+_HEADING_NAMES = {
+    heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings
+}
+# A heading is a short line, optionally decorated ("SKILLS:", "## Projects", "Experience -")
+_HEADING = re.compile(r"^[\s#*\-=_|]*([A-Za-z][A-Za-z &/]{1,40}?)[\s:\-=_|]*$")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def heading_section(line: str):
+    """The canonical section a line opens, or None if it is not a heading."""
+    match = _HEADING.match(line)
+    if not match:
+        return None
+    name = " ".join(match.group(1).lower().replace("&", "and").split())
+    return _HEADING_NAMES.get(name)
+
+
+def split_sections(text: str) -> list:
+    """[(section, body)] in document order; text before the first heading is "header"."""
+    sections = []
+    section, lines = "header", []
+    for line in text.splitlines():
+        found = heading_section(line) if len(line) <= 48 else None
+        if found:
+            if any(l.strip() for l in lines):
+                sections.append((section, "\n".join(lines)))
+            section, lines = found, []
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((section, "\n".join(lines)))
+    return sections
+
+
+def _pack(lines: list, max_words: int):
+    # Greedy line packing; a single over-long line is split into word windows
+    chunk, size = [], 0
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        if len(words) > max_words:
+            if chunk:
+                yield " ".join(chunk)
+                chunk, size = [], 0
+            for start in range(0, len(words), max_words):
+                yield " ".join(words[start:start + max_words])
+            continue
+        if size + len(words) > max_words and chunk:
+            yield " ".join(chunk)
+            chunk, size = [], 0
+        chunk.append(" ".join(words))
+        size += len(words)
+    if chunk:
+        yield " ".join(chunk)
+
+
+def segment(text: str, max_words: int = CHUNK_MAX_WORDS, max_chunks: int = CHUNK_MAX_CHUNKS) -> list:
+    """
+    Split a document into section-tagged chunks of at most max_words words.
+
+    Packing restarts at every blank line and every section heading, so an edit
+    only changes the chunks of the paragraph it falls in; every other chunk
+    keeps its exact text and therefore its cached embedding. Past max_chunks
+    the rest of the document is dropped.
+    """
+    chunks = []
+    for section, body in split_sections(text):
+        for paragraph in _BLANK_LINES.split(body):
+            for chunk_text in _pack(paragraph.splitlines(), max_words):
+                chunks.append(Chunk(section, chunk_text))
+
+    if len(chunks) > max_chunks:
+        dropped = chunks[max_chunks:]
+        logger.warning(
+            f"Document has {len(chunks)} chunks; only the first {max_chunks} are used "
+            f"({sum(len(chunk.text.split()) for chunk in dropped)} words dropped)"
+        )
+        chunks = chunks[:max_chunks]
+    return chunks
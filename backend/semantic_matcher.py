@@ -1,34 +1,61 @@
 import os
-import json
-import hashlib
+import asyncio
+import threading
 import numpy as np
-from google import genai
-import redis
+from starlette.concurrency import run_in_threadpool
 from backend.logger import logger
+from backend.metrics import stage, embedding_call
+from backend.embedding_client import (
+    AsyncEmbeddingClient, EmbeddingUnavailable, EMBED_MAX_BATCH_SIZE, EMBED_BREAKER_FAILURES, EMBED_BREAKER_RESET
+)
+from backend.circuit_breaker import CircuitBreaker
+from backend.deadline import current_deadline, DeadlineExceeded
+from backend.embedding_cache import EmbeddingCache
+from backend.embedding_providers import create_provider
+from backend.redis_client import get_redis
+from backend.rate_limiter import record_embedding_usage
+from backend.segmenter import segment
 
-# Configure Gemini with new SDK
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# How chunk x job-chunk similarities become one score:
+#   max       each job chunk takes its best-matching resume chunk, then average
+#   topk      as max, averaging the SEMANTIC_POOL_TOPK best resume chunks
+#   mean      average of the whole matrix
+#   document  no chunking: one embedding per whole text
+SEMANTIC_POOLING = os.getenv("SEMANTIC_POOLING", "max")
+SEMANTIC_POOL_TOPK = int(os.getenv("SEMANTIC_POOL_TOPK", 3))
 
-# Configure Redis
-# Use REDIS_URL from environment variables (Render provides this)
-redis_url = os.getenv("REDIS_URL")
-redis_client = None
+# Provider and cache are created on first use (or by the startup warmup),
+# never at import time
+_provider = None
+_embedding_cache = None
+_init_lock = threading.RLock()
 
-if redis_url:
-    try:
-        redis_client = redis.from_url(redis_url)
-        # Test connection
-        redis_client.ping()
-        logger.info("Connected to Redis successfully")
-    except Exception as e:
-        logger.warning(f"Failed to connect to Redis: {e}. Caching disabled.")
-        redis_client = None
-else:
-    logger.warning("REDIS_URL not found. Caching disabled.")
+# Shared by the sync and batched async paths, so an outage seen by one
+# fails the other fast as well
+provider_breaker = CircuitBreaker("embedding_provider", EMBED_BREAKER_FAILURES, EMBED_BREAKER_RESET)
+
+def get_provider():
+    """Embedding provider (EMBEDDING_PROVIDER=gemini|hashing)."""
+    global _provider
+    if _provider is None:
+        with _init_lock:
+            if _provider is None:
+                _provider = create_provider()
+    return _provider
+
+def get_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _init_lock:
+            if _embedding_cache is None:
+                provider = get_provider()
+                _embedding_cache = EmbeddingCache(provider.model, provider.dimension, get_redis())
+    return _embedding_cache
 
 def cosine_similarity(vec1, vec2):
-    vec1 = np.array(vec1)
-    vec2 = np.array(vec2)
+    # asarray: cached float32 vectors are used as-is, without a copy
+    vec1 = np.asarray(vec1)
+    vec2 = np.asarray(vec2)
 
     return np.dot(vec1, vec2) / (
         np.linalg.norm(vec1) * np.linalg.norm(vec2)
@@ -36,42 +63,53 @@ def cosine_similarity(vec1, vec2):
 
 def get_embedding_key(text):
     """Generate a unique key for the text to use in Redis."""
-    return f"embedding:{hashlib.sha256(text.encode()).hexdigest()}"
+    return get_embedding_cache().key(text)
+
+def _cache_get(text):
+    vector = get_embedding_cache().get(text)
+    if vector is not None:
+        logger.info("Cache Hit! Returning stored embedding.")
+    return vector
+
+def _cache_set(text, embedding):
+    return get_embedding_cache().set(text, embedding)
+
+def _embed_sync(provider, texts):
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded("No request budget left for embedding")
+    if not provider_breaker.allow():
+        raise EmbeddingUnavailable("Embedding provider circuit is open")
+    with stage("embedding_api"):
+        try:
+            vectors = provider.embed(texts)
+        except Exception:
+            embedding_call(provider.name, len(texts), error=True)
+            provider_breaker.record_failure()
+            raise
+    embedding_call(provider.name, len(texts))
+    provider_breaker.record_success()
+    return vectors
 
 def get_embedding(text):
+    provider = get_provider()
     if not text or not text.strip():
-        return np.zeros(768) # Return zero vector or handle appropriately
+        return np.zeros(provider.dimension, dtype=np.float32) # Return zero vector or handle appropriately
 
     # 1. Check Cache
-    if redis_client:
-        key = get_embedding_key(text)
-        try:
-            cached_data = redis_client.get(key)
-            if cached_data:
-                logger.info("Cache Hit! Returning stored embedding.")
-                return json.loads(cached_data)
-        except Exception as e:
-            logger.error(f"Redis read error: {e}")
+    cached = _cache_get(text)
+    if cached is not None:
+        record_embedding_usage(hits=1)
+        return cached
+    record_embedding_usage(misses=1)
 
     # 2. Call API if not in cache
     try:
-        logger.info("Cache Miss. Calling Gemini API...")
-        response = client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=text
-        )
-        embedding = response.embeddings[0].values
+        logger.info(f"Cache Miss. Calling {provider.name} embedding provider...")
+        embedding = _embed_sync(provider, [text])[0]
 
         # 3. Store in Cache
-        if redis_client:
-            try:
-                # Store as JSON string, expire in 24 hours (86400 seconds) or keep indefinitely
-                # Let's keep it for 7 days (604800 seconds) as embeddings don't change for same text
-                redis_client.setex(key, 604800, json.dumps(embedding))
-            except Exception as e:
-                logger.error(f"Redis write error: {e}")
-
-        return embedding
+        return _cache_set(text, embedding)
         
     except Exception as e:
         logger.error(f"Error generating embedding: {e}")
@@ -79,17 +117,163 @@ def get_embedding(text):
         # For now, let's re-raise to be safe.
         raise e
 
-def semantic_similarity(resume_text, job_text):
-    try:
-        resume_embedding = get_embedding(resume_text)
-        job_embedding = get_embedding(job_text)
-        
-        if resume_embedding is None or job_embedding is None:
-            return 0.0
+def get_embeddings(texts, batch_size=EMBED_MAX_BATCH_SIZE):
+    """Embeddings for many texts: one batched cache lookup, then batched provider calls for the misses."""
+    provider = get_provider()
+    embedding_cache = get_embedding_cache()
+    embeddings = [None] * len(texts)
+    misses = {}
+    lookups = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            embeddings[i] = np.zeros(provider.dimension, dtype=np.float32)
+        else:
+            lookups.setdefault(text, []).append(i)
+
+    unique = list(lookups)
+    for text, cached in zip(unique, embedding_cache.get_many(unique)):
+        if cached is not None:
+            for i in lookups[text]:
+                embeddings[i] = cached
+        else:
+            misses[text] = lookups[text]
+    record_embedding_usage(hits=len(unique) - len(misses), misses=len(misses))
+
+    pending = list(misses)
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        logger.info(f"Embedding {len(batch)} uncached texts with {provider.name} provider")
+        vectors = embedding_cache.set_many(batch, _embed_sync(provider, batch))
+        for text, vector in zip(batch, vectors):
+            for i in misses[text]:
+                embeddings[i] = vector
+
+    return embeddings
+
+def document_texts(text, pooling=SEMANTIC_POOLING):
+    """The texts embedded for a document: its section chunks, or the whole text."""
+    if not text or not text.strip():
+        return []
+    if pooling == "document":
+        return [text]
+    return [chunk.text for chunk in segment(text)]
+
+def _normalized_rows(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), get_provider().dimension)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
 
-        similarity = cosine_similarity(resume_embedding, job_embedding)
+def embed_document(text, pooling=SEMANTIC_POOLING):
+    """
+    (chunks x dim) matrix of L2-normalized chunk embeddings. Each chunk is
+    cached under its own hash, so after an edit only the changed chunks
+    reach the provider.
+    """
+    return _normalized_rows(get_embeddings(document_texts(text, pooling)))
 
-        return round(similarity * 100, 2)
+def pool_similarity(resume_vectors, job_vectors, pooling=SEMANTIC_POOLING):
+    """Pool the resume-chunk x job-chunk cosine matrix into a 0-100 score."""
+    if not len(resume_vectors) or not len(job_vectors):
+        return 0.0
+    return pool_scores(resume_vectors @ job_vectors.T, pooling)
+
+def pool_scores(scores, pooling=SEMANTIC_POOLING):
+    """pool_similarity for an already computed resume-chunk x job-chunk cosine matrix."""
+    if not scores.size:
+        return 0.0
+    if pooling == "mean":
+        pooled = scores.mean()
+    elif pooling == "topk":
+        k = min(SEMANTIC_POOL_TOPK, scores.shape[0])
+        pooled = np.sort(scores, axis=0)[-k:].mean(axis=0).mean()
+    else:
+        # max; with one vector per side ("document") this is plain cosine similarity
+        pooled = scores.max(axis=0).mean()
+    return round(float(pooled) * 100, 2)
+
+def semantic_similarity(resume_text, job_text):
+    try:
+        return pool_similarity(embed_document(resume_text), embed_document(job_text))
     except Exception as e:
         logger.error(f"Semantic similarity calculation failed: {e}")
         return 0.0
+
+# -------------------- ASYNC PATH --------------------
+
+_embedding_client = None
+
+def get_embedding_client():
+    """Shared batching client for the running event loop."""
+    global _embedding_client
+    loop = asyncio.get_running_loop()
+    if _embedding_client is None or _embedding_client.loop not in (None, loop):
+        _embedding_client = AsyncEmbeddingClient(get_provider(), breaker=provider_breaker)
+    return _embedding_client
+
+async def get_embeddings_async(texts):
+    """
+    Async get_embeddings: one batched cache lookup and one batched store, both
+    in the threadpool so Redis never blocks the event loop; the misses go out
+    concurrently and are coalesced into batched API calls.
+    """
+    provider = get_provider()
+    embedding_cache = get_embedding_cache()
+    embeddings = [None] * len(texts)
+    lookups = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            embeddings[i] = np.zeros(provider.dimension, dtype=np.float32)
+        else:
+            lookups.setdefault(text, []).append(i)
+
+    unique = list(lookups)
+    cached = await run_in_threadpool(embedding_cache.get_many, unique) if unique else []
+    misses = []
+    for text, vector in zip(unique, cached):
+        if vector is not None:
+            for i in lookups[text]:
+                embeddings[i] = vector
+        else:
+            misses.append(text)
+    client = get_embedding_client()
+    # Texts another request has already queued reach the provider once, on that request's bill
+    sent = [text for text in misses if not client.queued(text)]
+    record_embedding_usage(hits=len(unique) - len(misses), misses=len(sent))
+
+    if misses:
+        logger.info(f"Queueing {len(misses)} uncached texts for batched embedding")
+        with stage("embedding_api"):
+            vectors = await asyncio.gather(*(client.embed(text) for text in misses))
+        vectors = await run_in_threadpool(embedding_cache.set_many, misses, list(vectors))
+        for text, vector in zip(misses, vectors):
+            for i in lookups[text]:
+                embeddings[i] = vector
+
+    return embeddings
+
+async def get_embedding_async(text):
+    return (await get_embeddings_async([text]))[0]
+
+async def embed_document_async(text, pooling=SEMANTIC_POOLING):
+    return _normalized_rows(await get_embeddings_async(document_texts(text, pooling)))
+
+async def semantic_similarity_async(resume_text, job_text):
+    """
+    0-100 semantic score. Provider failures, an open provider breaker and an
+    exhausted request deadline raise instead of scoring 0, so callers can
+    tell "unrelated" from "unknown".
+    """
+    # Both documents' chunks share one cache round trip and batched API calls
+    resume_texts = document_texts(resume_text)
+    job_texts = document_texts(job_text)
+    vectors = await get_embeddings_async(resume_texts + job_texts)
+    return pool_similarity(
+        _normalized_rows(vectors[:len(resume_texts)]),
+        _normalized_rows(vectors[len(resume_texts):])
+    )
+
+async def semantic_similarity_to_vectors_async(resume_text, job_vectors):
+    """Like semantic_similarity_async, for a job whose chunk vectors are precomputed."""
+    resume_vectors = await embed_document_async(resume_text)
+    return pool_similarity(resume_vectors, job_vectors)
@@ -0,0 +1,159 @@
+"""
+Pre-fork production server.
+
+The master process imports the app and loads the read-only assets (skill
+catalogue, tokenizer/spaCy model, embedding provider and the memory-mapped
+job index) once, freezes the GC so those objects are never touched by the
+collector, binds the listening socket and forks the workers. Workers share
+the preloaded pages copy-on-write instead of each loading their own copy,
+and every worker accepts connections from the same socket.
+
+Anything holding sockets or threads (Redis, the provider's network client,
+the parser process pool, the batch worker pool) is created lazily in each
+worker after the fork.
+
+    python -m backend.server --workers 4 --port 7860
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from backend.logger import logger
+
+# Startup tasks that are read-only after loading and safe to share across fork()
+PRELOAD_TASKS = ("skill_catalogue", "recommendation_rules", "preprocessor", "embedding_provider", "job_index")
+
+# A worker exiting sooner than this after its start is restarted with a delay
+MIN_WORKER_UPTIME = 1.0
+
+
+def preload():
+    """Import the app and run the fork-safe warm-up tasks in the master."""
+    start = time.perf_counter()
+    from backend.api import app
+    from backend.startup import startup
+
+    for name, fn, required in startup.tasks:
+        if name not in PRELOAD_TASKS:
+            continue
+        task_start = time.perf_counter()
+        try:
+            fn()
+            startup.record(f"preload_{name}", time.perf_counter() - task_start)
+        except Exception as e:
+            startup.record(f"preload_{name}", time.perf_counter() - task_start, "failed", repr(e))
+            if required:
+                raise
+            logger.warning(f"Preload of {name} failed: {e!r}")
+    logger.info(f"Preloaded app in {round((time.perf_counter() - start) * 1000, 1)} ms")
+    return app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level: str):
+    # uvicorn installs its own SIGINT/SIGTERM handlers for graceful shutdown
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, app, sock, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            except BaseException:
+                logger.error("Worker crashed", exc_info=True)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(MIN_WORKER_UPTIME)
+            self.spawn()
+        logger.info("All workers stopped")
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info", preload_assets: bool = True):
+    if preload_assets:
+        app = preload()
+    else:
+        from backend.api import app
+
+    sock = bind_socket(host, port)
+    # Move everything loaded so far into the permanent generation: the GC
+    # never writes to those objects, so their pages stay shared after fork()
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"Serving on {host}:{port} with {workers} pre-forked worker(s)")
+    Master(app, sock, workers, log_level).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 7860)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 1)))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-preload", action="store_true", help="let each worker load its own assets")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("The pre-fork server needs os.fork(); use uvicorn directly on this platform")
+    serve(args.host, args.port, args.workers, args.log_level, not args.no_preload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import io
+import os
+from collections import namedtuple
+
+from backend.hot_reload import HotReloader
+from backend.skill_index import SkillIndex, parse_skill_entries
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILLS_PATH = os.getenv("SKILLS_PATH", os.path.join(BASE_DIR, "data", "skills.csv"))
+
+# How often (seconds) request-path lookups stat() the file for changes
+SKILLS_RELOAD_INTERVAL = float(os.getenv("SKILLS_RELOAD_INTERVAL", 5))
+
+# Immutable view of one loaded version of the skills file
+CatalogueSnapshot = namedtuple(
+    "CatalogueSnapshot",
+    ["index", "skills", "version", "content_hash", "loaded_at", "mtime", "path"]
+)
+
+
+def _compile_snapshot(raw: bytes) -> dict:
+    index = SkillIndex(parse_skill_entries(io.StringIO(raw.decode("utf-8"), newline="")))
+    return {"index": index, "skills": tuple(index.skills)}
+
+
+class SkillCatalogue:
+    """
+    Process-wide skill catalogue.
+
+    The skills file is compiled into an immutable snapshot and hot-reloaded
+    by HotReloader: requests get the current snapshot, and a changed file is
+    swapped in whole, so readers never see a half-built index.
+    """
+
+    def __init__(self, path: str, reload_interval: float = SKILLS_RELOAD_INTERVAL):
+        self._file = HotReloader(
+            path, "skill catalogue", _compile_snapshot, CatalogueSnapshot, reload_interval,
+            describe=lambda snapshot: f"{len(snapshot.skills)} skills"
+        )
+
+    def get(self) -> CatalogueSnapshot:
+        return self._file.get()
+
+    def reload(self, force: bool = False) -> CatalogueSnapshot:
+        return self._file.reload(force)
+
+    @property
+    def index(self) -> SkillIndex:
+        return self.get().index
+
+    def info(self) -> dict:
+        snapshot = self.get()
+        return {
+            "path": snapshot.path,
+            "version": snapshot.version,
+            "content_hash": snapshot.content_hash,
+            "skill_count": len(snapshot.skills),
+            "loaded_at": snapshot.loaded_at,
+            "mtime": snapshot.mtime,
+        }
+
+
+skill_catalogue = SkillCatalogue(SKILLS_PATH)
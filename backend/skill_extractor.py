@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 import pandas as pd
 
+from backend.skill_index import SkillIndex
+
 def load_and_prepare_skills(skill_file_path: str) -> list:
     df = pd.read_csv(skill_file_path)
 
@@ -10,12 +14,16 @@ def load_and_prepare_skills(skill_file_path: str) -> list:
     return prepared_skills
 
 
-def extract_skills(tokens: list, skill_list: list) -> list:
-    found_skills = set()
-    token_text = " ".join(tokens)
+@lru_cache(maxsize=8)
+def _index_for(skills: tuple) -> SkillIndex:
+    return SkillIndex.from_skills(skills)
+
 
-    for skill in skill_list:
-        if skill in token_text:
-            found_skills.add(skill)
+def extract_skills(tokens: list, skill_list) -> list:
+    # Accept a prebuilt SkillIndex, or a plain skill list (compiled once and memoized)
+    if isinstance(skill_list, SkillIndex):
+        index = skill_list
+    else:
+        index = _index_for(tuple(skill_list))
 
-    return sorted(found_skills)
+    return index.extract(tokens)
@@ -0,0 +1,140 @@
+import csv
+import re
+from collections import deque, namedtuple
+
+# A single skill occurrence. start/end are token offsets (end exclusive)
+# into the token list that was searched.
+SkillMatch = namedtuple("SkillMatch", ["skill", "alias", "start", "end"])
+
+_NON_ALPHA = re.compile(r"[^a-z\s]")
+ALIAS_SEPARATOR = "|"
+
+
+def normalize_phrase(phrase: str) -> tuple:
+    """
+    Normalize a skill name the same way preprocess_text normalizes resumes,
+    so that a skill phrase lines up with the token stream it is matched against.
+    """
+    cleaned = _NON_ALPHA.sub(" ", phrase.lower())
+    return tuple(token for token in cleaned.split() if len(token) > 2)
+
+
+class SkillIndex:
+    """
+    Aho-Corasick automaton over tokens, built once from a skill taxonomy.
+
+    Matching walks the token list a single time, so extraction cost depends on
+    the document length and the number of hits, not on the taxonomy size.
+    Because the alphabet is whole tokens, matches always fall on token
+    boundaries ("sql" no longer matches inside "nosql").
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (canonical_skill, aliases)
+        self.skills = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        seen = {}
+        for canonical, aliases in entries:
+            canonical = canonical.strip().lower()
+            if not canonical:
+                continue
+            if canonical not in seen:
+                seen[canonical] = len(self.skills)
+                self.skills.append(canonical)
+            skill_id = seen[canonical]
+            for alias in (canonical, *aliases):
+                self._add(normalize_phrase(alias), skill_id, alias.strip().lower())
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_skills(cls, skills):
+        return cls((skill, ()) for skill in skills)
+
+    def __len__(self):
+        return len(self.skills)
+
+    def _add(self, phrase, skill_id, alias):
+        if not phrase:
+            return
+        state = 0
+        for token in phrase:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][token] = nxt
+            state = nxt
+        hit = (skill_id, alias, len(phrase))
+        if hit not in self._out[state]:
+            self._out[state] = self._out[state] + (hit,)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan(self, tokens):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for skill_id, alias, length in out[state]:
+                yield skill_id, alias, position - length + 1, position + 1
+
+    def find(self, tokens):
+        """Yield a SkillMatch for every skill or alias occurrence in tokens."""
+        skills = self.skills
+        for skill_id, alias, start, end in self._scan(tokens):
+            yield SkillMatch(skills[skill_id], alias, start, end)
+
+    def skill_ids(self, tokens) -> set:
+        """Ids (positions in self.skills) of the skills present in tokens."""
+        return {hit[0] for hit in self._scan(tokens)}
+
+    def extract(self, tokens) -> list:
+        skills = self.skills
+        return sorted({skills[skill_id] for skill_id in self.skill_ids(tokens)})
+
+
+def parse_skill_entries(lines) -> list:
+    """
+    Parse (skill, aliases) rows from skills CSV lines. The "aliases" column is
+    optional and holds alternative spellings separated by "|".
+    """
+    entries = []
+    for row in csv.DictReader(lines):
+        skill = (row.get("skill") or "").strip()
+        if not skill:
+            continue
+        aliases = tuple(
+            alias.strip()
+            for alias in (row.get("aliases") or "").split(ALIAS_SEPARATOR)
+            if alias.strip()
+        )
+        entries.append((skill, aliases))
+    return entries
+
+
+def read_skill_entries(skill_file_path: str) -> list:
+    with open(skill_file_path, newline="", encoding="utf-8") as f:
+        return parse_skill_entries(f)
+
+
+def load_skill_index(skill_file_path: str) -> SkillIndex:
+    return SkillIndex(read_skill_entries(skill_file_path))
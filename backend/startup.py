@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+from backend.logger import logger
+
+# lazy:       nothing is preloaded; dependencies load on first use
+# background: the server accepts connections at once and warms up in a thread
+# blocking:   warm-up finishes before the server accepts connections
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background")
+
+
+class Startup:
+    """
+    Named warm-up tasks with a per-phase timing report.
+
+    Readiness is reached when every required task has succeeded (or right
+    away in lazy mode). Optional tasks, such as Redis, may fail without
+    blocking readiness since their callers degrade gracefully.
+    """
+
+    def __init__(self):
+        self.state = "pending"
+        self.mode = None
+        self.phases = []
+        self.tasks = []
+        self.started_at = None
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    def add_task(self, name: str, fn, required: bool = True):
+        self.tasks.append((name, fn, required))
+
+    def record(self, name: str, seconds: float, status: str = "ok", error: str = None):
+        with self._lock:
+            self.phases.append({
+                "phase": name,
+                "ms": round(seconds * 1000, 1),
+                "status": status,
+                **({"error": error} if error else {}),
+            })
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def begin(self, mode: str = STARTUP_WARMUP):
+        self.mode = mode
+        self.started_at = time.perf_counter()
+        if mode == "lazy":
+            self.state = "ready"
+            self.ready_at = self.started_at
+        elif mode == "blocking":
+            self.run()
+        else:
+            threading.Thread(target=self.run, name="startup-warmup", daemon=True).start()
+
+    def run(self):
+        self.state = "warming"
+        failed = []
+        for name, fn, required in self.tasks:
+            start = time.perf_counter()
+            try:
+                fn()
+                self.record(name, time.perf_counter() - start)
+            except Exception as e:
+                self.record(name, time.perf_counter() - start, "failed", repr(e))
+                logger.error(f"Startup phase {name} failed: {e!r}")
+                if required:
+                    failed.append(name)
+
+        self.ready_at = time.perf_counter()
+        self.state = "failed" if failed else "ready"
+        logger.info(
+            f"Startup warm-up {self.state} in {round((self.ready_at - self.started_at) * 1000, 1)} ms: "
+            + ", ".join(f"{p['phase']}={p['ms']}ms" for p in self.phases)
+        )
+
+    def report(self) -> dict:
+        return {
+            "mode": self.mode,
+            "state": self.state,
+            "ready": self.ready,
+            "warmup_ms": (
+                round((self.ready_at - self.started_at) * 1000, 1)
+                if self.ready_at is not None and self.started_at is not None else None
+            ),
+            "phases": list(self.phases),
+        }
+
+
+startup = Startup()
@@ -1,13 +1,40 @@
+import os
 import re
-import spacy
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from functools import lru_cache
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+from backend.logger import logger
+
+# regex (default) | nltk | spacy
+PREPROCESS_BACKEND = os.getenv("PREPROCESS_BACKEND", "regex")
+
+# NLTK's English stopword list, inlined so the default path needs no corpus download
+STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down
+in out on off over under again further then once here there when where why how
+all any both each few more most other some such no nor not only own same so
+than too very s t can will just don don't should should've now d ll m o re ve y
+ain aren aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn
+hasn't haven haven't isn isn't ma mightn mightn't mustn mustn't needn needn't
+shan shan't shouldn shouldn't wasn wasn't weren weren't won won't wouldn
+wouldn't
+""".split())
+
+# Kept for callers of the old module-level name
+stop_words = STOP_WORDS
+
+_NON_ALPHA = re.compile(r"[^a-zA-Z\s]")
+_SPACES = re.compile(r"\s+")
+# Maximal runs of ASCII letters, 3+ long: the tokens the cleaning + length filter keep
+_TOKEN = re.compile(r"[a-z]{3,}")
+
+# Bump whenever the tokens produced for the same text change
+PREPROCESS_VERSION = f"2-{PREPROCESS_BACKEND}"
 
-stop_words = set(stopwords.words("english"))
 
 def clean_text(text: str) -> str:
     """
@@ -17,18 +44,71 @@ def clean_text(text: str) -> str:
     - Normalize spaces
     """
     text = text.lower()
-    text = re.sub(r"[^a-zA-Z\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _NON_ALPHA.sub(" ", text)
+    text = _SPACES.sub(" ", text).strip()
     return text
 
 
-def preprocess_text(text: str) -> list:
-    cleaned_text = clean_text(text)
-    tokens = word_tokenize(cleaned_text)
+# -------------------- BACKENDS --------------------
+
+def _regex_tokens(text: str) -> list:
+    """
+    Default backend: one precompiled regex pass plus a frozenset lookup.
+
+    Cleaned text contains only letters and spaces, which word_tokenize splits
+    on whitespace, so the tokens are identical to the NLTK backend except
+    for the few contractions Treebank splits ("cannot" -> "can" "not",
+    "gonna" -> "gon" "na"), which this backend keeps whole.
+    """
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+@lru_cache(maxsize=1)
+def _nltk_resources():
+    from nltk.corpus import stopwords
+    from nltk.tokenize import word_tokenize
+    return word_tokenize, frozenset(stopwords.words("english"))
+
 
-    filtered_tokens = [
-        token for token in tokens
-        if token not in stop_words and len(token) > 2
+def _nltk_tokens(text: str) -> list:
+    """The original pipeline: clean_text + NLTK word_tokenize + NLTK stopwords."""
+    word_tokenize, nltk_stop_words = _nltk_resources()
+    return [
+        token for token in word_tokenize(clean_text(text))
+        if token not in nltk_stop_words and len(token) > 2
     ]
 
-    return filtered_tokens
+
+@lru_cache(maxsize=1)
+def _spacy_nlp():
+    import spacy
+    # Only the tokenizer is used; skip loading the statistical components
+    return spacy.load("en_core_web_sm", disable=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"])
+
+
+def _spacy_tokens(text: str) -> list:
+    """
+    spaCy tokenizer over the cleaned text. On letters-and-spaces input it
+    agrees with the NLTK backend, including its contraction splits, but
+    costs the model load (~tens of MB per worker).
+    """
+    return [
+        token.text for token in _spacy_nlp()(clean_text(text))
+        if token.text not in STOP_WORDS and len(token.text) > 2
+    ]
+
+
+BACKENDS = {
+    "regex": _regex_tokens,
+    "nltk": _nltk_tokens,
+    "spacy": _spacy_tokens,
+}
+
+if PREPROCESS_BACKEND not in BACKENDS:
+    logger.warning(f"Unknown PREPROCESS_BACKEND {PREPROCESS_BACKEND!r}; using regex")
+    PREPROCESS_BACKEND = "regex"
+    PREPROCESS_VERSION = "2-regex"
+
+
+def preprocess_text(text: str, backend: str = None) -> list:
+    return BACKENDS[backend or PREPROCESS_BACKEND](text)
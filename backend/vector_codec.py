@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+
+# Embedding encodings, by bytes per dimension:
+#   float32  4    exact
+#   float16  2    ~1e-4 cosine drift
+#   int8     1    per-vector scale (+4 bytes), ~1e-3 cosine drift
+CODECS = ("float32", "float16", "int8")
+
+# Rows decoded at a time by the similarity kernels; small blocks stay in CPU cache
+DOT_CHUNK_ROWS = int(os.getenv("VECTOR_DOT_CHUNK_ROWS", 256))
+
+_SCALE_DTYPE = np.dtype("<f4")
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorCodec:
+    """
+    Pre-normalized, optionally quantized vector storage.
+
+    encode() L2-normalizes each row before quantizing, so cosine similarity
+    against stored vectors is a plain dot product. int8 rows keep one float32
+    scale each (max |component| / 127); float rows have no scales (None).
+    dot() scores a query against encoded rows directly, decoding a bounded
+    block at a time instead of materializing a float32 copy of the matrix.
+    """
+
+    def __init__(self, name: str = "float32"):
+        if name not in CODECS:
+            raise ValueError(f"Unknown vector codec {name!r}; choose from {list(CODECS)}")
+        self.name = name
+        self.dtype = np.dtype({"float32": "<f4", "float16": "<f2", "int8": "i1"}[name])
+        self.scaled = name == "int8"
+
+    def __repr__(self):
+        return f"VectorCodec({self.name!r})"
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return dim * self.dtype.itemsize + (_SCALE_DTYPE.itemsize if self.scaled else 0)
+
+    # -------------------- MATRICES --------------------
+
+    def encode(self, vectors):
+        """(codes, scales) for a (n x dim) matrix."""
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        if not self.scaled:
+            return vectors.astype(self.dtype), None
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(self.dtype)
+        return codes, scales.astype(_SCALE_DTYPE)
+
+    def decode(self, codes, scales=None) -> np.ndarray:
+        matrix = np.asarray(codes).astype(np.float32)
+        if self.scaled:
+            matrix *= np.asarray(scales, dtype=np.float32)[..., None]
+        return matrix
+
+    def roundtrip(self, vectors) -> np.ndarray:
+        """What a reader of the stored vectors gets back."""
+        return self.decode(*self.encode(vectors))
+
+    def dot(self, codes, scales, query, chunk_rows: int = DOT_CHUNK_ROWS) -> np.ndarray:
+        """Scores of encoded rows against a float32 query (normalize it for cosine)."""
+        query = np.asarray(query, dtype=np.float32)
+        if self.name == "float32":
+            return np.asarray(codes) @ query
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), chunk_rows):
+            block = np.asarray(codes[start:start + chunk_rows])
+            scores[start:start + len(block)] = block.astype(np.float32) @ query
+        if self.scaled:
+            scores *= np.asarray(scales, dtype=np.float32)
+        return scores
+
+    # -------------------- SINGLE VECTORS --------------------
+
+    def pack(self, vector) -> bytes:
+        """Bytes of one vector: the int8 scale (little-endian float32) comes first."""
+        codes, scales = self.encode(vector)
+        if self.scaled:
+            return scales[:1].tobytes() + codes[0].tobytes()
+        return codes[0].tobytes()
+
+    def unpack(self, data: bytes, dim: int):
+        """The decoded float32 vector, or None if data is not a vector of this codec and dim."""
+        if len(data) != self.bytes_per_vector(dim):
+            return None
+        if self.scaled:
+            scale = np.frombuffer(data[:_SCALE_DTYPE.itemsize], dtype=_SCALE_DTYPE)
+            codes = np.frombuffer(data[_SCALE_DTYPE.itemsize:], dtype=self.dtype)
+            return self.decode(codes[None, :], scale)[0]
+        vector = np.frombuffer(data, dtype=self.dtype)
+        return vector if self.name == "float32" else vector.astype(np.float32)
@@ -0,0 +1,194 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.connection import wait
+
+from backend.logger import logger
+
+# Budget for a new worker to import its modules and run the initializer,
+# so model loading is never charged to the first task's timeout
+WORKER_STARTUP_TIMEOUT = 120
+
+
+class WorkerTimeout(Exception):
+    pass
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+def _serve(conn, initializer):
+    if initializer is not None:
+        initializer()
+    conn.send(("ready", None))
+    while True:
+        try:
+            fn, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = ("ok", fn(*args))
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The result or the exception did not pickle
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    def __init__(self, ctx, initializer):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child, initializer), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.dead = False
+
+    def _recv(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.dead = True
+            raise WorkerDied(f"Worker process {self.process.pid} exited (code {self.process.exitcode})")
+
+    def wait_ready(self, timeout):
+        if not self.ready:
+            if not self.conn.poll(timeout):
+                raise WorkerTimeout(f"Worker process did not start within {timeout}s")
+            self._recv()
+            self.ready = True
+
+    def send(self, fn, args):
+        self.conn.send((fn, args))
+
+    def result(self):
+        status, value = self._recv()
+        if status == "error":
+            raise value
+        return value
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _remaining(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+
+class WorkerPool:
+    """
+    A fixed set of spawned worker processes, each checked out by one caller
+    at a time.
+
+    A task that overruns its deadline kills and replaces only the worker
+    running it, so one pathological input never takes down the tasks other
+    callers have in flight on the same pool.
+    """
+
+    def __init__(self, size: int, initializer=None):
+        self.size = size
+        self.replaced = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._initializer = initializer
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = _Worker(self._ctx, self._initializer)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _checkout(self, deadline, block=True):
+        try:
+            worker = self._idle.get(timeout=_remaining(deadline)) if block else self._idle.get_nowait()
+        except queue.Empty:
+            if block:
+                raise WorkerTimeout("No worker became free before the deadline")
+            return None
+        try:
+            worker.wait_ready(WORKER_STARTUP_TIMEOUT)
+        except Exception:
+            self._discard(worker)
+            raise
+        return worker
+
+    def _checkin(self, worker):
+        if worker.dead or self._closed:
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+
+    def _discard(self, worker):
+        # Kill one worker and put a fresh one in its place
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+        if not self._closed:
+            self.replaced += 1
+            self._idle.put(self._spawn())
+
+    def run(self, fn, args, deadline=None, timeout=None):
+        """fn(*args) on one worker, raising WorkerTimeout past the monotonic deadline."""
+        return self.run_many(fn, [args], deadline, timeout)[0]
+
+    def run_many(self, fn, arg_list, deadline=None, timeout=None) -> list:
+        """
+        fn(*args) for each args, on as many idle workers as there are; results
+        in order. The deadline bounds the whole call, timeout each task from
+        when a worker takes it.
+        """
+        results = [None] * len(arg_list)
+        pending = list(enumerate(arg_list))
+        running = {}
+        try:
+            while pending or running:
+                # Always get one worker; take more only while they are idle
+                while pending:
+                    worker = self._checkout(deadline, block=not running)
+                    if worker is None:
+                        break
+                    index, args = pending.pop(0)
+                    worker.send(fn, args)
+                    expires = deadline
+                    if timeout is not None:
+                        expires = min(time.monotonic() + timeout, deadline or float("inf"))
+                    running[worker] = (index, expires)
+
+                expires = [expires for _, expires in running.values() if expires is not None]
+                ready = wait([worker.conn for worker in running], _remaining(min(expires)) if expires else None)
+                if not ready:
+                    raise WorkerTimeout("Task exceeded its deadline")
+                for worker in [worker for worker in running if worker.conn in ready]:
+                    index, _ = running.pop(worker)
+                    try:
+                        results[index] = worker.result()
+                    finally:
+                        self._checkin(worker)
+        finally:
+            # Abandoned tasks are this caller's only; their workers are killed
+            for worker in running:
+                logger.warning(f"Killing worker process {worker.process.pid}")
+                self._discard(worker)
+        return results
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": self._idle.qsize(), "replaced": self.replaced}
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
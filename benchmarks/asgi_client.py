@@ -0,0 +1,71 @@
+"""Minimal in-process ASGI client, so benchmarks need neither a server nor httpx."""
+import json
+import uuid
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status_code = status
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in headers}
+        self.content = body
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def encode_multipart(field: str, filename: str, data: bytes, content_type: str):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+async def request(app, method: str, path: str, json_body=None, file=None) -> Response:
+    """file: optional (field, filename, bytes, content_type) tuple sent as multipart."""
+    headers = []
+    body = b""
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        headers.append((b"content-type", b"application/json"))
+    elif file is not None:
+        body, content_type = encode_multipart(*file)
+        headers.append((b"content-type", content_type.encode()))
+    headers.append((b"content-length", str(len(body)).encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    sent = {"body": False}
+
+    async def receive():
+        if not sent["body"]:
+            sent["body"] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response = {"status": None, "headers": [], "body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return Response(response["status"], response["headers"], b"".join(response["body"]))
@@ -0,0 +1,299 @@
+"""
+In-process API benchmark and load test.
+
+The FastAPI app runs inside this process behind a minimal ASGI client, with
+a deterministic stub embedding provider and an in-memory Redis stand-in, so
+results reflect our own code and are reproducible without network access
+or API keys. Rate limiting is disabled for the run.
+
+Each scenario reports sequential latency percentiles and throughput under
+concurrency. Results are written as JSON so runs on different commits can
+be compared with benchmarks/compare.py.
+
+    python benchmarks/bench_api.py --requests 200 --concurrency 1 8 32 --json results.json
+    python benchmarks/bench_api.py --scenarios final_match --embed-latency-ms 80
+
+`--repeat-inputs` reuses one input per scenario so the caches are exercised;
+by default every request carries a unique document (cold-cache path).
+Requires the frontend build (frontend/dist), which the app mounts at import.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_PDF = os.path.join(ROOT, "data", "sample_resume.pdf")
+
+SKILL_WORDS = [
+    "python", "java", "sql", "docker", "kubernetes", "aws", "azure", "react", "fastapi",
+    "tensorflow", "pytorch", "pandas", "numpy", "spark", "airflow", "linux", "git",
+    "machine learning", "deep learning", "data analysis", "nlp", "tableau", "excel",
+]
+FILLER_WORDS = [
+    "designed", "built", "deployed", "led", "team", "service", "pipeline", "customers",
+    "improved", "latency", "reliability", "platform", "reporting", "migration", "scaled",
+    "maintained", "requirements", "stakeholders", "production", "quarterly", "delivered",
+]
+
+SCENARIOS = ("final_match", "extract_skills", "parse_resume")
+
+
+def make_text(rng, words=300):
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(SKILL_WORDS) if rng.random() < 0.15 else rng.choice(FILLER_WORDS))
+    return " ".join(parts).capitalize() + "."
+
+
+def make_pdf(lines, lines_per_page=45):
+    """A minimal multi-page text PDF, so parsing can be benchmarked without extra dependencies."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_lines in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page_lines]
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def read_sample_pdf():
+    with open(SAMPLE_PDF, "rb") as f:
+        data = f.read()
+    # An empty or truncated sample would only benchmark the error path
+    if not data.startswith(b"%PDF") or b"%%EOF" not in data[-1024:]:
+        raise SystemExit(f"{SAMPLE_PDF} is empty or not a complete PDF ({len(data)} bytes)")
+    return data
+
+
+def make_docx(paragraphs):
+    from docx import Document
+    import io
+
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_inputs(scenario, count, seed, repeat_inputs, pages):
+    """One request payload per iteration: (json_body, file)."""
+    rng = random.Random(f"{seed}:{scenario}")
+    n = 1 if repeat_inputs else count
+    inputs = []
+    for i in range(n):
+        if scenario == "final_match":
+            inputs.append(({"resume_text": make_text(rng, 400), "job_text": make_text(rng, 150)}, None))
+        elif scenario == "extract_skills":
+            inputs.append(({"text": make_text(rng, 400)}, None))
+        elif scenario == "parse_resume":
+            # Rotate through the bundled sample, generated PDFs and generated DOCX files
+            kind = i % 3
+            if kind == 0 and os.path.exists(SAMPLE_PDF) and repeat_inputs:
+                inputs.append((None, ("file", "sample_resume.pdf", read_sample_pdf(), "application/pdf")))
+            elif kind == 2:
+                paragraphs = [make_text(rng, 40) for _ in range(pages * 10)]
+                inputs.append((None, (
+                    "file", f"resume_{i}.docx", make_docx(paragraphs),
+                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                )))
+            else:
+                lines = [make_text(rng, 12) for _ in range(pages * 45)]
+                inputs.append((None, ("file", f"resume_{i}.pdf", make_pdf(lines), "application/pdf")))
+    return [inputs[i % n] for i in range(count)]
+
+
+PATHS = {"final_match": "/final-match", "extract_skills": "/extract-skills", "parse_resume": "/parse-resume"}
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q):
+        # Nearest-rank percentile
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000, 2)
+
+    return {
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def run_load(app, path, inputs, concurrency):
+    from benchmarks.asgi_client import request
+
+    queue = list(reversed(inputs))
+    latencies = []
+    errors = {}
+
+    async def worker():
+        while queue:
+            json_body, file = queue.pop()
+            start = time.perf_counter()
+            response = await request(app, "POST", path, json_body=json_body, file=file)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": percentiles(latencies),
+    }
+
+
+def install_fakes(embed_dim, embed_latency):
+    """Swap the lazily created provider and Redis layer for local stand-ins."""
+    from backend import redis_client, semantic_matcher
+    from benchmarks.fakes import StubEmbeddingProvider, FakeRedis
+
+    provider = StubEmbeddingProvider(embed_dim, embed_latency)
+    with redis_client._redis_lock:
+        redis_client._redis = redis_client.RedisLayer(client=FakeRedis())
+        redis_client._redis_initialized = True
+    with semantic_matcher._init_lock:
+        semantic_matcher._provider = provider
+        semantic_matcher._embedding_cache = None
+        semantic_matcher._embedding_client = None
+    return provider
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    from backend import api
+    from backend.logger import logger
+
+    # Per-request info logging would dominate the measurements
+    logger.setLevel(logging.WARNING)
+    api.limiter.enabled = False
+    provider = install_fakes(args.embed_dim, args.embed_latency_ms / 1000)
+
+    results = {}
+    async with api.app.router.lifespan_context(api.app):
+        while not api.startup.ready and api.startup.state != "failed":
+            await asyncio.sleep(0.05)
+
+        for scenario in args.scenarios:
+            path = PATHS[scenario]
+            # Warm-up requests are not recorded
+            warmup = build_inputs(scenario, args.warmup, args.seed + 1, args.repeat_inputs, args.pages)
+            if warmup:
+                await run_load(api.app, path, warmup, 1)
+
+            runs = []
+            for concurrency in args.concurrency:
+                inputs = build_inputs(scenario, args.requests, args.seed, args.repeat_inputs, args.pages)
+                runs.append(await run_load(api.app, path, inputs, concurrency))
+                print(
+                    f"{scenario:>15} c={concurrency:<3} {runs[-1]['throughput_rps']:>9} req/s  "
+                    f"p50={runs[-1]['latency_ms'].get('p50')}ms p99={runs[-1]['latency_ms'].get('p99')}ms"
+                    + (f"  errors={runs[-1]['errors']}" if runs[-1]["errors"] else "")
+                )
+            results[scenario] = runs
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "repeat_inputs": args.repeat_inputs,
+                "pages": args.pages,
+                "embed_dim": args.embed_dim,
+                "embed_latency_ms": args.embed_latency_ms,
+                "analysis_cache": os.environ.get("ANALYSIS_CACHE_BACKEND"),
+                "seed": args.seed,
+            },
+            "embedding_provider_calls": provider.calls,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--repeat-inputs", action="store_true", help="reuse one input to measure the warm-cache path")
+    parser.add_argument("--pages", type=int, default=2, help="pages per generated resume document")
+    parser.add_argument("--embed-dim", type=int, default=256)
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="simulated provider round trip")
+    parser.add_argument("--analysis-cache", choices=["none", "memory", "disk"], default="none")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # Settings read at import time must be in place before the app is imported
+    os.environ.setdefault("STARTUP_WARMUP", "blocking")
+    os.environ["ANALYSIS_CACHE_BACKEND"] = args.analysis_cache
+    if args.analysis_cache == "disk":
+        os.environ["ANALYSIS_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-analysis-")
+    os.environ.pop("REDIS_URL", None)
+    os.environ["RATE_LIMIT_BACKEND"] = "off"
+
+    report = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
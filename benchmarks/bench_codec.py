@@ -0,0 +1,122 @@
+"""
+Vector codec benchmark: bytes per vector, top-k recall and cosine score
+drift of the float16 and int8 encodings against float32, plus the time of
+one exact search over the whole corpus.
+
+The corpus is clustered synthetic vectors by default (nearby documents, like
+real postings), or real embeddings of synthetic skill texts with --provider.
+
+    python benchmarks/bench_codec.py --docs 20000 --dim 768
+    python benchmarks/bench_codec.py --provider hashing --docs 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.vector_codec import CODECS, VectorCodec, normalize_rows
+
+
+def synthetic_corpus(rng, docs, queries, dim, clusters):
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    def sample(n):
+        members = centers[rng.integers(0, clusters, n)]
+        return members + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return sample(docs), sample(queries)
+
+
+def provider_corpus(name, docs, queries, seed):
+    from backend.embedding_providers import create_provider
+    from backend.skill_catalogue import skill_catalogue
+
+    provider = create_provider(name)
+    skills = list(skill_catalogue.get().skills)
+    rng = random.Random(seed)
+
+    def texts(n):
+        return [f"Experience with {', '.join(rng.sample(skills, 8))}." for _ in range(n)]
+
+    def embed(batch):
+        vectors = []
+        for start in range(0, len(batch), 100):
+            vectors.extend(provider.embed(batch[start:start + 100]))
+        return np.asarray(vectors, dtype=np.float32)
+
+    return embed(texts(docs)), embed(texts(queries))
+
+
+def run(corpus, queries, top_k):
+    exact = normalize_rows(corpus)
+    queries = normalize_rows(queries)
+    reference = queries @ exact.T
+    # A hit counts if it scores at least the k-th best float32 score (to
+    # float32 rounding), so reordering exact ties does not count as a miss
+    kth_best = -np.partition(-reference, top_k - 1, axis=1)[:, top_k - 1]
+    json_bytes = np.mean([len(json.dumps(vector.astype(np.float64).tolist())) for vector in corpus[:200]])
+
+    rows = []
+    for name in CODECS:
+        codec = VectorCodec(name)
+        codes, scales = codec.encode(corpus)
+        start = time.perf_counter()
+        scores = np.stack([codec.dot(codes, scales, query) for query in queries])
+        search_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        top = np.argsort(-scores, axis=1)[:, :top_k]
+        recall = (np.take_along_axis(reference, top, axis=1) >= kth_best[:, None] - 1e-6).mean()
+        drift = np.abs(scores - reference)
+        nbytes = codec.bytes_per_vector(corpus.shape[1])
+        rows.append({
+            "codec": name,
+            "bytes_per_vector": nbytes,
+            "vs_float32": round(nbytes / (4 * corpus.shape[1]), 3),
+            "vs_json": round(nbytes / json_bytes, 3),
+            f"recall_at_{top_k}": round(float(recall), 4),
+            "mean_drift": float(drift.mean()),
+            "max_drift": float(drift.max()),
+            "search_ms": round(search_ms, 3),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768, help="synthetic corpus only")
+    parser.add_argument("--clusters", type=int, default=200, help="synthetic corpus only")
+    parser.add_argument("--provider", help="embed synthetic texts with this EMBEDDING_PROVIDER instead")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the rows here")
+    args = parser.parse_args()
+
+    if args.provider:
+        corpus, queries = provider_corpus(args.provider, args.docs, args.queries, args.seed)
+    else:
+        rng = np.random.default_rng(args.seed)
+        corpus, queries = synthetic_corpus(rng, args.docs, args.queries, args.dim, args.clusters)
+
+    rows = run(corpus, queries, args.top_k)
+    recall_key = f"recall_at_{args.top_k}"
+    print(f"{corpus.shape[0]} vectors x {corpus.shape[1]} dims, {queries.shape[0]} queries")
+    print(f"{'codec':>8} {'bytes':>7} {'vs f32':>7} {'vs json':>8} {recall_key:>12} "
+          f"{'mean drift':>11} {'max drift':>10} {'search ms':>10}")
+    for row in rows:
+        print(
+            f"{row['codec']:>8} {row['bytes_per_vector']:>7} {row['vs_float32']:>7} {row['vs_json']:>8} "
+            f"{row[recall_key]:>12} {row['mean_drift']:>11.2e} {row['max_drift']:>10.2e} {row['search_ms']:>10}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Skill extraction benchmark: the compiled SkillIndex against the original
+substring loop, over synthetic taxonomies of increasing size.
+
+    python benchmarks/bench_skill_index.py --sizes 15 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.skill_index import SkillIndex
+
+
+def legacy_extract_skills(tokens, skill_list):
+    # The pre-index implementation, kept here as the baseline
+    found_skills = set()
+    token_text = " ".join(tokens)
+
+    for skill in skill_list:
+        if skill in token_text:
+            found_skills.add(skill)
+
+    return sorted(found_skills)
+
+
+def make_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+
+def make_taxonomy(rng, size):
+    skills = set()
+    while len(skills) < size:
+        skills.add(" ".join(make_word(rng) for _ in range(rng.randint(1, 3))))
+    return sorted(skills)
+
+
+def make_document(rng, skills, length, skill_ratio=0.05):
+    tokens = []
+    while len(tokens) < length:
+        if rng.random() < skill_ratio:
+            tokens.extend(rng.choice(skills).split())
+        else:
+            tokens.append(make_word(rng))
+    return tokens[:length]
+
+
+def time_call(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, doc_tokens, repeat, seed):
+    rng = random.Random(seed)
+    rows = []
+    for size in sizes:
+        skills = make_taxonomy(rng, size)
+        document = make_document(rng, skills, doc_tokens)
+
+        start = time.perf_counter()
+        index = SkillIndex.from_skills(skills)
+        build_seconds = time.perf_counter() - start
+
+        legacy = time_call(lambda: legacy_extract_skills(document, skills), repeat)
+        indexed = time_call(lambda: index.extract(document), repeat)
+        rows.append({
+            "skills": size,
+            "doc_tokens": doc_tokens,
+            "build_ms": round(build_seconds * 1000, 2),
+            "legacy_ms": round(legacy * 1000, 3),
+            "index_ms": round(indexed * 1000, 3),
+            "speedup": round(legacy / indexed, 1) if indexed else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 1000, 10000, 50000])
+    parser.add_argument("--doc-tokens", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'skills':>8} {'build ms':>10} {'legacy ms':>11} {'index ms':>10} {'speedup':>8}")
+    for row in run(args.sizes, args.doc_tokens, args.repeat, args.seed):
+        print(
+            f"{row['skills']:>8} {row['build_ms']:>10} {row['legacy_ms']:>11} "
+            f"{row['index_ms']:>10} {row['speedup']:>7}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
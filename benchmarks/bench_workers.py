@@ -0,0 +1,149 @@
+"""
+Memory per worker: the pre-fork server against plain `uvicorn --workers`.
+
+Starts the server, waits until it reports ready and the workers have warmed
+up, then reads RSS, PSS and private (unshared) memory of the master and every
+worker from /proc/<pid>/smaps_rollup. PSS splits shared pages between the
+processes mapping them, so total PSS is the real footprint; RSS counts shared
+pages once per process. Linux only.
+
+    python benchmarks/bench_workers.py --workers 1 4 16 --json workers.json
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def command(mode, workers, port):
+    if mode == "prefork":
+        return [sys.executable, "-m", "backend.server", "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "backend.api:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"]
+
+
+def descendants(pid):
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def memory(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0), 1),
+        "pss_mb": round(values.get("Pss", 0), 1),
+        "private_mb": round(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1),
+    }
+
+
+def wait_ready(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/ready", timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def measure(mode, workers, timeout, settle):
+    port = free_port()
+    env = dict(os.environ, STARTUP_WARMUP="blocking")
+    proc = subprocess.Popen(command(mode, workers, port), cwd=ROOT, env=env)
+    try:
+        if not wait_ready(port, timeout):
+            return {"mode": mode, "workers": workers, "error": "server did not become ready"}
+        # Let the remaining workers finish their own warm-up
+        time.sleep(settle)
+
+        worker_pids = [pid for pid in descendants(proc.pid) if pid != proc.pid]
+        master = memory(proc.pid)
+        per_worker = [memory(pid) for pid in worker_pids]
+        total_pss = master["pss_mb"] + sum(w["pss_mb"] for w in per_worker)
+        n = max(len(per_worker), 1)
+        return {
+            "mode": mode,
+            "workers": workers,
+            "processes": 1 + len(per_worker),
+            "master": master,
+            "worker_rss_mb": round(sum(w["rss_mb"] for w in per_worker) / n, 1),
+            "worker_pss_mb": round(sum(w["pss_mb"] for w in per_worker) / n, 1),
+            "worker_private_mb": round(sum(w["private_mb"] for w in per_worker) / n, 1),
+            "total_pss_mb": round(total_pss, 1),
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--modes", nargs="+", choices=["prefork", "uvicorn"], default=["prefork", "uvicorn"])
+    parser.add_argument("--timeout", type=float, default=180, help="seconds to wait for readiness")
+    parser.add_argument("--settle", type=float, default=5, help="seconds to wait after readiness")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'mode':>8} {'workers':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'private/worker':>15} {'total PSS':>10}")
+    for mode in args.modes:
+        for workers in args.workers:
+            result = measure(mode, workers, args.timeout, args.settle)
+            results.append(result)
+            if "error" in result:
+                print(f"{mode:>8} {workers:>8}  {result['error']}")
+                continue
+            print(
+                f"{mode:>8} {workers:>8} {result['worker_rss_mb']:>11} {result['worker_pss_mb']:>11} "
+                f"{result['worker_private_mb']:>15} {result['total_pss_mb']:>10}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
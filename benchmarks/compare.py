@@ -0,0 +1,64 @@
+"""
+Compare two bench_api.py result files, scenario by scenario.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+
+Exits non-zero when any p50/p99 latency grows, or throughput drops, by more
+than the threshold percentage.
+"""
+import argparse
+import json
+import sys
+
+
+def change(old, new):
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['meta'].get('commit')}  ->  candidate {candidate['meta'].get('commit')}")
+    print(f"{'scenario':>15} {'conc':>5} {'metric':>8} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    regressions = []
+    for scenario, runs in candidate["results"].items():
+        old_runs = {run["concurrency"]: run for run in baseline["results"].get(scenario, [])}
+        for run in runs:
+            old = old_runs.get(run["concurrency"])
+            if old is None:
+                continue
+            rows = [
+                ("p50", old["latency_ms"].get("p50"), run["latency_ms"].get("p50"), 1),
+                ("p99", old["latency_ms"].get("p99"), run["latency_ms"].get("p99"), 1),
+                ("rps", old["throughput_rps"], run["throughput_rps"], -1),
+            ]
+            for metric, old_value, new_value, worse_sign in rows:
+                delta = change(old_value, new_value)
+                flag = ""
+                if delta is not None and delta * worse_sign > args.threshold:
+                    flag = "  REGRESSION"
+                    regressions.append((scenario, run["concurrency"], metric))
+                delta_text = f"{delta:+.1f}%" if delta is not None else "n/a"
+                print(
+                    f"{scenario:>15} {run['concurrency']:>5} {metric:>8} "
+                    f"{old_value!s:>10} {new_value!s:>10} {delta_text:>8}{flag}"
+                )
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
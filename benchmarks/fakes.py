@@ -0,0 +1,130 @@
+"""Deterministic local stand-ins for the embedding provider and Redis."""
+import asyncio
+import fnmatch
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from backend.embedding_providers import EmbeddingProvider
+
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic pseudo-embeddings: the same text always maps to the same
+    unit vector. `latency` (seconds per call) emulates the network round
+    trip of a hosted provider.
+    """
+
+    name = "stub"
+
+    def __init__(self, dimension: int = 256, latency: float = 0.0):
+        super().__init__(f"stub-{dimension}", dimension)
+        self.latency = latency
+        self.calls = 0
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def embed(self, texts: list) -> list:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def embed_batch(self, texts: list) -> list:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+
+class FakeRedis:
+    """In-memory subset of the redis-py client API used by the backend."""
+
+    def __init__(self):
+        self._data = {}
+        self._expiry = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        expires = self._expiry.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        with self._lock:
+            return self._data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        with self._lock:
+            return [self._data[key] if self._alive(key) else None for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = self._encode(value)
+            self._expiry.pop(key, None)
+            if ex:
+                self._expiry[key] = time.monotonic() + ex
+            return True
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, ex=ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self._data.pop(key, None)
+                self._expiry.pop(key, None)
+            return removed
+
+    def keys(self, pattern="*"):
+        with self._lock:
+            return [key for key in list(self._data) if self._alive(key) and fnmatch.fnmatch(key, pattern)]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [method(*args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -18,15 +18,18 @@ import { RecommendationsCard } from "@/components/RecommendationsCard";
 import { ConfidenceMeter } from "@/components/ConfidenceMeter";
 import { toast } from "sonner";
 
+// Scores and confidence are null until their stream event arrives
 interface AnalysisResult {
-  skill_match_percentage: number;
-  semantic_match_percentage: number;
-  final_match_percentage: number;
+  skill_match_percentage: number | null;
+  // also null when the embedding provider missed the latency budget (skill-only score)
+  semantic_match_percentage: number | null;
+  final_match_percentage: number | null;
+  degraded?: boolean;
   resume_skills: string[];
   common_skills: string[];
   missing_skills: string[];
   ats_recommendations: string[];
-  confidence: string;
+  confidence: string | null;
   rewrite_suggestions: string[];
 }
 
@@ -65,26 +68,69 @@ export default function Index() {
       const uploadData = await uploadResponse.json();
       const resumeText = uploadData.text_preview;
 
-      // 2. Analyze
+      // 2. Analyze: stream results so skills render before the embedding calls return
       const matchResponse = await fetch("/final-match", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          Accept: "application/x-ndjson",
         },
         body: JSON.stringify({
           resume_text: resumeText,
           job_text: jobDescription,
+          stream: true,
         }),
       });
 
-      if (!matchResponse.ok) {
+      if (!matchResponse.ok || !matchResponse.body) {
         const err = await matchResponse.json();
         throw new Error(err.detail || "Backend error");
       }
 
-      const resultData = await matchResponse.json();
-      setResult(resultData);
-      toast.success("Analysis complete!");
+      let partial: AnalysisResult = {
+        skill_match_percentage: null,
+        semantic_match_percentage: null,
+        final_match_percentage: null,
+        resume_skills: [],
+        common_skills: [],
+        missing_skills: [],
+        ats_recommendations: [],
+        confidence: null,
+        rewrite_suggestions: [],
+      };
+      let finished = false;
+      const reader = matchResponse.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split("\n");
+        buffered = lines.pop() ?? "";
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const { stage, ...fields } = JSON.parse(line);
+          if (stage === "error") {
+            throw new Error(fields.detail || "Backend error");
+          }
+          if (stage === "done") {
+            finished = true;
+            continue;
+          }
+          partial = { ...partial, ...fields };
+          setResult(partial);
+        }
+      }
+      if (!finished) {
+        throw new Error("The connection closed before the analysis finished");
+      }
+      if (partial.degraded) {
+        toast.warning("Semantic matching is unavailable right now; the overall score is based on skills only.");
+      } else {
+        toast.success("Analysis complete!");
+      }
 
     } catch (error) {
       console.error(error);
@@ -228,7 +274,7 @@ export default function Index() {
                 delay={0}
               />
               <ScoreCard
-                title="Semantic Match"
+                title={result.degraded ? "Semantic Match (unavailable)" : "Semantic Match"}
                 value={result.semantic_match_percentage}
                 icon={Brain}
                 color="info"
@@ -0,0 +1,39 @@
+import os
+import time
+
+from backend.analysis_cache import DiskBackend, MemoryBackend
+
+
+def test_overwriting_an_entry_counts_its_bytes_once(tmp_path):
+    backend = DiskBackend(str(tmp_path), max_bytes=1_000_000, ttl=60)
+    backend.set("analysis:text:a", {"text": "x" * 100})
+    size = backend._size
+    backend.set("analysis:text:a", {"text": "x" * 100})
+    assert backend._size == size
+
+
+def test_disk_entries_expire_from_their_write_time(tmp_path):
+    backend = DiskBackend(str(tmp_path), max_bytes=1_000_000, ttl=60)
+    backend.set("analysis:text:a", {"text": "resume"})
+    assert backend.get("analysis:text:a") == {"text": "resume"}
+
+    path = backend._path("analysis:text:a")
+    old = time.time() - 120
+    os.utime(path, (time.time(), old))
+    assert backend.get("analysis:text:a") is None
+    assert not os.path.exists(path)
+    assert backend._size == 0
+
+
+def test_disk_write_errors_are_skipped(tmp_path):
+    backend = DiskBackend(str(tmp_path / "cache"), max_bytes=1_000_000, ttl=60)
+    os.rmdir(backend.directory)
+    backend.set("analysis:text:a", {"text": "resume"})
+    assert backend.get("analysis:text:a") is None
+
+
+def test_memory_backend_returns_copies():
+    backend = MemoryBackend(max_bytes=1_000_000, ttl=60)
+    backend.set("analysis:text:a", {"skills": ["python"]})
+    backend.get("analysis:text:a")["skills"].append("docker")
+    assert backend.get("analysis:text:a") == {"skills": ["python"]}
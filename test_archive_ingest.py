@@ -0,0 +1,131 @@
+import io
+import threading
+import time
+import zipfile
+
+import pytest
+from docx import Document
+
+from backend import archive_ingest
+from backend.analysis_cache import AnalysisCache
+from backend.archive_ingest import iter_archive, ArchiveTooLarge, InvalidArchive
+from backend.worker_pool import WorkerPool
+
+
+class DictBackend:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+def docx_bytes(text):
+    buffer = io.BytesIO()
+    document = Document()
+    document.add_paragraph(text)
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_archive(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def analyze_or_hang(data, filename):
+    if filename.startswith("hang"):
+        time.sleep(60)
+    return archive_ingest.analyze_resume_bytes(data, filename)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = WorkerPool(2)
+    monkeypatch.setattr(archive_ingest, "_pool", pool)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def archive():
+    return make_archive({
+        "cvs/alice.docx": docx_bytes("Backend engineer with Python, Docker and AWS."),
+        "cvs/bob.docx": docx_bytes("Frontend developer: React and TypeScript."),
+        "cvs/notes.txt": b"not a resume",
+        "__MACOSX/cvs/._alice.docx": b"resource fork",
+        "bomb.docx": b"\0" * 2_000_000,
+    })
+
+
+def test_reports_every_file_then_a_summary(archive):
+    records = list(iter_archive(archive, workers=0, cache=AnalysisCache(None)))
+
+    results = {record["filename"]: record for record in records[:-1]}
+    assert set(results) == {"cvs/alice.docx", "cvs/bob.docx", "cvs/notes.txt", "bomb.docx"}
+    assert {"python", "docker", "aws"} <= set(results["cvs/alice.docx"]["skills"])
+    assert results["cvs/notes.txt"]["status"] == "skipped"
+    assert results["bomb.docx"]["status"] == "error"
+    assert "Compression ratio" in results["bomb.docx"]["error"]
+
+    summary = records[-1]
+    assert summary["type"] == "done"
+    assert (summary["files"], summary["ok"], summary["error"], summary["skipped"]) == (3, 2, 1, 1)
+    assert summary["files_per_sec"] > 0
+
+
+def test_limits_reject_the_archive_before_any_work(archive):
+    with pytest.raises(ArchiveTooLarge):
+        iter_archive(archive, workers=0, max_entries=3)
+    with pytest.raises(ArchiveTooLarge):
+        iter_archive(archive, workers=0, max_total_bytes=1_000_000)
+    with pytest.raises(InvalidArchive):
+        iter_archive(io.BytesIO(b"not a zip"), workers=0)
+
+
+def test_entry_size_limit_only_fails_that_entry(archive):
+    records = list(iter_archive(archive, workers=0, max_entry_bytes=100_000, cache=AnalysisCache(None)))
+    statuses = {record["filename"]: record["status"] for record in records[:-1]}
+    assert statuses["bomb.docx"] == "error"
+    assert statuses["cvs/alice.docx"] == "ok"
+
+
+def test_second_pass_is_served_from_the_analysis_cache(archive):
+    cache = AnalysisCache(DictBackend())
+    first = list(iter_archive(archive, workers=0, cache=cache))
+    archive.seek(0)
+    second = list(iter_archive(archive, workers=0, cache=cache))
+
+    assert first[-1]["cached"] == 0
+    assert second[-1]["cached"] == 2
+    skills = {record["filename"]: record.get("skills") for record in first[:-1]}
+    assert {record["filename"]: record.get("skills") for record in second[:-1]} == skills
+
+
+def test_hanging_entry_fails_alone_in_a_shared_pool(pool, monkeypatch):
+    monkeypatch.setattr(archive_ingest, "analyze_resume_bytes", analyze_or_hang)
+    stuck = make_archive({"hang.docx": docx_bytes("Never finishes"), "alice.docx": docx_bytes("Python and Docker.")})
+    other = make_archive({f"cv{i}.docx": docx_bytes(f"Engineer {i} with Python.") for i in range(4)})
+    results = {}
+
+    def run(name, source):
+        results[name] = {record.get("filename"): record for record in iter_archive(source, timeout=1.0, cache=AnalysisCache(None))}
+
+    thread = threading.Thread(target=run, args=("stuck", stuck))
+    thread.start()
+    time.sleep(0.2)
+    run("other", other)
+    thread.join()
+
+    assert results["stuck"]["hang.docx"]["status"] == "error"
+    assert "exceeded" in results["stuck"]["hang.docx"]["error"]
+    assert results["stuck"]["alice.docx"]["status"] == "ok"
+    assert all(results["other"][f"cv{i}.docx"]["status"] == "ok" for i in range(4))
+    assert pool.replaced == 1
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from backend.batch_jobs import BatchManager, BatchQueueFull, MemoryStore, SQLiteStore, _new_record
+
+
+def fake_prepare(jobs):
+    return [job["id"] for job in jobs]
+
+
+def fake_process(resume, prepared_jobs):
+    time.sleep(0.01)
+    if resume["text"] == "unreadable":
+        raise ValueError("no text")
+    return {"matches": [{"job_id": job_id} for job_id in prepared_jobs]}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / "batches.sqlite3"))
+
+
+def make_manager(store, **kwargs):
+    kwargs.setdefault("workers", 2)
+    return BatchManager(store, process=fake_process, prepare=fake_prepare, **kwargs)
+
+
+def wait_for(manager, batch_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        record = manager.status(batch_id)
+        if record["status"] in ("completed", "cancelled", "failed"):
+            return record
+        time.sleep(0.01)
+    raise AssertionError("batch did not finish")
+
+
+def test_batch_runs_every_resume_and_records_failures(store):
+    manager = make_manager(store)
+    resumes = [{"id": f"r{i}", "text": "unreadable" if i == 2 else "text"} for i in range(5)]
+
+    batch_id = manager.submit(resumes, [{"id": "job-a", "text": "a"}, {"id": "job-b", "text": "b"}])["batch_id"]
+    record = wait_for(manager, batch_id)
+
+    assert record["status"] == "completed"
+    assert (record["completed"], record["failed"], record["progress"]) == (4, 1, 1.0)
+    results = sorted(manager.results(batch_id), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == ["ok", "ok", "error", "ok", "ok"]
+    assert results[0]["matches"] == [{"job_id": "job-a"}, {"job_id": "job-b"}]
+    assert manager.results(batch_id, offset=3, limit=1)[0] in results
+
+
+def test_backpressure_rejects_batches_over_the_pending_limit(store):
+    manager = make_manager(store, workers=1, max_pending=5)
+    batch_id = manager.submit([{"text": "text"}] * 4, [{"id": 0, "text": "job"}])["batch_id"]
+
+    with pytest.raises(BatchQueueFull):
+        manager.submit([{"text": "text"}] * 2, [{"id": 0, "text": "job"}])
+
+    wait_for(manager, batch_id)
+    assert manager.pending == 0
+    manager.submit([{"text": "text"}] * 5, [{"id": 0, "text": "job"}])
+
+
+def test_cancel_skips_queued_resumes(store):
+    manager = make_manager(store, workers=1)
+    batch_id = manager.submit([{"text": "text"}] * 20, [{"id": 0, "text": "job"}])["batch_id"]
+
+    manager.cancel(batch_id)
+    record = wait_for(manager, batch_id)
+
+    assert record["status"] == "cancelled"
+    assert record["skipped"] > 0
+    assert record["completed"] + record["skipped"] == 20
+
+
+def test_backpressure_counts_bytes(store):
+    manager = make_manager(store, workers=1, max_pending_bytes=1000)
+    with pytest.raises(BatchQueueFull):
+        manager.submit([{"filename": "cv.pdf", "data": b"x" * 600}] * 2, [{"id": 0, "text": "job"}])
+    batch_id = manager.submit([{"text": "t" * 400}] * 2, [{"id": 0, "text": "job"}])["batch_id"]
+
+    wait_for(manager, batch_id)
+    assert manager.pending_bytes == 0
+
+
+def test_batch_of_a_dead_process_is_failed_on_read(store):
+    record = _new_record("lost", total=3, jobs=1)
+    record["status"] = "running"
+    record["heartbeat_at"] -= 3600
+    store.create(record)
+
+    status = make_manager(store, orphan_after=60).status("lost")
+
+    assert status["status"] == "failed"
+    assert "stopped" in status["error"]
+    assert store.get("lost")["status"] == "failed"
+
+
+def test_shutdown_fails_unfinished_batches(store):
+    manager = make_manager(store, workers=1)
+    batch_id = manager.submit([{"text": "text"}] * 20, [{"id": 0, "text": "job"}])["batch_id"]
+
+    manager.shutdown()
+    time.sleep(0.05)
+
+    record = manager.status(batch_id)
+    assert record["status"] == "failed"
+    assert record["completed"] < 20
@@ -0,0 +1,50 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from backend import semantic_matcher
+from backend.bulk_ranker import iter_ranked
+from backend.embedding_cache import EmbeddingCache
+from backend.embedding_providers import EmbeddingProvider
+from backend.semantic_matcher import semantic_similarity
+
+
+class WordHashProvider(EmbeddingProvider):
+    """Bag of hashed words: chunks that share words have similar vectors."""
+
+    name = "word-hash"
+
+    def __init__(self):
+        super().__init__("word-hash-test", 64)
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode()) % self.dimension] += 1
+        return list(vectors)
+
+
+@pytest.fixture(autouse=True)
+def provider(monkeypatch):
+    provider = WordHashProvider()
+    monkeypatch.setattr(semantic_matcher, "_provider", provider)
+    monkeypatch.setattr(semantic_matcher, "_embedding_cache", EmbeddingCache(provider.model, provider.dimension, None))
+    return provider
+
+
+RESUME = "Summary\nData engineer.\n\nExperience\n" + "\n\n".join(
+    f"Built pipeline {i} with Python Spark and Docker for team {i}" for i in range(20)
+) + "\n\nSkills\nPython, SQL"
+JOBS = ["Experience\nPython Spark engineer\n\nSkills\nAWS Docker", "Pastry cook for a busy kitchen", ""]
+
+
+def test_rank_scores_match_the_chunked_pairwise_score():
+    by_job = {row["id"]: row["semantic_match_percentage"] for row in iter_ranked(RESUME, JOBS, "jobs")}
+    assert by_job == {i: semantic_similarity(RESUME, job) for i, job in enumerate(JOBS)}
+    assert by_job[0] > by_job[1]
+
+    resumes = [RESUME, JOBS[1]]
+    by_resume = {row["id"]: row["semantic_match_percentage"] for row in iter_ranked(JOBS[0], resumes, "resumes")}
+    assert by_resume == {i: semantic_similarity(resume, JOBS[0]) for i, resume in enumerate(resumes)}
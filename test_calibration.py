@@ -0,0 +1,55 @@
+import numpy as np
+
+from backend.calibration import (
+    auc, calibrate_thresholds, group_index, hybrid_scores, ndcg, sweep, weight_grid
+)
+
+
+def brute_force_auc(scores, positive):
+    pos, neg = scores[positive], scores[~positive]
+    wins = (pos[:, None] > neg[None, :]).sum() + 0.5 * (pos[:, None] == neg[None, :]).sum()
+    return wins / (len(pos) * len(neg))
+
+
+def test_auc_matches_pairwise_count_with_ties():
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.uniform(0, 100, size=(20, 50)), 0)
+    positive = rng.random(50) > 0.6
+    expected = [brute_force_auc(row, positive) for row in scores]
+    np.testing.assert_allclose(auc(scores, positive), expected)
+
+
+def test_ndcg_perfect_and_reversed_order():
+    gains = np.array([1.0, 0.0, 0.0, 1.0, 0.0])
+    groups = np.array([0, 0, 0, 1, 1])
+    index = group_index(groups, gains)
+    perfect = np.array([[3.0, 2.0, 1.0, 2.0, 1.0]])
+    reversed_ = np.array([[1.0, 2.0, 3.0, 1.0, 2.0]])
+    assert ndcg(perfect, gains, index)[0] == 1.0
+    assert ndcg(reversed_, gains, index)[0] < 1.0
+
+
+def test_sweep_prefers_the_informative_component():
+    rng = np.random.default_rng(1)
+    labels = (rng.random(400) > 0.5).astype(float)
+    informative = labels * 40 + rng.uniform(0, 50, 400)
+    noise = rng.uniform(0, 100, 400)
+    data = {
+        "components": np.array([informative, noise]),
+        "labels": labels,
+        "groups": rng.integers(0, 20, 400),
+    }
+    grid = weight_grid(step=0.1, max_weight=1.0)
+    metrics = sweep(data, grid, chunk_elements=1000)
+    best = grid[np.argmax(metrics["auc"])]
+    assert best[0] > best[1]
+    # Chunking does not change the result
+    np.testing.assert_allclose(metrics["auc"], sweep(data, grid)["auc"])
+
+
+def test_thresholds_follow_precision_and_recall_targets():
+    scores = np.array([10.0, 30.0, 55.0, 60.0, 80.0, 90.0])
+    positive = np.array([False, False, True, False, True, True])
+    thresholds = calibrate_thresholds(scores, positive, strong_precision=1.0, medium_recall=1.0)
+    assert thresholds == {"strong": 60.5, "medium": 55.0}
+    assert hybrid_scores(np.array([0.5, 0.5]), np.array([[10.0], [20.0]]))[0, 0] == 15.0
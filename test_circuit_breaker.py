@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from backend.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+def test_opens_after_consecutive_failures_and_rejects_calls():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+    assert breaker.rejected == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_one_trial_call():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.trip()
+    time.sleep(0.02)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
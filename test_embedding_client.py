@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend import semantic_matcher
+
+from backend.circuit_breaker import CircuitBreaker
+from backend.deadline import Deadline, DeadlineExceeded, deadline_scope
+from backend.embedding_client import AsyncEmbeddingClient, EmbeddingUnavailable
+from backend.rate_limiter import _request_usage
+
+
+class FakeEmbeddingBackend:
+    """Local stand-in for Gemini: records batches and returns deterministic vectors."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.batches = []
+        self.failures = failures
+        self.delay = delay
+
+    async def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("fake outage")
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+
+def make_client(backend, **kwargs):
+    kwargs.setdefault("batch_window_ms", 5)
+    kwargs.setdefault("backoff_base", 0.001)
+    return AsyncEmbeddingClient(backend, **kwargs)
+
+
+def test_concurrent_requests_share_one_batch():
+    backend = FakeEmbeddingBackend()
+    client = make_client(backend)
+
+    async def run():
+        return await asyncio.gather(*(client.embed(f"text {i}") for i in range(10)))
+
+    vectors = asyncio.run(run())
+
+    assert len(backend.batches) == 1
+    assert len(backend.batches[0]) == 10
+    assert vectors[3] == [6.0, float(sum(map(ord, "text 3")) % 97)]
+
+
+def test_identical_texts_are_deduplicated():
+    backend = FakeEmbeddingBackend(delay=0.01)
+    client = make_client(backend)
+
+    async def run():
+        first = asyncio.gather(*(client.embed("same resume") for _ in range(5)))
+        await asyncio.sleep(0.008)
+        # Arrives while the first batch is in flight
+        late = await client.embed("same resume")
+        return await first, late
+
+    first, late = asyncio.run(run())
+
+    assert backend.batches == [["same resume"]]
+    assert all(vector == late for vector in first)
+    assert client.stats["deduplicated"] == 5
+
+
+def test_max_batch_size_splits_batches():
+    backend = FakeEmbeddingBackend()
+    client = make_client(backend, max_batch_size=4)
+
+    asyncio.run(client.embed_many([f"t{i}" for i in range(10)]))
+
+    assert [len(batch) for batch in backend.batches] == [4, 4, 2]
+
+
+def test_retries_with_backoff_then_succeeds():
+    backend = FakeEmbeddingBackend(failures=2)
+    client = make_client(backend, max_retries=2)
+
+    vector = asyncio.run(client.embed("python developer"))
+
+    assert vector[0] == 16.0
+    assert len(backend.batches) == 3
+    assert client.stats["retries"] == 2
+
+
+def test_gives_up_after_max_retries():
+    backend = FakeEmbeddingBackend(failures=5)
+    client = make_client(backend, max_retries=1)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.embed("python developer"))
+
+    assert len(backend.batches) == 2
+
+
+def test_timeout_counts_as_failure():
+    backend = FakeEmbeddingBackend(delay=0.2)
+    client = make_client(backend, timeout=0.01, max_retries=0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(client.embed("slow"))
+
+
+def embed_within(client, text, seconds):
+    async def run():
+        with deadline_scope(Deadline(seconds)):
+            return await client.embed(text)
+    return asyncio.run(run())
+
+
+def test_deadline_bounds_the_wait_on_a_slow_provider():
+    backend = FakeEmbeddingBackend(delay=0.5)
+    client = make_client(backend, timeout=5)
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        embed_within(client, "slow", 0.05)
+    assert time.perf_counter() - started < 0.3
+
+
+def test_no_retry_without_budget_left():
+    backend = FakeEmbeddingBackend(failures=1)
+    client = make_client(backend, max_retries=3, min_attempt_ms=200)
+
+    with pytest.raises(DeadlineExceeded):
+        embed_within(client, "python developer", 0.1)
+    assert len(backend.batches) == 1
+
+
+def test_open_breaker_fails_fast():
+    backend = FakeEmbeddingBackend(failures=5)
+    client = make_client(backend, max_retries=0, breaker=CircuitBreaker("test", failure_threshold=1))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.embed("first"))
+    with pytest.raises(EmbeddingUnavailable):
+        asyncio.run(client.embed("second"))
+    assert len(backend.batches) == 1
+
+
+class SlowFirstBackend(FakeEmbeddingBackend):
+    async def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(1.0 if len(self.batches) == 1 else 0.0)
+        return [[1.0, 2.0] for _ in texts]
+
+
+def test_hedged_call_answers_when_budget_remains():
+    backend = SlowFirstBackend()
+    client = make_client(backend, hedge_after_ms=20, min_attempt_ms=10)
+
+    assert embed_within(client, "hedge me", 0.5) == [1.0, 2.0]
+    assert client.stats["hedges"] == 1
+    assert len(backend.batches) == 2
+
+
+class RecordingCache:
+    def __init__(self, cached):
+        self.cached = cached
+        self.calls = []
+
+    def get_many(self, texts):
+        self.calls.append(("get_many", list(texts), threading.get_ident()))
+        return [self.cached.get(text) for text in texts]
+
+    def set_many(self, texts, vectors):
+        self.calls.append(("set_many", list(texts), threading.get_ident()))
+        return [np.asarray(vector, dtype=np.float32) for vector in vectors]
+
+
+def test_async_cache_lookups_are_batched_off_the_event_loop(monkeypatch):
+    backend = FakeEmbeddingBackend()
+    backend.dimension = 2
+    cache = RecordingCache({"cached": np.ones(2, dtype=np.float32)})
+    monkeypatch.setattr(semantic_matcher, "_provider", backend)
+    monkeypatch.setattr(semantic_matcher, "_embedding_cache", cache)
+    monkeypatch.setattr(semantic_matcher, "_embedding_client", make_client(backend))
+    usage = {"hits": 0, "misses": 0}
+
+    async def run():
+        _request_usage.set(usage)
+        vectors = await semantic_matcher.get_embeddings_async(["new", "cached", "new", " ", "other"])
+        return vectors, threading.get_ident()
+
+    vectors, loop_thread = asyncio.run(run())
+
+    assert [(name, texts) for name, texts, _ in cache.calls] == [
+        ("get_many", ["new", "cached", "other"]),
+        ("set_many", ["new", "other"]),
+    ]
+    assert all(thread != loop_thread for _, _, thread in cache.calls)
+    assert backend.batches == [["new", "other"]]
+    assert usage == {"hits": 1, "misses": 2}
+    assert list(vectors[0]) == list(vectors[2]) == [3.0, float(sum(map(ord, "new")) % 97)]
+    assert not vectors[3].any()
+
+
+def test_text_already_queued_by_another_request_is_not_charged_again(monkeypatch):
+    backend = FakeEmbeddingBackend(delay=0.01)
+    backend.dimension = 2
+    monkeypatch.setattr(semantic_matcher, "_provider", backend)
+    monkeypatch.setattr(semantic_matcher, "_embedding_cache", RecordingCache({}))
+    monkeypatch.setattr(semantic_matcher, "_embedding_client", make_client(backend))
+    first, second = {"hits": 0, "misses": 0}, {"hits": 0, "misses": 0}
+
+    async def request(usage, texts):
+        _request_usage.set(usage)
+        return await semantic_matcher.get_embeddings_async(texts)
+
+    async def run():
+        one = asyncio.create_task(request(first, ["shared", "shared"]))
+        await asyncio.sleep(0.002)
+        await request(second, ["shared", "own"])
+        await one
+
+    asyncio.run(run())
+
+    assert sorted(text for batch in backend.batches for text in batch) == ["own", "shared"]
+    assert first["misses"] == 1
+    assert second["misses"] == 1
@@ -0,0 +1,18 @@
+import pytest
+
+from backend.hybrid_matcher import calculate_skill_only_score, confidence_label, skill_only_weights
+
+
+def test_skill_only_weights_sum_to_one():
+    assert sum(skill_only_weights().values()) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("skill_score, expected", [(0, 0), (42.5, 42.5), (100, 100)])
+def test_degraded_score_stays_on_the_0_to_100_range(skill_score, expected):
+    assert calculate_skill_only_score(skill_score) == expected
+
+
+def test_full_skill_coverage_is_strong_but_not_above_100():
+    score = calculate_skill_only_score(100)
+    assert score <= 100
+    assert confidence_label(score) == "Strong"
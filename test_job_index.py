@@ -0,0 +1,79 @@
+import multiprocessing
+import zlib
+
+import numpy as np
+import pytest
+
+from backend.job_index import JobIndex
+
+DIM = 32
+
+
+def vector_for(job_id):
+    return np.random.default_rng(zlib.crc32(job_id.encode())).standard_normal(DIM).astype(np.float32)
+
+
+def add_jobs(directory, worker, n):
+    index = JobIndex(directory, "test", DIM)
+    for i in range(n):
+        job_id = f"w{worker}-{i}"
+        index.add([job_id], vector_for(job_id)[None, :])
+
+
+def test_writers_in_separate_processes_share_one_index(tmp_path):
+    directory = str(tmp_path)
+    reader = JobIndex(directory, "test", DIM)
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=add_jobs, args=(directory, worker, 40)) for worker in range(3)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    stats = reader.stats()
+    assert stats["rows"] == stats["live_jobs"] == 120
+    for job_id in ("w0-0", "w1-17", "w2-39"):
+        assert reader.search(vector_for(job_id), top_k=1)[0]["job_id"] == job_id
+
+
+def test_compaction_by_another_process_is_picked_up(tmp_path):
+    directory = str(tmp_path)
+    first = JobIndex(directory, "test", DIM)
+    second = JobIndex(directory, "test", DIM)
+    job_ids = [f"job-{i}" for i in range(20)]
+    first.add(job_ids, np.stack([vector_for(job_id) for job_id in job_ids]))
+
+    for job_id in job_ids[:10]:
+        second.delete(job_id)
+    assert second.compact() == {"rows_before": 20, "rows_after": 10}
+
+    # Row numbers changed under the first instance
+    assert first.search(vector_for("job-15"), top_k=1)[0]["job_id"] == "job-15"
+    assert first.stats()["rows"] == 10
+    first.add(["job-new"], vector_for("job-new")[None, :])
+    assert second.search(vector_for("job-new"), top_k=1)[0]["job_id"] == "job-new"
+    assert second.stats()["live_jobs"] == 11
+
+
+@pytest.mark.parametrize("codec", ["float32", "int8"])
+def test_exact_search_masks_deleted_rows(tmp_path, codec):
+    index = JobIndex(str(tmp_path), "test", DIM, codec=codec)
+    job_ids = [f"job-{i}" for i in range(50)]
+    index.add(job_ids, np.stack([vector_for(job_id) for job_id in job_ids]))
+    index.delete("job-7")
+
+    hits = index.search(vector_for("job-7"), top_k=50)
+    assert len(hits) == 49
+    assert "job-7" not in {hit["job_id"] for hit in hits}
+    assert index.search(vector_for("job-8"), top_k=1)[0]["job_id"] == "job-8"
+
+
+def test_repeated_job_id_in_one_batch_keeps_the_last(tmp_path):
+    index = JobIndex(str(tmp_path), "test", DIM)
+    index.add(["a", "b", "a"], np.stack([vector_for("x"), vector_for("b"), vector_for("a")]), titles=["old", "B", "new"])
+
+    assert index.stats()["live_jobs"] == index.stats()["rows"] == 2
+    hits = index.search(vector_for("a"), top_k=5)
+    assert [hit["job_id"] for hit in hits].count("a") == 1
+    assert hits[0]["title"] == "new"
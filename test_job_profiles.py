@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend import job_profiles
+from backend.job_profiles import JobProfileRegistry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_embed(text):
+        calls.append(text)
+        return np.ones((2, 4), dtype=np.float32)
+
+    monkeypatch.setattr(job_profiles, "embed_document", fake_embed)
+    monkeypatch.setattr(job_profiles, "embedding_version", lambda: "stub:4")
+    registry = JobProfileRegistry(str(tmp_path))
+    registry.embed_calls = calls
+    return registry
+
+
+def test_register_persists_profile(registry, tmp_path):
+    profile = registry.register("Python developer with Docker and AWS", title="Backend")
+    assert profile.vectors.shape == (2, 4)
+
+    reloaded = JobProfileRegistry(str(tmp_path)).get(profile.job_id)
+    assert reloaded.title == "Backend"
+    assert reloaded.skills == profile.skills
+    np.testing.assert_array_equal(reloaded.vectors, profile.vectors)
+
+
+def test_register_same_text_is_not_recomputed(registry):
+    first = registry.register("Python developer", job_id="job-1")
+    second = registry.register("Python developer", job_id="job-1")
+    assert second.updated_at == first.updated_at
+    assert len(registry.embed_calls) == 1
+
+
+def test_stale_embedding_version_recomputes_vectors_only(registry, monkeypatch):
+    registry.register("Python developer", job_id="job-1")
+    monkeypatch.setattr(job_profiles, "embedding_version", lambda: "stub:8")
+
+    profile = registry.get("job-1")
+    assert profile.embedding_version == "stub:8"
+    assert registry.recomputed == 1
+    assert len(registry.embed_calls) == 2
+    # Still current now: no further work
+    registry.get("job-1")
+    assert registry.recomputed == 1
+
+
+def test_invalid_and_unknown_ids(registry):
+    with pytest.raises(ValueError):
+        registry.register("Python developer", job_id="../escape")
+    assert registry.get("missing") is None
+    assert registry.delete("missing") is False
+
+
+def test_recompute_does_not_block_other_profiles(registry, monkeypatch):
+    registry.register("Python developer", job_id="job-1")
+    registry.register("Go developer", job_id="job-2")
+    monkeypatch.setattr(job_profiles, "embedding_version", lambda: "stub:8")
+    registry.get("job-2")
+    started, release = threading.Event(), threading.Event()
+
+    def slow_embed(text):
+        started.set()
+        release.wait(5)
+        return np.ones((2, 4), dtype=np.float32)
+
+    monkeypatch.setattr(job_profiles, "embed_document", slow_embed)
+    thread = threading.Thread(target=registry.get, args=("job-1",))
+    thread.start()
+    assert started.wait(5)
+    # Served while job-1 waits on the provider
+    other = threading.Thread(target=registry.get, args=("job-2",))
+    other.start()
+    other.join(2)
+    assert not other.is_alive()
+    release.set()
+    thread.join()
+    assert registry.get("job-1").embedding_version == "stub:8"
+
+
+def test_provider_outage_serves_stale_profile_without_vectors(registry, monkeypatch):
+    registry.register("Python developer with Docker", job_id="job-1")
+    monkeypatch.setattr(job_profiles, "embedding_version", lambda: "stub:8")
+
+    def outage(text):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(job_profiles, "embed_document", outage)
+    profile = registry.get("job-1")
+    assert profile.vectors is None
+    assert {"python", "docker"} <= set(profile.skills)
+    assert (registry.degraded, registry.recomputed) == (1, 0)
+
+    # Retried once the provider is back
+    monkeypatch.setattr(job_profiles, "embed_document", lambda text: np.ones((2, 4), dtype=np.float32))
+    assert registry.get("job-1").vectors.shape == (2, 4)
+    assert registry.recomputed == 1
+
+
+def test_register_does_not_block_other_profiles(registry, monkeypatch):
+    registry.register("Go developer", job_id="job-2")
+    started, release = threading.Event(), threading.Event()
+
+    def slow_embed(text):
+        started.set()
+        release.wait(5)
+        return np.ones((2, 4), dtype=np.float32)
+
+    monkeypatch.setattr(job_profiles, "embed_document", slow_embed)
+    thread = threading.Thread(target=registry.register, args=("Python developer",), kwargs={"job_id": "job-1"})
+    thread.start()
+    assert started.wait(5)
+    other = threading.Thread(target=registry.get, args=("job-2",))
+    other.start()
+    other.join(2)
+    assert not other.is_alive()
+    release.set()
+    thread.join()
+    assert registry.get("job-1").vectors.shape == (2, 4)
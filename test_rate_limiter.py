@@ -0,0 +1,63 @@
+from backend.rate_limiter import MemoryBuckets, RateLimiter
+
+COSTS = {"/cheap": (1, 0), "/embed": (2, 3)}
+
+
+def make_limiter(**kwargs):
+    kwargs.setdefault("capacity", 10)
+    kwargs.setdefault("rate", 0.001)
+    kwargs.setdefault("embed_cost", 1)
+    kwargs.setdefault("embed_quota", 0)
+    return RateLimiter(MemoryBuckets(), costs=COSTS, **kwargs)
+
+
+def test_bucket_rejects_once_capacity_is_spent():
+    buckets = MemoryBuckets()
+    assert buckets.take("k", capacity=3, rate=0.001, cost=2)[0]
+    allowed, tokens, wait = buckets.take("k", capacity=3, rate=0.001, cost=2)
+    assert not allowed
+    assert wait > 0
+    assert buckets.take("k", capacity=3, rate=0.001, cost=1)[0]
+
+
+def test_endpoints_are_charged_by_cost():
+    limiter = make_limiter()
+    allowed, charge, tokens, _ = limiter.acquire("client", "/embed")
+    assert allowed and charge == 5 and round(tokens) == 5
+    allowed, charge, tokens, _ = limiter.acquire("client", "/cheap")
+    assert allowed and charge == 1 and round(tokens) == 4
+
+
+def test_embedding_cache_hits_are_refunded():
+    limiter = make_limiter()
+    _, _, tokens, _ = limiter.acquire("client", "/embed")
+    limiter.settle("client", "/embed", {"hits": 3, "misses": 0})
+    # Only the base cost is kept
+    _, _, tokens, _ = limiter.acquire("client", "/cheap")
+    assert round(tokens) == 7
+    assert limiter.refunded == 3
+
+
+def test_extra_provider_calls_are_debited():
+    limiter = make_limiter()
+    limiter.acquire("client", "/embed")
+    limiter.settle("client", "/embed", {"hits": 0, "misses": 6})
+    allowed, _, _, _ = limiter.acquire("client", "/embed")
+    assert not allowed
+
+
+def test_global_embedding_quota_is_shared_by_clients():
+    limiter = make_limiter(embed_quota=4)
+    assert limiter.acquire("a", "/embed")[0]
+    assert not limiter.acquire("b", "/embed")[0]
+    assert limiter.acquire("b", "/cheap")[0]
+
+
+def test_cors_wraps_the_rate_limiter():
+    from fastapi.middleware.cors import CORSMiddleware
+    from backend.api import app
+    from backend.rate_limiter import RateLimitMiddleware
+
+    # Outermost first: a 429 from the limiter still gets CORS headers
+    order = [middleware.cls for middleware in app.user_middleware]
+    assert order.index(CORSMiddleware) < order.index(RateLimitMiddleware)
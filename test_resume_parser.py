@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from backend import resume_parser
+from backend.resume_parser import ResumeParseTimeout, parse_pdf, _parse_pdf_in_pool
+from backend.worker_pool import WorkerPool
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 2 * i} 0 R" for i in range(count)), count),
+    ]
+    font = 3 + 2 * count
+    for i, text in enumerate(pages):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def hang(name, size, start, end):
+    time.sleep(60)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = WorkerPool(2)
+    monkeypatch.setattr(resume_parser, "_pool", pool)
+    monkeypatch.setattr(resume_parser, "PDF_PARSE_WORKERS", 2)
+    monkeypatch.setattr(resume_parser, "PDF_PAGES_PER_TASK", 2)
+    yield pool
+    pool.close()
+
+
+def test_long_pdf_is_split_across_workers(pool):
+    pages = [f"Page {i} Python Docker" for i in range(7)]
+    assert parse_pdf(make_pdf(pages), max_pages=5).splitlines() == pages[:5]
+
+
+def test_hanging_parse_does_not_fail_a_concurrent_one(pool):
+    data = make_pdf([f"Page {i}" for i in range(6)])
+    outcome = {}
+
+    def slow():
+        try:
+            _parse_pdf_in_pool(data, 50, 1.0, extract=hang)
+        except ResumeParseTimeout as e:
+            outcome["slow"] = e
+
+    thread = threading.Thread(target=slow)
+    thread.start()
+    time.sleep(0.2)
+    # Runs on the other worker while the first one hangs, and after it is killed
+    outcome["fast"] = [_parse_pdf_in_pool(data, 50, 5.0) for _ in range(3)]
+    thread.join()
+
+    assert isinstance(outcome["slow"], ResumeParseTimeout)
+    assert all(pages == [f"Page {i}" for i in range(6)] for pages in outcome["fast"])
+    assert pool.replaced == 1
+    assert _parse_pdf_in_pool(data, 50, 5.0)[0] == "Page 0"
@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from backend.ats_recommender import generate_ats_recommendations
+from backend.resume_rewriter import generate_resume_improvements
+from backend.rule_engine import RuleEngine, compile_rules
+
+
+def test_default_rules_reproduce_builtin_guidance():
+    recommendations = generate_ats_recommendations(["python"], ["python", "machine learning"], ["machine learning"], 40)
+    assert recommendations == [
+        "Your resume has low alignment with the job description. Focus on adding core technical skills mentioned in the job.",
+        "Add these missing skills explicitly to your resume: machine learning.",
+        "Highlight machine learning projects with clear metrics and outcomes.",
+    ]
+    assert generate_ats_recommendations(["python"], ["python"], [], 80) == [
+        "Your resume is well-aligned. Minor refinements and stronger impact statements can improve shortlisting chances."
+    ]
+    assert generate_resume_improvements(["python"], ["nlp", "docker"], ["nlp", "docker"]) == [
+        "Add a project or experience bullet highlighting hands-on usage of nlp.",
+        "Add a project or experience bullet highlighting hands-on usage of docker.",
+        "Mention NLP techniques explicitly (tokenization, embeddings, transformers).",
+    ]
+
+
+def test_only_rules_for_present_skills_are_candidates():
+    rules = [{"when": {"job_has": f"skill{i}"}, "text": f"rule {i}"} for i in range(5000)]
+    rules.append({"when": {"missing": "skill7", "resume_lacks": "skill7"}, "text": "learn {missing_skills}"})
+    compiled = compile_rules({"recommendations": rules})["recommendations"]
+
+    assert len(compiled.candidates(set(), {"skill7", "other"}, {"skill7"})) == 2
+    assert compiled.evaluate([], ["skill7", "other"], ["skill7"], 60) == ["rule 7", "learn skill7"]
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        compile_rules({"recommendations": [{"when": {"job_hass": "python"}, "text": "x"}]})
+    with pytest.raises(ValueError):
+        compile_rules({"rewrites": [{"text": "use {skill}"}]})
+
+
+def test_reload_picks_up_changes_and_keeps_last_good_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rewrites": [{"when": {"job_has": "go"}, "text": "Show Go services."}]}))
+    engine = RuleEngine(str(path), reload_interval=0)
+    assert engine.evaluate("rewrites", [], ["go"], ["go"]) == ["Show Go services."]
+
+    path.write_text(json.dumps({"rewrites": [{"when": {"job_has": "go"}, "text": "Show Go APIs and services."}]}))
+    os.utime(path, ns=(1, 1))
+    assert engine.evaluate("rewrites", [], ["go"], ["go"]) == ["Show Go APIs and services."]
+    version = engine.info()["version"]
+
+    path.write_text("{not json")
+    os.utime(path, ns=(2, 2))
+    assert engine.evaluate("rewrites", [], ["go"], ["go"]) == ["Show Go APIs and services."]
+    assert engine.info()["version"] == version
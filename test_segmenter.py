@@ -0,0 +1,49 @@
+from backend.segmenter import segment, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY:
+Data engineer with five years of experience.
+
+Work Experience
+Acme Corp, built batch pipelines in Python and Spark.
+- Led the migration of reporting jobs to AWS.
+
+Globex, maintained ETL jobs and dashboards.
+
+Skills & Tools
+Python, SQL, Docker
+
+## Education
+BSc Computer Science
+"""
+
+
+def test_sections_are_detected_from_headings():
+    sections = [section for section, _ in split_sections(RESUME)]
+    assert sections == ["header", "summary", "experience", "skills", "education"]
+
+
+def test_chunks_respect_the_word_limit():
+    text = "Experience\n" + " ".join(f"word{i}" for i in range(250))
+    chunks = segment(text, max_words=100)
+    assert [len(chunk.text.split()) for chunk in chunks] == [100, 100, 50]
+    assert {chunk.section for chunk in chunks} == {"experience"}
+
+
+def test_an_edit_only_changes_the_chunk_it_falls_in():
+    edited = RESUME.replace("Led the migration", "Led the zero-downtime migration")
+    before, after = set(segment(RESUME)), set(segment(edited))
+    assert len(before - after) == 1
+    assert len(after - before) == 1
+    assert (after - before).pop().section == "experience"
+
+
+def test_chunk_count_is_bounded():
+    text = "\n\n".join(f"paragraph {i}" for i in range(100))
+    chunks = segment(text, max_words=5, max_chunks=10)
+    assert len(chunks) == 10
+    # The overflow is dropped, not folded into one unbounded last chunk
+    assert chunks[-1].text == "paragraph 9"
+    assert all(len(chunk.text.split()) <= 5 for chunk in chunks)
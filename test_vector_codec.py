@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from backend.embedding_cache import EmbeddingCache
+from backend.vector_codec import VectorCodec, normalize_rows
+
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((50, 96)).astype(np.float32)
+
+
+@pytest.mark.parametrize("name,max_drift", [("float32", 1e-6), ("float16", 1e-3), ("int8", 1e-2)])
+def test_dot_on_encoded_rows_tracks_float32_cosine(vectors, name, max_drift):
+    codec = VectorCodec(name)
+    codes, scales = codec.encode(vectors)
+    query = normalize_rows(vectors[0])
+    exact = normalize_rows(vectors) @ query
+
+    scores = codec.dot(codes, scales, query, chunk_rows=16)
+    assert np.abs(scores - exact).max() < max_drift
+    np.testing.assert_allclose(scores, codec.decode(codes, scales) @ query, atol=1e-6)
+    assert np.argmax(scores) == 0
+
+
+@pytest.mark.parametrize("name,nbytes", [("float32", 384), ("float16", 192), ("int8", 100)])
+def test_pack_size_and_unpack(vectors, name, nbytes):
+    codec = VectorCodec(name)
+    data = codec.pack(vectors[1])
+    assert len(data) == nbytes == codec.bytes_per_vector(96)
+    np.testing.assert_allclose(codec.unpack(data, 96), codec.roundtrip(vectors[1:2])[0])
+    assert codec.unpack(data[:-1], 96) is None
+
+
+class FakeLayer:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set_many(self, items, ttl):
+        self.data.update(items)
+
+
+def test_embedding_cache_serves_the_same_vector_from_every_tier(vectors):
+    layer = FakeLayer()
+    cache = EmbeddingCache("model", 96, layer, codec="int8")
+    stored = cache.set("text", vectors[2])
+    assert len(next(iter(layer.data.values()))) == 100
+
+    assert cache.get("text") is stored
+    cold = EmbeddingCache("model", 96, layer, codec="int8")
+    np.testing.assert_array_equal(cold.get("text"), stored)
+    # A different encoding never reads these bytes
+    assert EmbeddingCache("model", 96, layer, codec="float16").get("text") is None